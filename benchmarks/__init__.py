@@ -0,0 +1,17 @@
+"""
+Benchmarks for the Structured Outputs by Example build.
+
+Each module can be run directly with ``python -m benchmarks.<name>`` from the
+project root.
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# build_examples.py and build_static_site.py are scripts rather than
+# packages, so make them importable
+for path in (PROJECT_ROOT, PROJECT_ROOT / "build_examples"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Synthetic example corpus for benchmarking the build.
+
+Generates a project tree laid out like this repository (examples/ plus
+data/sections.json) with a configurable number of examples, sections and
+images and configurable Python and shell transcript sizes.
+
+Usage:
+    python -m benchmarks.corpus /tmp/corpus --preset 1k
+    python -m benchmarks.corpus /tmp/corpus --examples 500 --images 5
+"""
+
+import argparse
+import base64
+import json
+import random
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, List
+
+# Smallest valid PNG (1x1 transparent pixel)
+PNG_BYTES = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA"
+    "60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+@dataclass
+class CorpusConfig:
+    """Shape of a synthetic corpus."""
+
+    examples: int = 100
+    python_lines: int = 200
+    shell_output_lines: int = 50
+    images: int = 0
+    sections: int = 10
+    seed: int = 0
+
+
+PRESETS: Dict[str, CorpusConfig] = {
+    "small": CorpusConfig(),
+    "1k": CorpusConfig(examples=1000, sections=50),
+    "10k": CorpusConfig(examples=10000, sections=200),
+    # Few examples, but 5k-line Python files, ~3 MB transcripts and many images
+    "large-files": CorpusConfig(
+        examples=20, python_lines=5000, shell_output_lines=100000, images=50
+    ),
+}
+
+
+def generate_python_source(line_count: int, title: str = "Synthetic example") -> str:
+    """
+    Generate an annotated Python file of roughly the requested length.
+
+    The blocks mix full-line comments, indented and inline comments and
+    multi-line strings containing lines that start with "#".
+
+    Args:
+        line_count: Minimum number of lines to generate
+        title: Title comment on the first line
+
+    Returns:
+        The generated source text
+    """
+    lines: List[str] = [f"# {title}", "# Generated for benchmarking", ""]
+    block = 0
+    while len(lines) < line_count:
+        lines.extend(
+            [
+                f"# Step {block}: define a helper",
+                "# This annotation spans two lines",
+                f"def helper_{block}(value: int) -> int:",
+                "    # Indented comments stay with the code",
+                f"    result = value + {block}  # inline comment",
+                "    return result",
+                "",
+                f'prompt_{block} = """',
+                "# A markdown heading inside a string",
+                "Body text for the prompt",
+                '"""',
+                "",
+            ]
+        )
+        block += 1
+    return "\n".join(lines) + "\n"
+
+
+def generate_shell_transcript(output_lines: int) -> str:
+    """
+    Generate a shell transcript with one large captured output.
+
+    Args:
+        output_lines: Number of lines in the captured output
+
+    Returns:
+        The generated transcript
+    """
+    return (
+        "# Run the example\n$ python example.py\n"
+        + "".join(f"#{i} {{'field': 'value {i}'}}\n" for i in range(output_lines))
+        + "\n# Then check the result\n$ cat result.json\n{}\n"
+    )
+
+
+def generate_corpus(root: Path, config: CorpusConfig) -> None:
+    """
+    Write a synthetic corpus.
+
+    Every example gets a Python file, a shell transcript, a links file and
+    the configured number of images. Examples are spread over the sections,
+    except every 50th example, which is left out so the build also exercises
+    the default section.
+
+    Args:
+        root: Project root of the corpus (receives examples/ and data/)
+        config: Shape of the corpus
+    """
+    rng = random.Random(config.seed)
+    examples_dir = root / "examples"
+    examples_dir.mkdir(parents=True, exist_ok=True)
+    (root / "data").mkdir(exist_ok=True)
+
+    width = max(3, len(str(config.examples)))
+    section_count = max(1, config.sections)
+    section_examples: List[List[str]] = [[] for _ in range(section_count)]
+
+    for number in range(1, config.examples + 1):
+        name = f"synthetic-{number}"
+        example_id = f"{number:0{width}d}-{name}"
+        example_dir = examples_dir / example_id
+        example_dir.mkdir(exist_ok=True)
+
+        # Vary file sizes a little so examples are not all identical
+        python_lines = max(3, int(config.python_lines * rng.uniform(0.8, 1.2)))
+        (example_dir / f"{name}.py").write_text(
+            generate_python_source(python_lines, f"Synthetic example {number}")
+        )
+        (example_dir / f"{name}.sh").write_text(
+            generate_shell_transcript(config.shell_output_lines)
+        )
+        (example_dir / f"{name}_links.txt").write_text(
+            f"https://example.com/docs/{name}\n"
+        )
+        for image in range(config.images):
+            (example_dir / f"{image + 1:02d}-figure-{image + 1}.png").write_bytes(
+                PNG_BYTES
+            )
+
+        if number % 50:
+            section = (number - 1) * section_count // config.examples
+            section_examples[section].append(example_id)
+
+    sections = []
+    if config.sections:
+        sections = [
+            {
+                "id": f"{index + 1:03d}-section-{index + 1}",
+                "title": f"Section {index + 1}",
+                "description": f"Synthetic section {index + 1}",
+                "order": index + 1,
+                "examples": example_ids,
+            }
+            for index, example_ids in enumerate(section_examples)
+        ]
+    with open(root / "data" / "sections.json", "w") as f:
+        json.dump({"sections": sections}, f, indent=2)
+
+    with open(root / "corpus.json", "w") as f:
+        json.dump(asdict(config), f, indent=2)
+
+
+def ensure_corpus(root: Path, config: CorpusConfig) -> bool:
+    """
+    Generate a corpus unless root already holds one with the same config.
+
+    Args:
+        root: Project root of the corpus
+        config: Shape of the corpus
+
+    Returns:
+        True if the corpus was generated, False if it was reused
+    """
+    config_file = root / "corpus.json"
+    if config_file.exists():
+        with open(config_file, "r") as f:
+            if json.load(f) == asdict(config):
+                return False
+        raise ValueError(f"{root} holds a corpus with a different configuration")
+
+    generate_corpus(root, config)
+    return True
+
+
+def add_corpus_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the corpus shape options to a command-line parser."""
+    parser.add_argument(
+        "--preset",
+        choices=sorted(PRESETS),
+        default="small",
+        help="Corpus shape to start from; the options below override it",
+    )
+    parser.add_argument("--examples", type=int, help="Number of examples")
+    parser.add_argument(
+        "--python-lines", type=int, help="Approximate lines per Python file"
+    )
+    parser.add_argument(
+        "--shell-output-lines",
+        type=int,
+        help="Captured output lines per shell transcript (about 30 bytes each)",
+    )
+    parser.add_argument("--images", type=int, help="Images per example")
+    parser.add_argument("--sections", type=int, help="Number of sections")
+    parser.add_argument("--seed", type=int, help="Random seed")
+
+
+def corpus_config_from_args(args: argparse.Namespace) -> CorpusConfig:
+    """Build a corpus configuration from parsed command-line arguments."""
+    overrides = {
+        key: getattr(args, key)
+        for key in asdict(PRESETS[args.preset])
+        if getattr(args, key) is not None
+    }
+    return replace(PRESETS[args.preset], **overrides)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic example corpus")
+    parser.add_argument("root", help="Directory to write the corpus to")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if ensure_corpus(root, corpus_config_from_args(args)):
+        print(f"Generated corpus in {root}")
+    else:
+        print(f"Corpus in {root} is up to date")
+
+
+if __name__ == "__main__":
+    main()
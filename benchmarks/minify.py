@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Equivalence check and size report for HTML minification.
+
+Renders every page of the shipped catalog (or of a synthetic corpus with
+--corpus), minifies it as --minify does, and checks that nothing visible
+changed:
+
+- the text of the page, with whitespace collapsed as a browser renders it
+  outside code blocks, is the same
+- every <pre> block is byte-identical
+- every element has the same tag, attributes and classes, and the same
+  style declarations once the generated classes are resolved
+
+It prints the size of each page before and after, and exits with a non-zero
+status if any page differs.
+
+Usage:
+    python -m benchmarks.minify
+    python -m benchmarks.minify --corpus --preset 1k
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import tempfile
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks import PROJECT_ROOT
+from benchmarks.corpus import (
+    add_corpus_arguments,
+    corpus_config_from_args,
+    ensure_corpus,
+)
+from benchmarks.page_render import compile_corpus
+import build_static_site
+from site_generator.catalog import decode_catalog
+from site_generator.graph import SiteGraph
+from site_generator.minify import STYLE_CLASS_PREFIX, minify_html
+
+# Elements whose text is rendered with its whitespace
+PREFORMATTED_TAGS = {"pre", "textarea"}
+
+# Inline styles that make an element's whitespace count: white-space modes
+# that keep it, and hidden elements, whose text scripts read (such as the
+# code of the "Copy All" button)
+PREFORMATTED_STYLE = re.compile(r"white-space:\s*pre|display:\s*none")
+
+# Elements whose text is not rendered
+HIDDEN_TAGS = {"script", "style"}
+
+# Elements without an end tag
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr",
+}
+
+# A rule of the <style> block that minify_html generates
+_GENERATED_RULE = re.compile(rf"\.({re.escape(STYLE_CLASS_PREFIX)}\d+)\{{([^}}]*)\}}")
+
+
+def declarations(style: str) -> List[str]:
+    """Normalised declarations of a style attribute or rule."""
+    return [
+        declaration.replace("!important", "").strip()
+        for declaration in style.split(";")
+        if declaration.strip()
+    ]
+
+
+class PageModel(HTMLParser):
+    """What a browser would show of a page: its text and its elements."""
+
+    def __init__(self, generated_rules: Dict[str, List[str]]):
+        super().__init__(convert_charrefs=True)
+        self.generated_rules = generated_rules
+        # Text as (whether its whitespace counts, text)
+        self.text: List[Tuple[bool, str]] = []
+        self.elements: List[Tuple] = []
+        self.open_tags: List[str] = []
+        # How many of the open elements keep their whitespace
+        self.preformatted: List[bool] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        classes = (attributes.pop("class", None) or "").split()
+        inline_style = attributes.pop("style", None) or ""
+        style = declarations(inline_style)
+        for class_name in list(classes):
+            if class_name in self.generated_rules:
+                classes.remove(class_name)
+                style += self.generated_rules[class_name]
+        self.elements.append((tag, sorted(attributes.items()), sorted(classes), style))
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+            self.preformatted.append(
+                tag in PREFORMATTED_TAGS
+                or bool(PREFORMATTED_STYLE.search(inline_style))
+            )
+
+    def handle_endtag(self, tag):
+        if tag in self.open_tags:
+            while self.open_tags:
+                self.preformatted.pop()
+                if self.open_tags.pop() == tag:
+                    break
+
+    def handle_data(self, data):
+        if HIDDEN_TAGS.intersection(self.open_tags):
+            return
+        self.text.append((any(self.preformatted), data))
+
+    def visible_text(self) -> str:
+        """The page's text, with whitespace collapsed where it does not count."""
+        parts = []
+        collapsible = ""
+        for preformatted, data in self.text:
+            if preformatted:
+                parts.append(re.sub(r"\s+", " ", collapsible))
+                parts.append(data)
+                collapsible = ""
+            else:
+                collapsible += data
+        parts.append(re.sub(r"\s+", " ", collapsible))
+        return "".join(parts).strip()
+
+
+def model(page: str) -> Tuple[str, List[Tuple]]:
+    """
+    Parse a page into its visible text and its elements.
+
+    The <style> block of generated classes is resolved into the elements'
+    declarations and left out.
+    """
+    generated_rules = {}
+    for class_name, body in _GENERATED_RULE.findall(page):
+        generated_rules[class_name] = declarations(body)
+    if generated_rules:
+        page = re.sub(
+            rf"<style>(?:{_GENERATED_RULE.pattern})+</style>", "", page, count=1
+        )
+    parser = PageModel(generated_rules)
+    parser.feed(page)
+    parser.close()
+    return parser.visible_text(), parser.elements
+
+
+def differences(page: str, minified: str) -> List[str]:
+    """
+    Compare a page with its minified version.
+
+    Returns:
+        A description of each difference
+    """
+    found = []
+    if re.findall(r"<pre.*?</pre>", page, re.S) != re.findall(
+        r"<pre.*?</pre>", minified, re.S
+    ):
+        found.append("code blocks differ")
+    text, elements = model(page)
+    minified_text, minified_elements = model(minified)
+    if text != minified_text:
+        found.append("visible text differs")
+    if elements != minified_elements:
+        found.append("elements differ")
+    return found
+
+
+def render_pages(graph: SiteGraph) -> Dict[str, str]:
+    """Render the index and every example page of a site, as built."""
+    pages = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        build_static_site.generate_index_html(graph, Path(tmp))
+        pages["index.html"] = (Path(tmp) / "index.html").read_text()
+    for example in graph.examples:
+        pages[f"{example.id}/index.html"] = build_static_site.render_example_page(
+            example, graph.prev(example), graph.next(example)
+        )
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that minified pages show the same thing"
+    )
+    parser.add_argument(
+        "--corpus",
+        action="store_true",
+        help="Render a synthetic corpus instead of data/examples.json",
+    )
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    # Per-page log lines would drown the report
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.corpus:
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus_root = Path(tmp) / "corpus"
+            ensure_corpus(corpus_root, corpus_config_from_args(args))
+            graph = compile_corpus(corpus_root)
+    else:
+        with open(PROJECT_ROOT / "data" / "examples.json", "r") as f:
+            graph = SiteGraph.from_catalog(decode_catalog(json.load(f)))
+
+    failures = 0
+    total_before = total_after = 0
+    print(f"{'before':>8} {'after':>8} {'saved':>6}  page")
+    for name, page in render_pages(graph).items():
+        minified = minify_html(page)
+        before, after = len(page.encode("utf-8")), len(minified.encode("utf-8"))
+        total_before += before
+        total_after += after
+        print(f"{before:>8} {after:>8} {1 - after / before:>6.1%}  {name}")
+        for difference in differences(page, minified):
+            print(f"MISMATCH: {name}: {difference}")
+            failures += 1
+    print(
+        f"{total_before:>8} {total_after:>8} {1 - total_after / total_before:>6.1%}"
+        f"  total, {failures} mismatches"
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
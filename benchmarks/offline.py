@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Update check of the service worker and its precache manifest.
+
+Takes a built site (docs/ by default), publishes a service worker for it as
+--service-worker does, and installs that worker (run with Node.js, against
+an in-memory cache and a server reading the site's files). It then makes a
+new deploy of the site with some pages changed and one removed, publishes
+its worker, and installs and activates that one over the first.
+
+It reports what each install downloaded and the time to list the site for
+the manifest, from scratch and with the hashes of the first deploy, and
+checks that:
+
+- the update downloads exactly the files whose hash changed
+- the cache then holds every file of the new deploy, byte for byte, and
+  nothing of the old one
+- pages are answered from the cache while offline
+
+The script exits with a non-zero status on any mismatch.
+
+Usage:
+    python build_static_site.py && python -m benchmarks.offline
+    python -m benchmarks.offline --site path/to/site --changed 10
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks import PROJECT_ROOT
+from site_generator.compress import is_compressed_copy
+from site_generator.offline import (
+    PRECACHE_MANIFEST_PATH,
+    SERVICE_WORKER_PATH,
+    PrecacheHashes,
+    precache_manifest,
+    write_service_worker,
+)
+from site_generator.output import OutputSync
+
+# Origin and scope the worker is run at
+SCOPE = "https://example.test/"
+
+# Installs and activates the worker of each deploy in turn, sharing one
+# in-memory cache, with fetch reading the files of the deploy served; then
+# asks the last worker for pages while offline
+NODE_HARNESS = r"""
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+const [scope, deploysFile] = process.argv.slice(2);
+const deploys = JSON.parse(fs.readFileSync(deploysFile, 'utf8'));
+
+function requestUrl(request) {
+    return typeof request === 'string' ? request : request.url;
+}
+
+class MemoryCache {
+    constructor() { this.entries = new Map(); }
+    async match(request, options = {}) {
+        let url = requestUrl(request);
+        if (options.ignoreSearch) url = url.split('?')[0];
+        const entry = this.entries.get(url);
+        return entry ? new Response(entry.body, {headers: entry.headers}) : undefined;
+    }
+    async put(request, response) {
+        const body = Buffer.from(await response.arrayBuffer());
+        this.entries.set(requestUrl(request), {body, headers: response.headers});
+    }
+    async keys() { return [...this.entries.keys()].map(url => ({url})); }
+    async delete(request) { return this.entries.delete(requestUrl(request)); }
+}
+
+const cacheStorage = new Map();
+const caches = {
+    async open(name) {
+        if (!cacheStorage.has(name)) cacheStorage.set(name, new MemoryCache());
+        return cacheStorage.get(name);
+    },
+    async keys() { return [...cacheStorage.keys()]; },
+    async delete(name) { return cacheStorage.delete(name); },
+};
+
+let served = null;
+let downloads = [];
+async function fetch(request) {
+    const url = requestUrl(request);
+    if (served === null) throw new TypeError('Failed to fetch (offline)');
+    downloads.push(url);
+    let file = url.slice(scope.length).split('?')[0];
+    if (file === '' || file.endsWith('/')) file += 'index.html';
+    try {
+        return new Response(fs.readFileSync(path.join(served, file)));
+    } catch (e) {
+        return new Response('Not found', {status: 404});
+    }
+}
+
+function loadWorker(site) {
+    const listeners = {};
+    const self = {
+        registration: {scope},
+        clients: {async claim() {}},
+        addEventListener(type, listener) { listeners[type] = listener; },
+    };
+    const context = {self, caches, fetch, Response, URL, console};
+    vm.createContext(context);
+    vm.runInContext(fs.readFileSync(path.join(site, 'sw.js'), 'utf8'), context);
+    return listeners;
+}
+
+async function lifecycle(listeners, type) {
+    let done = Promise.resolve();
+    listeners[type]({waitUntil(promise) { done = promise; }});
+    await done;
+}
+
+(async function() {
+    const installs = [];
+    let listeners = null;
+    for (const site of deploys) {
+        served = site;
+        downloads = [];
+        listeners = loadWorker(site);
+        await lifecycle(listeners, 'install');
+        await lifecycle(listeners, 'activate');
+        installs.push(downloads);
+    }
+
+    const cache = {};
+    for (const [name, storage] of cacheStorage) {
+        for (const [url, entry] of storage.entries) {
+            const digest = crypto.createHash('sha256').update(entry.body).digest('hex');
+            cache[name + ' ' + url] = digest;
+        }
+    }
+
+    // Every cached page, opened while offline
+    served = null;
+    const offline = {};
+    for (const {url} of await (await caches.open([...cacheStorage.keys()][0])).keys()) {
+        if (!url.endsWith('/')) continue;
+        let response = null;
+        listeners.fetch({
+            request: {url: url + '?utm_source=test', method: 'GET', mode: 'navigate'},
+            respondWith(promise) { response = promise; },
+        });
+        try {
+            const body = Buffer.from(await (await response).arrayBuffer());
+            offline[url] = crypto.createHash('sha256').update(body).digest('hex');
+        } catch (e) {
+            offline[url] = null;
+        }
+    }
+    console.log(JSON.stringify({installs, cache, offline}));
+})().catch(err => { console.error(err); process.exit(1); });
+"""
+
+
+def site_outputs(root: Path) -> OutputSync:
+    """
+    Track the files of a built site as the outputs of a build.
+
+    The site's own service worker, manifests and compressed copies are left
+    out, as the build lists the site before publishing them.
+    """
+    outputs = OutputSync(root)
+    manifest_prefix = PRECACHE_MANIFEST_PATH[: -len(".json")] + "."
+    for path in sorted(root.rglob("*")):
+        relative = path.relative_to(root).as_posix()
+        if (
+            path.is_file()
+            and relative != SERVICE_WORKER_PATH
+            and not relative.startswith(manifest_prefix)
+            and not is_compressed_copy(relative)
+        ):
+            outputs.keep_file(path)
+    return outputs
+
+
+def file_hashes(root: Path) -> Dict[str, str]:
+    """SHA-256 of every file of a site, by URL under SCOPE."""
+    hashes = {}
+    for path in root.rglob("*"):
+        if path.is_file():
+            relative = path.relative_to(root).as_posix()
+            if relative == "index.html" or relative.endswith("/index.html"):
+                relative = relative[: -len("index.html")]
+            hashes[SCOPE + relative] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return hashes
+
+
+def make_deploys(site: Path, work: Path, changed: int) -> List[Path]:
+    """
+    Publish a worker for a site, then for a new deploy of it.
+
+    Args:
+        site: The built site
+        work: Directory the two deploys are written to
+        changed: Number of pages changed by the new deploy (one more is
+            removed)
+
+    Returns:
+        The two deploys
+    """
+    first = work / "first"
+    shutil.copytree(site, first)
+    outputs = site_outputs(first)
+    hashes = PrecacheHashes(work / "precache.json")
+    write_service_worker(outputs, hashes)
+    hashes.save(outputs.emitted)
+
+    # Copies keep their modification times, so the hashes stay valid
+    second = work / "second"
+    shutil.copytree(first, second)
+    pages = sorted(second.glob("*/index.html"))
+    removed = pages.pop()
+    shutil.rmtree(removed.parent)
+    for page in pages[:changed]:
+        page.write_text(page.read_text() + "<!-- changed -->\n")
+    outputs = site_outputs(second)
+    outputs.written.update(
+        page.relative_to(second).as_posix() for page in pages[:changed]
+    )
+
+    start = time.perf_counter()
+    precache_manifest(outputs)
+    cold = time.perf_counter() - start
+    hashes = PrecacheHashes(work / "precache.json")
+    start = time.perf_counter()
+    precache_manifest(outputs, hashes)
+    cached = time.perf_counter() - start
+    print(f"listing the site:    {cold * 1000:8.1f} ms from scratch")
+    print(f"                     {cached * 1000:8.1f} ms with the previous hashes")
+
+    write_service_worker(outputs, hashes)
+    return [first, second]
+
+
+def manifest_of(site: Path) -> Tuple[str, Dict[str, str]]:
+    """
+    The manifest published for a site.
+
+    Returns:
+        Tuple containing (the manifest's URL, the hash of every file it lists
+        by URL)
+    """
+    worker = (site / SERVICE_WORKER_PATH).read_text()
+    manifest_path = json.loads(worker.split("PRECACHE_MANIFEST = ", 1)[1].split(";")[0])
+    files = json.loads((site / manifest_path).read_text())["files"]
+    return SCOPE + manifest_path, {
+        SCOPE + ("" if url == "./" else url): digest for url, digest in files.items()
+    }
+
+
+def check(deploys: List[Path], result: Dict) -> int:
+    """
+    Check what the workers downloaded and cached, and print the downloads.
+
+    Returns:
+        Number of mismatches
+    """
+    failures = 0
+    manifests = [manifest_of(site) for site in deploys]
+    old, (manifest_url, new) = manifests[0][1], manifests[1]
+    expected_downloads = [
+        set(old),
+        {url for url, digest in new.items() if old.get(url) != digest},
+    ]
+    for number, (site, downloads) in enumerate(zip(deploys, result["installs"])):
+        files = file_hashes(site)
+        # Leave out the manifest, which every install downloads
+        downloaded = {url for url in downloads if url in files} - {
+            manifests[number][0]
+        }
+        size = sum(
+            Path(site, url[len(SCOPE) :], "index.html" if url.endswith("/") else "")
+            .stat()
+            .st_size
+            for url in downloaded
+        )
+        print(
+            f"install {number + 1}:           {len(downloaded):8d} files, "
+            f"{size} bytes downloaded (of {len(new if number else old)} listed)"
+        )
+        if downloaded != expected_downloads[number]:
+            print(f"MISMATCH: install {number + 1} downloaded the wrong files")
+            failures += 1
+
+    files = file_hashes(deploys[1])
+    cached = {key.split(" ", 1)[1]: digest for key, digest in result["cache"].items()}
+    for url in new:
+        if cached.get(url) != files[url]:
+            print(f"MISMATCH: {url} is not cached as deployed")
+            failures += 1
+    # Besides the files, the cache holds the manifest and the cached hashes
+    for url in set(cached) - set(new) - {manifest_url, SCOPE + "precache-hashes"}:
+        print(f"MISMATCH: {url} is still cached")
+        failures += 1
+    for url, digest in result["offline"].items():
+        if digest != files.get(url):
+            print(f"MISMATCH: {url} differs offline")
+            failures += 1
+    print(
+        f"offline:             {len(result['offline']):8d} pages opened from the "
+        "cache"
+    )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check how the service worker updates its cache"
+    )
+    parser.add_argument(
+        "--site",
+        type=Path,
+        default=PROJECT_ROOT / "docs",
+        help="A built site (defaults to docs/)",
+    )
+    parser.add_argument(
+        "--changed",
+        type=int,
+        default=3,
+        help="Number of pages the new deploy changes",
+    )
+    args = parser.parse_args()
+
+    # Per-build log lines would drown the report
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if shutil.which("node") is None:
+        print("Node.js is not installed, the service worker cannot be run")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deploys = make_deploys(args.site, Path(tmp), args.changed)
+        deploys_file = Path(tmp) / "deploys.json"
+        deploys_file.write_text(json.dumps([str(site) for site in deploys]))
+        harness = Path(tmp) / "harness.js"
+        harness.write_text(NODE_HARNESS)
+        completed = subprocess.run(
+            ["node", str(harness), SCOPE, str(deploys_file)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        failures = check(deploys, json.loads(completed.stdout))
+    print(f"{failures} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
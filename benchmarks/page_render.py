@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Per-page render benchmark.
+
+Compiles a synthetic corpus (or the shipped examples with --shipped) once,
+then renders every example page in memory several times and reports the
+render cost per page: mean, median, 95th percentile and maximum, plus the
+average page size. Nothing is written to disk, so only rendering is timed.
+
+With --highlight, code is highlighted at build time (without the persistent
+cache). The first render of each page then highlights its code and is
+reported separately as the cold time; later renders reuse the highlighted
+code, as an incremental build does.
+
+Usage:
+    python -m benchmarks.page_render --preset 1k --repeat 5
+    python -m benchmarks.page_render --shipped --highlight
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from benchmarks import PROJECT_ROOT
+from benchmarks.corpus import (
+    add_corpus_arguments,
+    corpus_config_from_args,
+    ensure_corpus,
+)
+import build_examples
+import build_static_site
+from site_generator.catalog import decode_catalog
+from site_generator.graph import SiteGraph
+from site_generator.highlight import Highlighter
+from site_generator.inventory import Inventory
+
+
+def compile_corpus(corpus_root: Path) -> SiteGraph:
+    """Compile the examples of a corpus, without the build cache."""
+    inventory = Inventory.scan(corpus_root / "examples")
+    examples, sections = build_examples.process_examples(
+        inventory.directories, corpus_root, None, 1
+    )
+    return SiteGraph(list(examples), sections)
+
+
+def measure(graph: SiteGraph, repeat: int) -> Dict[str, Any]:
+    """
+    Render every page of a site repeatedly.
+
+    Args:
+        graph: Navigation of the site
+        repeat: Number of renders per page (the fastest one counts)
+
+    Returns:
+        Per-page statistics, times in microseconds
+    """
+    timings = []
+    cold_timings = []
+    page_bytes = 0
+    for example in graph.examples:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            page = build_static_site.render_example_page(
+                example, graph.prev(example), graph.next(example)
+            )
+            elapsed = time.perf_counter_ns() - start
+            if best is None:
+                cold_timings.append(elapsed / 1000)
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best / 1000)
+        page_bytes += len(page.encode("utf-8"))
+
+    timings.sort()
+    return {
+        "pages": len(timings),
+        "cold_mean_us": round(statistics.fmean(cold_timings), 1),
+        "mean_us": round(statistics.fmean(timings), 1),
+        "median_us": round(statistics.median(timings), 1),
+        "p95_us": round(timings[int(0.95 * (len(timings) - 1))], 1),
+        "max_us": round(timings[-1], 1),
+        "mean_kib": round(page_bytes / len(timings) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the rendering of each page")
+    add_corpus_arguments(parser)
+    parser.add_argument(
+        "--shipped",
+        action="store_true",
+        help="Render the catalog in data/examples.json instead of a corpus",
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        type=str,
+        help="Keep the corpus in this directory and reuse it on later runs",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Renders per page (best is kept)"
+    )
+    parser.add_argument(
+        "--highlight",
+        action="store_true",
+        help="Highlight code at build time with Pygments",
+    )
+    args = parser.parse_args()
+
+    # Per-page log lines would dominate the timings
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.shipped:
+        with open(PROJECT_ROOT / "data" / "examples.json", "r") as f:
+            catalog = decode_catalog(json.load(f))
+        graph = SiteGraph.from_catalog(catalog)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus_root = Path(args.corpus_dir or Path(tmp) / "corpus")
+            ensure_corpus(corpus_root, corpus_config_from_args(args))
+            graph = compile_corpus(corpus_root)
+
+    if args.highlight:
+        build_static_site.set_highlighter(Highlighter())
+
+    results = measure(graph, args.repeat)
+    print(
+        f"{'pages':>8} {'cold us':>10} {'mean us':>10} {'median us':>10} "
+        f"{'p95 us':>10} {'max us':>10} {'KiB/page':>9}"
+    )
+    print(
+        f"{results['pages']:>8} {results['cold_mean_us']:>10.1f} "
+        f"{results['mean_us']:>10.1f} "
+        f"{results['median_us']:>10.1f} {results['p95_us']:>10.1f} "
+        f"{results['max_us']:>10.1f} {results['mean_kib']:>9.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Build and query benchmark of the search index.
+
+Builds the search index of the shipped catalog (or of a synthetic corpus with
+--corpus) from scratch, from a full cache and with one changed example, and
+reports the times and the size of the index. It then types a set of queries
+into the browser's search code (static/js/script.js, run with Node.js) one
+keystroke at a time, and reports the time of each keystroke and of repeated
+queries.
+
+Every result list is checked against a reference search over the terms of
+each example, so the serialised index is checked too. The script exits with
+a non-zero status on any mismatch. Without Node.js only the build is
+measured.
+
+Usage:
+    python -m benchmarks.search
+    python -m benchmarks.search --corpus --preset 1k
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import logging
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks import PROJECT_ROOT
+from benchmarks.corpus import (
+    add_corpus_arguments,
+    corpus_config_from_args,
+    ensure_corpus,
+)
+from benchmarks.page_render import compile_corpus
+from site_generator.catalog import decode_catalog, example_fingerprint
+from site_generator.graph import SiteGraph
+from site_generator.models import Example
+from site_generator.search import (
+    STOP_WORDS,
+    SearchIndexCache,
+    build_search_index,
+    example_terms,
+)
+
+# Must match MAX_PREFIX_TERMS in script.js
+MAX_PREFIX_TERMS = 30
+
+# Runs the search code of script.js on queries: loads the index, then types
+# each query one character at a time, timing every keystroke, and finally
+# times each full query again once its postings are decoded
+NODE_HARNESS = r"""
+const fs = require('fs');
+const vm = require('vm');
+const [script, indexFile, queriesFile, repeat] = process.argv.slice(2);
+const context = {document: {addEventListener() {}}, console: console};
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(script, 'utf8'), context);
+
+const now = () => Number(process.hrtime.bigint()) / 1000;
+let start = now();
+const index = context.parseSearchIndex(JSON.parse(fs.readFileSync(indexFile, 'utf8')));
+const parse = now() - start;
+
+const queries = JSON.parse(fs.readFileSync(queriesFile, 'utf8'));
+const keystrokes = [];
+const results = {};
+for (const query of queries) {
+    for (let length = 1; length <= query.length; length++) {
+        const typed = query.slice(0, length);
+        start = now();
+        const found = context.searchExamples(index, typed);
+        keystrokes.push(now() - start);
+        results[typed] = Array.from(found);
+    }
+}
+const repeated = [];
+for (const query of queries) {
+    let best = Infinity;
+    for (let i = 0; i < Number(repeat); i++) {
+        start = now();
+        context.searchExamples(index, query);
+        best = Math.min(best, now() - start);
+    }
+    repeated.push(best);
+}
+console.log(JSON.stringify({parse, keystrokes, repeated, results}));
+"""
+
+
+def reference_search(
+    terms: List[Dict[str, int]], sorted_terms: List[str], query: str
+) -> List[int]:
+    """
+    Search the examples' terms the way script.js searches the index.
+
+    Args:
+        terms: The terms of each example, with their field
+        sorted_terms: Every term, sorted
+        query: The query
+
+    Returns:
+        Numbers of the matching examples, best first
+    """
+    words = [
+        word
+        for word in re.split(r"\W+", query.lower())
+        if len(word) >= 2 and word not in STOP_WORDS
+    ]
+    if not words:
+        return []
+    scores = [0] * len(terms)
+    matched_words = [0] * len(terms)
+    for word in words:
+        first = bisect.bisect_left(sorted_terms, word)
+        matching = [
+            term
+            for term in sorted_terms[first : first + MAX_PREFIX_TERMS]
+            if term.startswith(word)
+        ]
+        for number, fields in enumerate(terms):
+            best = 0
+            for term in matching:
+                field = fields.get(term)
+                if field is not None:
+                    best = max(best, field * 2 + (2 if term == word else 1))
+            if best:
+                scores[number] += best
+                matched_words[number] += 1
+    found = [number for number in range(len(terms)) if matched_words[number] == len(words)]
+    return sorted(found, key=lambda number: (-scores[number], number))
+
+
+def make_queries(terms: List[Dict[str, int]], count: int, seed: int) -> List[str]:
+    """
+    Pick queries that hit the index: single terms and pairs of terms of the
+    same example, plus a word that matches nothing.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        example_terms = sorted(rng.choice(terms))
+        if not example_terms:
+            continue
+        if rng.random() < 0.5:
+            queries.append(rng.choice(example_terms))
+        else:
+            queries.append(" ".join(rng.sample(example_terms, min(2, len(example_terms)))))
+    queries.append("zzzqqq")
+    return queries
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """The value below which the given fraction of values fall."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_builds(examples: List[Example]) -> Tuple[str, int]:
+    """
+    Time a cold, a cached and an incremental build of the index, and print
+    them with its size.
+
+    Args:
+        examples: The examples, in display order
+
+    Returns:
+        Tuple containing (the serialised index, 1 if the index built from the
+        cache differs from the cold one, else 0)
+    """
+    # Examples of a sharded catalog carry their fingerprint; give compiled
+    # ones theirs up front, so the builds below time the index alone
+    start = time.perf_counter()
+    for example in examples:
+        example.content_hash = example_fingerprint(example)
+    fingerprints = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = Path(tmp) / "search.json"
+
+        start = time.perf_counter()
+        cache = SearchIndexCache(cache_file)
+        index = build_search_index(examples, cache)
+        cold = time.perf_counter() - start
+        cache.save(example.id for example in examples)
+
+        start = time.perf_counter()
+        cache = SearchIndexCache(cache_file)
+        cached_index = build_search_index(examples, cache)
+        cached = time.perf_counter() - start
+        failures = 0
+        if cached_index != index:
+            print("MISMATCH: the index built from the cache differs")
+            failures += 1
+
+        # One changed example, whose cached terms no longer match
+        cache.entries[examples[len(examples) // 2].id]["fingerprint"] = "changed"
+        start = time.perf_counter()
+        build_search_index(examples, cache)
+        incremental = time.perf_counter() - start
+
+    raw = len(index.encode("utf-8"))
+    compressed = len(gzip.compress(index.encode("utf-8"), compresslevel=9))
+    print(f"index of {len(examples)} examples: {raw} bytes, {compressed} gzipped")
+    print(f"fingerprints:        {fingerprints * 1000:8.1f} ms")
+    print(f"cold build:          {cold * 1000:8.1f} ms")
+    print(f"cached build:        {cached * 1000:8.1f} ms (including loading the cache)")
+    print(f"one example changed: {incremental * 1000:8.1f} ms")
+    return index, failures
+
+
+def time_queries(
+    index: str, terms: List[Dict[str, int]], queries: List[str], repeat: int
+) -> int:
+    """
+    Time the browser's search code on queries and check its results.
+
+    Args:
+        index: The serialised index
+        terms: The terms of each example, with their field
+        queries: The queries, typed one keystroke at a time
+        repeat: Runs of each full query (the fastest one counts)
+
+    Returns:
+        Number of keystrokes whose results differ from the reference search
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file = Path(tmp) / "index.json"
+        index_file.write_text(index)
+        queries_file = Path(tmp) / "queries.json"
+        queries_file.write_text(json.dumps(queries))
+        harness = Path(tmp) / "harness.js"
+        harness.write_text(NODE_HARNESS)
+        completed = subprocess.run(
+            [
+                "node",
+                str(harness),
+                str(PROJECT_ROOT / "static" / "js" / "script.js"),
+                str(index_file),
+                str(queries_file),
+                str(repeat),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    timings = json.loads(completed.stdout)
+
+    sorted_terms = sorted({term for example_terms in terms for term in example_terms})
+    failures = 0
+    for typed, found in timings["results"].items():
+        if found != reference_search(terms, sorted_terms, typed):
+            print(f"MISMATCH: results for {typed!r} differ")
+            failures += 1
+
+    keystrokes = timings["keystrokes"]
+    repeated = timings["repeated"]
+    print(f"index parse:         {timings['parse'] / 1000:8.1f} ms")
+    print(
+        f"per keystroke:       {statistics.mean(keystrokes):8.1f} us mean, "
+        f"{statistics.median(keystrokes):.1f} us median, "
+        f"{percentile(keystrokes, 0.95):.1f} us p95, {max(keystrokes):.1f} us max "
+        f"({len(keystrokes)} keystrokes, the first one with the code not yet "
+        "optimised)"
+    )
+    print(
+        f"per repeated query:  {statistics.mean(repeated):8.1f} us mean, "
+        f"{percentile(repeated, 0.95):.1f} us p95, {max(repeated):.1f} us max"
+    )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time building and querying the search index"
+    )
+    parser.add_argument(
+        "--corpus",
+        action="store_true",
+        help="Index a synthetic corpus instead of data/examples.json",
+    )
+    parser.add_argument(
+        "--queries", type=int, default=50, help="Number of queries typed"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Runs of each full query"
+    )
+    parser.add_argument(
+        "--query-seed", type=int, default=0, help="Random seed of the queries"
+    )
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    # Per-build log lines would drown the report
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.corpus:
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus_root = Path(tmp) / "corpus"
+            ensure_corpus(corpus_root, corpus_config_from_args(args))
+            graph = compile_corpus(corpus_root)
+    else:
+        with open(PROJECT_ROOT / "data" / "examples.json", "r") as f:
+            graph = SiteGraph.from_catalog(decode_catalog(json.load(f)))
+
+    index, failures = time_builds(graph.examples)
+    if shutil.which("node") is None:
+        print("Node.js is not installed, queries were not timed")
+    else:
+        terms = [example_terms(example) for example in graph.examples]
+        queries = make_queries(terms, args.queries, args.query_seed)
+        failures += time_queries(index, terms, queries, args.repeat)
+    print(f"{failures} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
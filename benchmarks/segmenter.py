@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Python segmenter in build_examples.py.
+
+Generates synthetic annotated Python files of increasing size and times
+extract_python_segments on each, so the per-line cost can be checked to stay
+flat as files grow.
+
+Usage:
+    python -m benchmarks.segmenter --sizes 10000 30000 100000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks import PROJECT_ROOT  # noqa: F401 (sets up sys.path)
+from benchmarks.corpus import generate_python_source
+from build_examples import extract_python_segments
+
+
+def run(sizes: List[int], repeat: int) -> None:
+    """
+    Time the segmenter for each file size and print a summary table.
+
+    Args:
+        sizes: Line counts of the synthetic files
+        repeat: Number of timed runs per size (the best run is reported)
+    """
+    print(f"{'lines':>10} {'segments':>10} {'best (s)':>10} {'us/line':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            source_file = Path(tmp) / f"synthetic_{size}.py"
+            source_file.write_text(generate_python_source(size))
+            line_count = source_file.read_text().count("\n")
+
+            best = float("inf")
+            segments = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                segments = extract_python_segments(source_file)
+                best = min(best, time.perf_counter() - start)
+
+            print(
+                f"{line_count:>10} {len(segments):>10} {best:>10.3f} "
+                f"{best / line_count * 1e6:>10.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Python segmenter")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10000, 30000, 100000],
+        help="Line counts of the synthetic files",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
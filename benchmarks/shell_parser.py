@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Equivalence check and benchmark for the shell transcript parser.
+
+The line-oriented parser in build_examples.py replaced a single regex over the
+whole file. This module keeps that regex as a reference and:
+
+- checks both produce identical segments for every examples/*/*.sh file
+- checks both agree on randomly generated transcripts (fuzzing)
+- times both on transcripts with large captured outputs
+
+It exits with a non-zero status if any input parses differently.
+
+Usage:
+    python -m benchmarks.shell_parser --fuzz 5000 --sizes 1000 10000 100000
+"""
+
+import argparse
+import io
+import random
+import re
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks import PROJECT_ROOT
+from benchmarks.corpus import generate_shell_transcript
+from build_examples import parse_shell_transcript
+
+# The regex used by extract_shell_segments before the line-oriented parser
+REFERENCE_PATTERN = re.compile(
+    r"(?:^|\n)(?:# (.+?)(?:\n|$))?(?:\$ (.+?)(?:\n|$))((?:(?!\n\$|\n#).+?\n?)*)",
+    re.MULTILINE,
+)
+
+# Line shapes that exercise every branch of the grammar
+FUZZ_LINES = [
+    "# explain this",
+    "# ",
+    "#",
+    "#comment",
+    "$ echo hello",
+    "$  ",
+    "$ ",
+    "$",
+    "$nospace",
+    "output line",
+    "  indented output",
+    " ",
+    "",
+    "",
+    "# $ not a command",
+    "$ # comment-like command",
+]
+
+
+def reference_segments(content: str) -> List[Dict[str, Any]]:
+    """Parse a transcript with the original regex."""
+    return [
+        {
+            "explanation": match.group(1) or "",
+            "command": match.group(2).strip(),
+            "output": match.group(3).strip(),
+        }
+        for match in REFERENCE_PATTERN.finditer(content)
+    ]
+
+
+def line_segments(content: str) -> List[Dict[str, Any]]:
+    """Parse a transcript with the line-oriented parser."""
+    return [
+        segment.to_dict()
+        for segment in parse_shell_transcript(io.StringIO(content))
+    ]
+
+
+def check_examples() -> int:
+    """
+    Compare both parsers on the shipped shell transcripts.
+
+    Returns:
+        Number of files that parse differently
+    """
+    mismatches = 0
+    shell_files = sorted((PROJECT_ROOT / "examples").glob("*/*.sh"))
+    for shell_file in shell_files:
+        content = shell_file.read_text()
+        if reference_segments(content) != line_segments(content):
+            print(f"MISMATCH: {shell_file.relative_to(PROJECT_ROOT)}")
+            mismatches += 1
+    print(f"Checked {len(shell_files)} example transcripts, {mismatches} mismatches")
+    return mismatches
+
+
+def check_fuzz(iterations: int, seed: int) -> int:
+    """
+    Compare both parsers on random transcripts.
+
+    Returns:
+        Number of generated transcripts that parse differently
+    """
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(iterations):
+        lines = [rng.choice(FUZZ_LINES) for _ in range(rng.randint(0, 12))]
+        content = "\n".join(lines) + rng.choice(["", "\n"])
+        if reference_segments(content) != line_segments(content):
+            if mismatches < 5:
+                print(f"MISMATCH: {content!r}")
+            mismatches += 1
+    print(f"Fuzzed {iterations} transcripts (seed {seed}), {mismatches} mismatches")
+    return mismatches
+
+
+def benchmark(sizes: List[int]) -> None:
+    """
+    Time both parsers on a transcript with one large captured output.
+
+    Args:
+        sizes: Number of output lines in each generated transcript
+    """
+    print(f"{'lines':>10} {'bytes':>12} {'regex (s)':>10} {'lines (s)':>10}")
+    for size in sizes:
+        content = generate_shell_transcript(size)
+
+        start = time.perf_counter()
+        reference_segments(content)
+        regex_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        line_segments(content)
+        line_time = time.perf_counter() - start
+
+        print(f"{size:>10} {len(content):>12} {regex_time:>10.3f} {line_time:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check and benchmark the shell transcript parser"
+    )
+    parser.add_argument("--fuzz", type=int, default=5000, help="Random transcripts")
+    parser.add_argument("--seed", type=int, default=0, help="Fuzzing seed")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Output line counts for the benchmark",
+    )
+    args = parser.parse_args()
+
+    mismatches = check_examples() + check_fuzz(args.fuzz, args.seed)
+    benchmark(args.sizes)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
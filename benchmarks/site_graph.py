@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Equivalence check and benchmark for the site graph.
+
+SiteGraph replaced find_next_example and find_prev_example in
+build_static_site.py, which scanned and sorted the whole catalog for every
+page. This module keeps those functions as a reference and:
+
+- checks both agree on every example of the shipped catalog
+- checks both agree on random catalogs with shared orders and sections
+  (fuzzing)
+- times both on catalogs of increasing size
+
+It exits with a non-zero status if any link differs.
+
+Usage:
+    python -m benchmarks.site_graph --fuzz 2000 --sizes 1000 5000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import List, Optional
+
+from benchmarks import PROJECT_ROOT
+from site_generator.catalog import decode_catalog
+from site_generator.graph import SiteGraph
+from site_generator.models import Example, Section
+
+
+def reference_next(examples: List[Example], current: Example) -> Optional[Example]:
+    """Find the next example as find_next_example did."""
+    if current.section_id:
+        same_section = [e for e in examples if e.section_id == current.section_id]
+        for example in sorted(same_section, key=lambda e: e.order):
+            if example.order > current.order:
+                return example
+
+    for example in sorted(examples, key=lambda e: e.order):
+        if example.order > current.order:
+            return example
+    return None
+
+
+def reference_prev(examples: List[Example], current: Example) -> Optional[Example]:
+    """Find the previous example as find_prev_example did."""
+    if current.section_id:
+        same_section = [e for e in examples if e.section_id == current.section_id]
+        for example in sorted(same_section, key=lambda e: e.order, reverse=True):
+            if example.order < current.order:
+                return example
+
+    for example in sorted(examples, key=lambda e: e.order, reverse=True):
+        if example.order < current.order:
+            return example
+    return None
+
+
+def mismatches(examples: List[Example], sections: List[Section]) -> List[str]:
+    """
+    Compare the graph's links with the reference functions.
+
+    Returns:
+        A description of every link that differs
+    """
+    graph = SiteGraph(examples, sections)
+    differences = []
+    for example in examples:
+        for name, expected, actual in (
+            ("prev", reference_prev(examples, example), graph.prev(example)),
+            ("next", reference_next(examples, example), graph.next(example)),
+        ):
+            if expected is not actual:
+                differences.append(
+                    f"{example.id} {name}: expected "
+                    f"{expected.id if expected else None}, "
+                    f"got {actual.id if actual else None}"
+                )
+    return differences
+
+
+def random_catalog(rng: random.Random, size: int) -> List[Example]:
+    """Generate examples with clashing orders and a mix of sections."""
+    section_ids = [None, "", "001-a", "002-b", "003-c"]
+    return [
+        Example(
+            id=f"{number:03d}-example",
+            title=f"Example {number}",
+            order=rng.randint(0, size),
+            section_id=rng.choice(section_ids),
+        )
+        for number in range(size)
+    ]
+
+
+def check_catalog() -> int:
+    """
+    Compare the links of the shipped catalog.
+
+    Returns:
+        Number of links that differ
+    """
+    with open(PROJECT_ROOT / "data" / "examples.json", "r") as f:
+        catalog = decode_catalog(json.load(f))
+    differences = mismatches(catalog.examples, catalog.sections)
+    for difference in differences:
+        print(f"MISMATCH: {difference}")
+    print(
+        f"Checked {len(catalog.examples)} catalog examples, "
+        f"{len(differences)} mismatches"
+    )
+    return len(differences)
+
+
+def check_fuzz(iterations: int, seed: int) -> int:
+    """
+    Compare the links of random catalogs.
+
+    Returns:
+        Number of catalogs with links that differ
+    """
+    rng = random.Random(seed)
+    failures = 0
+    for _ in range(iterations):
+        examples = random_catalog(rng, rng.randint(0, 12))
+        differences = mismatches(examples, [])
+        if differences:
+            if failures < 5:
+                print(f"MISMATCH: {differences[0]}")
+            failures += 1
+    print(f"Fuzzed {iterations} catalogs (seed {seed}), {failures} mismatches")
+    return failures
+
+
+def benchmark(sizes: List[int]) -> None:
+    """
+    Time the links of every example with both implementations.
+
+    Args:
+        sizes: Number of examples in each generated catalog
+    """
+    rng = random.Random(0)
+    print(f"{'examples':>10} {'reference (s)':>14} {'graph (s)':>10}")
+    for size in sizes:
+        examples = random_catalog(rng, size)
+
+        start = time.perf_counter()
+        for example in examples:
+            reference_prev(examples, example)
+            reference_next(examples, example)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph = SiteGraph(examples, [])
+        for example in examples:
+            graph.prev(example)
+            graph.next(example)
+        graph_time = time.perf_counter() - start
+
+        print(f"{size:>10} {reference_time:>14.3f} {graph_time:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check and benchmark the site graph's navigation links"
+    )
+    parser.add_argument("--fuzz", type=int, default=2000, help="Random catalogs")
+    parser.add_argument("--seed", type=int, default=0, help="Fuzzing seed")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[500, 1000, 2000],
+        help="Catalog sizes for the benchmark",
+    )
+    args = parser.parse_args()
+
+    failures = check_catalog() + check_fuzz(args.fuzz, args.seed)
+    benchmark(args.sizes)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Stage-level benchmark of the site build on a synthetic corpus.
+
+Generates (or reuses) a synthetic corpus and times each build stage on it
+separately: scan, segment, shell parse, compile, section resolution, JSON
+write, JSON load, site graph, page render, search index, llms files and
+sitemap. Results are written as JSON so runs can be compared, and --compare
+prints the ratio of every stage to an earlier result file.
+
+Usage:
+    python -m benchmarks.stages --preset 1k --output benchmarks/results/1k.json
+    python -m benchmarks.stages --preset 1k --compare benchmarks/results/1k.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import resource
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from benchmarks import PROJECT_ROOT  # noqa: F401 (sets up sys.path)
+from benchmarks.corpus import (
+    CorpusConfig,
+    add_corpus_arguments,
+    corpus_config_from_args,
+    ensure_corpus,
+)
+import build_examples
+import build_static_site
+from site_generator.catalog import CATALOG_VERSION, decode_catalog
+from site_generator.graph import SiteGraph
+from site_generator.inventory import Inventory
+
+RESULTS_VERSION = 1
+
+
+class StageTimer:
+    """Collects the wall time and item count of each stage."""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block as one stage.
+
+        Args:
+            name: Stage name
+            items: Number of items (files, examples, pages) the stage handles
+
+        Yields:
+            The stage's record, so the block can set "items" once known
+        """
+        record: Dict[str, Any] = {"seconds": 0.0, "items": items}
+        start = time.perf_counter()
+        yield record
+        seconds = time.perf_counter() - start
+        record["seconds"] = round(seconds, 6)
+        self.stages[name] = record
+        print(f"{name:<20} {record['items']:>8} {seconds:>10.3f}s")
+
+
+def run_stages(
+    corpus_root: Path, output_dir: Path, jobs: int, schema: int
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every build stage on a corpus.
+
+    Args:
+        corpus_root: Project root of the corpus
+        output_dir: Directory receiving the catalog and the generated site
+        jobs: Worker processes used by the compile stage
+        schema: Catalog version written by the JSON write stage
+
+    Returns:
+        Timings per stage
+    """
+    timer = StageTimer()
+
+    with timer.stage("scan") as record:
+        inventory = Inventory.scan(corpus_root / "examples")
+        record["items"] = len(inventory.directories)
+
+    python_files = [
+        entry.path
+        for directory in inventory.directories
+        for entry in directory.files_with_suffix(".py")[:1]
+    ]
+    with timer.stage("segment", len(python_files)):
+        for python_file in python_files:
+            build_examples.extract_python_segments(python_file)
+
+    shell_files = [
+        entry.path
+        for directory in inventory.directories
+        for entry in directory.files_with_suffix(".sh")[:1]
+    ]
+    with timer.stage("shell_parse", len(shell_files)):
+        for shell_file in shell_files:
+            build_examples.extract_shell_segments(shell_file)
+
+    # Full compile, without the build cache, including section assignment
+    with timer.stage("compile", len(inventory.directories)):
+        examples, sections = build_examples.process_examples(
+            inventory.directories, corpus_root, None, jobs
+        )
+        examples = list(examples)
+
+    with timer.stage("section_resolution", len(examples)):
+        build_examples.resolve_sections(
+            [example.id for example in examples],
+            build_examples.load_sections(corpus_root),
+        )
+
+    catalog_file = output_dir / "examples.json"
+    with timer.stage("json_write", len(examples)):
+        build_examples.write_catalog(iter(examples), sections, catalog_file, schema)
+
+    with timer.stage("json_load", len(examples)):
+        with open(catalog_file, "r") as f:
+            loaded = decode_catalog(json.load(f))
+        examples, sections = loaded.examples, loaded.sections
+
+    with timer.stage("site_graph", len(examples)):
+        graph = SiteGraph(examples, sections)
+
+    site_dir = output_dir / "docs"
+    site_dir.mkdir(exist_ok=True)
+    with timer.stage("index_render", 1):
+        build_static_site.generate_index_html(graph, site_dir)
+
+    with timer.stage("page_render", len(examples)):
+        for example in examples:
+            build_static_site.generate_example_html(
+                example, graph, site_dir, inventory, corpus_root
+            )
+
+    with timer.stage("search_index", len(examples)):
+        build_static_site.generate_search_index(graph, site_dir)
+
+    with timer.stage("llms_files", 2):
+        build_static_site.generate_llms_ctx_txt(graph, site_dir)
+        build_static_site.generate_llms_txt(graph, site_dir)
+
+    with timer.stage("sitemap", len(examples) + 1):
+        build_static_site.generate_sitemap(graph, site_dir)
+
+    return timer.stages
+
+
+def corpus_size(corpus_root: Path) -> Dict[str, int]:
+    """Count the files and bytes of a corpus's examples."""
+    inventory = Inventory.scan(corpus_root / "examples")
+    files = inventory.files()
+    return {
+        "files": len(files),
+        "bytes": sum(entry.size for entry in files.values()),
+    }
+
+
+def compare(results: Dict[str, Any], baseline_file: Path) -> None:
+    """
+    Print every stage's time next to the same stage of an earlier run.
+
+    Args:
+        results: Results of this run
+        baseline_file: Results file of the earlier run
+    """
+    with open(baseline_file, "r") as f:
+        baseline = json.load(f)
+    if baseline.get("corpus") != results["corpus"]:
+        print("Warning: the baseline was measured on a different corpus")
+
+    print(f"\n{'stage':<20} {'baseline':>10} {'current':>10} {'ratio':>8}")
+    for name, stage in results["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if before is None:
+            print(f"{name:<20} {'-':>10} {stage['seconds']:>10.3f}")
+            continue
+        ratio = stage["seconds"] / before["seconds"] if before["seconds"] else 0.0
+        print(
+            f"{name:<20} {before['seconds']:>10.3f} {stage['seconds']:>10.3f} "
+            f"{ratio:>7.2f}x"
+        )
+
+
+def run(
+    config: CorpusConfig,
+    corpus_dir: Optional[Path],
+    jobs: int,
+    schema: int,
+) -> Dict[str, Any]:
+    """
+    Prepare a corpus, time every stage on it and collect the results.
+
+    Args:
+        config: Shape of the corpus
+        corpus_dir: Directory holding the corpus (a temporary one if None)
+        jobs: Worker processes used by the compile stage
+        schema: Catalog version written by the JSON write stage
+
+    Returns:
+        The results document
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_root = corpus_dir if corpus_dir is not None else Path(tmp) / "corpus"
+        start = time.perf_counter()
+        generated = ensure_corpus(corpus_root, config)
+        action = "Generated" if generated else "Reusing"
+        print(f"{action} corpus in {corpus_root} ({time.perf_counter() - start:.1f}s)")
+
+        output_dir = Path(tmp) / "output"
+        output_dir.mkdir()
+        print(f"{'stage':<20} {'items':>8} {'time':>11}")
+        stages = run_stages(corpus_root, output_dir, jobs, schema)
+        size = corpus_size(corpus_root)
+
+    return {
+        "version": RESULTS_VERSION,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": asdict(config),
+        "corpus_size": size,
+        "options": {"jobs": jobs, "schema": schema},
+        "stages": stages,
+        "total_seconds": round(sum(s["seconds"] for s in stages.values()), 6),
+        # ru_maxrss is in KiB on Linux
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time each stage of the site build on a synthetic corpus"
+    )
+    add_corpus_arguments(parser)
+    parser.add_argument(
+        "--corpus-dir",
+        type=str,
+        help="Keep the corpus in this directory and reuse it on later runs",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Worker processes for the compile stage"
+    )
+    parser.add_argument(
+        "--schema",
+        type=int,
+        choices=[1, CATALOG_VERSION],
+        default=CATALOG_VERSION,
+        help="Catalog version written by the JSON write stage",
+    )
+    parser.add_argument("--output", type=str, help="Write the results to this file")
+    parser.add_argument(
+        "--compare", type=str, help="Compare with an earlier results file"
+    )
+    args = parser.parse_args()
+
+    # Per-example log lines would dominate the timings
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run(
+        corpus_config_from_args(args),
+        Path(args.corpus_dir) if args.corpus_dir else None,
+        args.jobs,
+        args.schema,
+    )
+    print(f"{'total':<20} {'':>8} {results['total_seconds']:>10.3f}s")
+
+    if args.output:
+        output_file = Path(args.output)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results to {output_file}")
+
+    if args.compare:
+        compare(results, Path(args.compare))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,11 +9,44 @@ It also supports organizing examples into sections.
 
 import os
 import json
-import re
+import sys
 import argparse
+import hashlib
 import logging
+import tokenize
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Dict, List, Any, Deque, Iterable, Iterator, Optional, Tuple, Set
+
+# Make the shared site_generator package importable when run as a script
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from site_generator import catalog  # noqa: E402
+from site_generator.profiling import (  # noqa: E402
+    EXAMPLE_CATEGORY,
+    add_profile_arguments,
+    enable_in_worker,
+    profiler,
+    start_from_args,
+)
+from site_generator.inventory import (  # noqa: E402
+    IMAGE_SUFFIXES,
+    ExampleDirectory,
+    Inventory,
+)
+from site_generator.models import (  # noqa: E402
+    CodeSegment,
+    Example,
+    ExampleBody,
+    ImageRef,
+    MISC_SECTION_ID,
+    Section,
+    ShellSegment,
+    map_comments_to_code,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -21,87 +54,85 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bump when the layout of cached fragments changes
+BUILD_CACHE_VERSION = 1
+
+# Source files whose changes invalidate every cached fragment: this script and
+# every site_generator module it imports, directly or not (keep in step with
+# the imports above)
+COMPILER_SOURCES = [__file__] + [
+    str(PROJECT_ROOT / "site_generator" / name)
+    for name in (
+        "__init__.py",
+        "catalog.py",
+        "inventory.py",
+        "models.py",
+        "output.py",
+        "profiling.py",
+    )
+]
+
 
-def scan_examples_directory(examples_dir: Path) -> List[Path]:
+def find_comment_lines(lines: List[str]) -> List[bool]:
     """
-    Scan the examples directory for example folders.
+    Classify which lines of a Python file are full-line comments.
+
+    A line is a comment when a comment token starts in its first column, so
+    lines inside multi-line strings that happen to begin with "#" stay code.
+    Files that cannot be tokenized fall back to a plain prefix check from the
+    point where tokenizing failed.
 
     Args:
-        examples_dir: Path to the examples directory
+        lines: Lines of the Python file
 
     Returns:
-        List of paths to example directories
+        One flag per line, True for comment lines
     """
-    example_dirs = []
-    for item in os.listdir(examples_dir):
-        item_path = examples_dir / item
-        if item_path.is_dir() and re.match(r"^\d+", item):
-            example_dirs.append(item_path)
+    is_comment = [False] * len(lines)
+    tokenized_rows = 0
+    readline = iter(lines).__next__
+
+    try:
+        for token in tokenize.generate_tokens(readline):
+            if token.type == tokenize.COMMENT and token.start[1] == 0:
+                is_comment[token.start[0] - 1] = True
+            tokenized_rows = token.end[0]
+    except (tokenize.TokenError, SyntaxError, StopIteration):
+        logger.debug(f"Tokenizing stopped at line {tokenized_rows}, using prefix check")
+        for i in range(tokenized_rows, len(lines)):
+            is_comment[i] = lines[i].startswith("#")
 
-    # Sort by the numeric prefix
-    example_dirs.sort(key=lambda p: int(p.name.split("-")[0]))
-    return example_dirs
+    return is_comment
 
 
-def extract_python_segments(file_path: Path) -> List[Dict[str, Any]]:
+def extract_python_segments(file_path: Path) -> List[CodeSegment]:
     """
     Extract code segments and annotations from a Python file.
 
+    Consecutive comment lines and consecutive code lines are grouped into
+    alternating segments in a single pass over the file.
+
     Args:
         file_path: Path to the Python file
 
     Returns:
-        List of dictionaries containing segment data
+        List of code segments
     """
     with open(file_path, "r") as f:
         lines = f.readlines()
 
+    is_comment = find_comment_lines(lines)
     segments = []
-    current_segment = None
-    line_number = 1
-
-    # Process each line
-    for i, line in enumerate(lines):
-        stripped = line.rstrip()
-
-        # Check if this is a comment line
-        is_comment = stripped.startswith("#")
-
-        # Start a new segment if necessary
-        if current_segment is None or current_segment["is_comment"] != is_comment:
-            # Save the current segment if it exists
-            if current_segment is not None:
-                current_segment["line_range"] = (
-                    current_segment["start_line"],
-                    line_number - 1,
-                )
-                segments.append(current_segment)
-
-            # Start a new segment
-            current_segment = {
-                "code": line,
-                "display_code": "" if is_comment else line,
-                "annotation": stripped.lstrip("# ") if is_comment else "",
-                "is_comment": is_comment,
-                "start_line": line_number,
-            }
-        else:
-            # Continue the current segment
-            current_segment["code"] += line
-            if not is_comment:
-                current_segment["display_code"] += line
-            elif stripped.lstrip().startswith("#"):
-                # Append to annotation for multi-line comments
-                if current_segment["annotation"]:
-                    current_segment["annotation"] += "\n"
-                current_segment["annotation"] += stripped.lstrip("# ")
-
-        line_number += 1
-
-    # Add the last segment
-    if current_segment is not None:
-        current_segment["line_range"] = (current_segment["start_line"], line_number - 1)
-        segments.append(current_segment)
+    start = 0
+
+    for end in range(1, len(lines) + 1):
+        if end < len(lines) and is_comment[end] == is_comment[start]:
+            continue
+
+        segments.append(
+            CodeSegment.from_lines(lines[start:end], is_comment[start], start + 1)
+        )
+        start = end
 
     # Map comments to code
     map_comments_to_code(segments)
@@ -109,36 +140,55 @@ def extract_python_segments(file_path: Path) -> List[Dict[str, Any]]:
     return segments
 
 
-def map_comments_to_code(segments: List[Dict[str, Any]]) -> None:
+def parse_shell_transcript(lines: Iterable[str]) -> Iterator[ShellSegment]:
     """
-    Determine which code blocks each comment should align with.
-    Modifies the segments list in place.
+    Parse a shell transcript into command segments, one line at a time.
+
+    A command is a line starting with "$ ". It may be preceded by a single
+    "# " explanation line, and its output is every following line up to the
+    next blank line. Lines outside a command block are ignored.
 
     Args:
-        segments: List of segment dictionaries
-    """
-    for i, segment in enumerate(segments):
-        if segment["is_comment"]:
-            # Look for the next code segment
-            next_code_index = None
-            for j in range(i + 1, len(segments)):
-                if not segments[j]["is_comment"]:
-                    next_code_index = j
-                    break
-
-            if next_code_index is not None:
-                # Found a code segment after this comment
-                next_code = segments[next_code_index]
-                segment["target_line_range"] = next_code["line_range"]
-            elif i > 0 and not segments[i - 1]["is_comment"]:
-                # No code after, but there's code before
-                segment["target_line_range"] = segments[i - 1]["line_range"]
-            else:
-                # No related code found
-                segment["target_line_range"] = segment["line_range"]
+        lines: Lines of the transcript, with or without trailing newlines
+
+    Yields:
+        Shell segments
+    """
+    explanation = None
+    segment = None
+    output: List[str] = []
+
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+
+        if segment is not None:
+            # Output runs until the first blank line
+            if line:
+                output.append(line)
+                continue
+            segment.output = "\n".join(output).strip()
+            yield segment
+            segment = None
+            output = []
+            explanation = None
+        elif line.startswith("$ ") and len(line) > 2:
+            segment = ShellSegment(
+                command=line[2:].strip(), explanation=explanation or ""
+            )
+            explanation = None
+        elif line.startswith("# ") and len(line) > 2:
+            # Only the line directly above a command explains it
+            explanation = line[2:]
+        else:
+            explanation = None
 
+    if segment is not None:
+        segment.output = "\n".join(output).strip()
+        yield segment
 
-def extract_shell_segments(file_path: Path) -> List[Dict[str, Any]]:
+
+def extract_shell_segments(file_path: Path) -> List[ShellSegment]:
     """
     Extract command and output segments from a shell file.
 
@@ -146,46 +196,24 @@ def extract_shell_segments(file_path: Path) -> List[Dict[str, Any]]:
         file_path: Path to the shell file
 
     Returns:
-        List of dictionaries containing shell segment data
+        List of shell segments
     """
     with open(file_path, "r") as f:
-        content = f.read()
-
-    segments = []
-
-    # Extract commands and their outputs
-    # Format is typically:
-    # $ command
-    # output
-    pattern = (
-        r"(?:^|\n)(?:# (.+?)(?:\n|$))?(?:\$ (.+?)(?:\n|$))((?:(?!\n\$|\n#).+?\n?)*)"
-    )
-    matches = re.finditer(pattern, content, re.MULTILINE)
-
-    for match in matches:
-        explanation = match.group(1) or ""
-        command = match.group(2).strip()
-        output = match.group(3).strip()
-
-        segments.append(
-            {"explanation": explanation, "command": command, "output": output}
-        )
-
-    return segments
+        return list(parse_shell_transcript(f))
 
 
-def extract_title_and_description(segments: List[Dict[str, Any]]) -> Tuple[str, str]:
+def extract_title_and_description(segments: List[CodeSegment]) -> Tuple[str, str]:
     """
     Extract title and description from the first comment segment.
 
     Args:
-        segments: List of segment dictionaries
+        segments: List of code segments
 
     Returns:
         Tuple containing (title, description)
     """
-    if segments and segments[0]["is_comment"]:
-        lines = segments[0]["annotation"].split("\n")
+    if segments and segments[0].is_comment:
+        lines = segments[0].annotation.split("\n")
         # First line is title
         title = lines[0].strip()
         # The rest is the intro paragraph/description
@@ -200,41 +228,43 @@ def extract_title_and_description(segments: List[Dict[str, Any]]) -> Tuple[str,
     return "Untitled Example", ""
 
 
-def process_example_directory(example_dir: Path) -> Dict[str, Any]:
+def process_example_directory(example_dir: ExampleDirectory) -> Optional[Example]:
     """
     Process a single example directory and compile its data.
 
     Args:
-        example_dir: Path to the example directory
+        example_dir: Inventory entry of the example directory
 
     Returns:
-        Dictionary containing compiled example data
+        The compiled example, or None if the directory has no Python file
     """
     example_id = example_dir.name
     order = int(example_id.split("-")[0])
 
     # Find Python and shell files (excluding *_requests.py files)
-    python_files = [f for f in example_dir.glob("*.py") if not f.name.endswith("_requests.py")]
-    shell_files = list(example_dir.glob("*.sh"))
-    
-    # Find image files (PNG, JPG, JPEG, GIF)
-    image_files = list(example_dir.glob("*.png")) + list(example_dir.glob("*.jpg")) + \
-                  list(example_dir.glob("*.jpeg")) + list(example_dir.glob("*.gif"))
-    
-    # Sort image files by name for consistent order
-    image_files.sort(key=lambda p: p.name)
-    
+    python_files = [
+        entry.path
+        for entry in example_dir.files_with_suffix(".py")
+        if not entry.name.endswith("_requests.py")
+    ]
+    shell_files = [entry.path for entry in example_dir.files_with_suffix(".sh")]
+
+    # Find image files (PNG, JPG, JPEG, GIF), already sorted by name
+    image_files = [
+        entry.path for entry in example_dir.files_with_suffix(*IMAGE_SUFFIXES)
+    ]
+
     # Find documentation links file
     example_name = example_id.split("-", 1)[1]
-    links_file = example_dir / f"{example_name}_links.txt"
+    links_file = example_dir.path / f"{example_name}_links.txt"
     documentation_links = []
-    if links_file.exists():
+    if example_dir.file(links_file.name):
         with open(links_file, "r") as f:
             documentation_links = [line.strip() for line in f.readlines() if line.strip()]
         logger.info(f"Found {len(documentation_links)} documentation links for {example_id}")
 
     if not python_files:
-        logger.warning(f"No Python files found in {example_dir}")
+        logger.warning(f"No Python files found in {example_dir.path}")
         return None
 
     # Process the first Python file
@@ -257,28 +287,51 @@ def process_example_directory(example_dir: Path) -> Dict[str, Any]:
         parts = filename.split("-", 1)
         caption = parts[1].replace("-", " ").capitalize() if len(parts) > 1 else filename
         
-        image_data.append({
-            "path": str(image_file.relative_to(example_dir.parent.parent)),
-            "filename": image_file.name,
-            "caption": caption
-        })
+        image_data.append(
+            ImageRef(
+                path=str(image_file.relative_to(example_dir.path.parent.parent)),
+                filename=image_file.name,
+                caption=caption,
+            )
+        )
 
     # Compile the example data
-    example_data = {
-        "id": example_id,
-        "title": title,
-        "description": description,
-        "order": order,
-        "code_segments": code_segments,
-        "shell_segments": shell_segments,
-        "image_data": image_data,
-        "documentation_links": documentation_links
-    }
+    return Example(
+        id=example_id,
+        title=title,
+        order=order,
+        body_data=ExampleBody(
+            description=description,
+            code_segments=code_segments,
+            shell_segments=shell_segments,
+            image_data=image_data,
+            documentation_links=documentation_links,
+        ),
+    )
+
+
+def profile_example_directory(
+    example_dir: ExampleDirectory,
+) -> Tuple[Optional[Example], List[Dict[str, Any]]]:
+    """
+    Process an example directory in a worker process while profiling.
+
+    Args:
+        example_dir: Inventory entry of the example directory
 
-    return example_data
+    Returns:
+        Tuple containing (compiled example, profiling spans to merge into the
+        main process's trace)
+    """
+    with profiler.span(
+        "process_example_directory", EXAMPLE_CATEGORY, example=example_dir.name
+    ):
+        example = process_example_directory(example_dir)
+    events, profiler.events = profiler.events, []
+    return example, events
 
 
-def load_sections(project_root: Path) -> Dict[str, Any]:
+def load_sections(project_root: Path) -> List[Section]:
     """
     Load section definitions from sections.json file.
     
@@ -286,111 +339,575 @@ def load_sections(project_root: Path) -> Dict[str, Any]:
         project_root: Path to the project root directory
         
     Returns:
-        Dictionary containing section definitions
+        List of section definitions
     """
     sections_file = project_root / "data" / "sections.json"
     if not sections_file.exists():
         logger.warning(f"No sections.json file found at {sections_file}. Using flat structure.")
-        return {"sections": []}
+        return []
     
     try:
         with open(sections_file, "r") as f:
-            return json.load(f)
+            sections_data = json.load(f)
+        return [Section.from_dict(section) for section in sections_data.get("sections", [])]
     except Exception as e:
         logger.error(f"Error loading sections.json: {e}. Using flat structure.")
-        return {"sections": []}
+        return []
+
+
+def resolve_sections(
+    example_ids: List[str], sections: List[Section]
+) -> Tuple[Dict[str, Section], Dict[str, Any]]:
+    """
+    Resolve the section each example belongs to.
+
+    Section membership is indexed once, so resolution is linear in the number
+    of examples and section entries. An example listed in several sections
+    ends up in the last one. Examples not listed anywhere are assigned to a
+    default "Miscellaneous" section, which is appended to sections.
+
+    Args:
+        example_ids: IDs of the compiled examples
+        sections: Section definitions from sections.json (modified in place)
+
+    Returns:
+        Tuple containing (section per example ID, report of mismatched IDs)
+    """
+    known_ids = set(example_ids)
+    section_of: Dict[str, Section] = {}
+    dangling = []
+    duplicates = []
+
+    for section in sections:
+        for example_id in section.examples or []:
+            if example_id not in known_ids:
+                dangling.append({"section_id": section.id, "example_id": example_id})
+                continue
+            if example_id in section_of:
+                duplicates.append(
+                    {
+                        "example_id": example_id,
+                        "section_ids": [section_of[example_id].id, section.id],
+                    }
+                )
+            section_of[example_id] = section
+
+    uncategorized = [
+        example_id for example_id in example_ids if example_id not in section_of
+    ]
+    if uncategorized:
+        default_section = Section(
+            id=MISC_SECTION_ID,
+            title="Miscellaneous Examples",
+            description="Additional examples that don't fit into other categories",
+            order=999,
+        )
+        for example_id in uncategorized:
+            section_of[example_id] = default_section
+        sections.append(default_section)
+
+    # A dangling ID usually means an example directory was renamed, so point
+    # at the unlisted example sharing its numeric prefix
+    uncategorized_by_prefix = {
+        example_id.split("-", 1)[0]: example_id for example_id in uncategorized
+    }
+    for entry in dangling:
+        prefix = entry["example_id"].split("-", 1)[0]
+        entry["suggestion"] = uncategorized_by_prefix.get(prefix)
+
+    report = {
+        "dangling": dangling,
+        "duplicates": duplicates,
+        "uncategorized": uncategorized,
+    }
+    return section_of, report
+
+
+def log_section_report(report: Dict[str, Any]) -> None:
+    """
+    Log the mismatches found while resolving sections.
+
+    Args:
+        report: Report returned by resolve_sections
+    """
+    for entry in report["dangling"]:
+        hint = f" (did you mean {entry['suggestion']}?)" if entry["suggestion"] else ""
+        logger.warning(
+            f"Section {entry['section_id']} lists unknown example "
+            f"{entry['example_id']}{hint}"
+        )
+    for entry in report["duplicates"]:
+        logger.warning(
+            f"Example {entry['example_id']} is listed in several sections: "
+            f"{', '.join(entry['section_ids'])}"
+        )
+    if report["uncategorized"]:
+        logger.info(
+            f"{len(report['uncategorized'])} example(s) not listed in any section: "
+            f"{', '.join(report['uncategorized'])}"
+        )
+
+
+def hash_file(file_path: Path) -> str:
+    """
+    Compute the SHA-256 content hash of a file.
 
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """
+    Persistent cache of compiled example fragments.
+
+    The manifest records a content hash for every input file of an example
+    (Python, shell, links and images). Examples whose inputs are unchanged
+    reuse their cached fragment instead of being parsed again. The whole cache
+    is invalidated when the compiler source itself changes.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.fragments_dir = cache_dir / "examples"
+        self.manifest_file = cache_dir / "manifest.json"
+        self.compiler_hash = hashlib.sha256(
+            "".join(hash_file(Path(source)) for source in COMPILER_SOURCES).encode()
+        ).hexdigest()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load_manifest()
+
+    def _load_manifest(self) -> None:
+        """Load the manifest of the previous build, discarding it if stale."""
+        if not self.manifest_file.exists():
+            return
+
+        try:
+            with open(self.manifest_file, "r") as f:
+                manifest = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable build cache manifest: {e}")
+            return
+
+        if (
+            manifest.get("version") != BUILD_CACHE_VERSION
+            or manifest.get("compiler") != self.compiler_hash
+        ):
+            logger.info("Compiler changed since last build, discarding build cache")
+            return
+
+        self.entries = manifest.get("examples", {})
+
+    def input_hashes(
+        self, example_dir: ExampleDirectory
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Hash every input file of an example directory.
+
+        Args:
+            example_dir: Inventory entry of the example directory
+
+        Returns:
+            Tuple containing (combined digest, per-file hashes)
+        """
+        inputs = {}
+        for name, entry in example_dir.files.items():
+            if not name.startswith("."):
+                inputs[name] = hash_file(entry.path)
+
+        # Image paths are stored relative to the examples directory's parent,
+        # so its name is part of the compiled output too
+        key = json.dumps([example_dir.path.parent.name, inputs], sort_keys=True)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest(), inputs
+
+    def lookup(
+        self, example_id: str, digest: str
+    ) -> Tuple[bool, Optional[Example]]:
+        """
+        Look up a cached fragment.
+
+        Args:
+            example_id: The example ID
+            digest: Combined digest of the example's current inputs
+
+        Returns:
+            Tuple containing (hit, cached example)
+        """
+        entry = self.entries.get(example_id)
+        if entry is None or entry.get("digest") != digest:
+            self.misses += 1
+            return False, None
+
+        fragment_file = self.fragments_dir / f"{example_id}.json"
+        try:
+            with open(fragment_file, "r") as f:
+                data = json.load(f)
+            example = Example.from_dict(data) if data is not None else None
+        except Exception:
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        return True, example
+
+    def store(
+        self,
+        example_id: str,
+        digest: str,
+        inputs: Dict[str, str],
+        example: Optional[Example],
+    ) -> None:
+        """
+        Store a freshly compiled fragment.
+
+        Args:
+            example_id: The example ID
+            digest: Combined digest of the example's inputs
+            inputs: Per-file hashes of the example's inputs
+            example: The compiled example (None if the example was skipped)
+        """
+        self.fragments_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.fragments_dir / f"{example_id}.json", "w") as f:
+            json.dump(example.to_dict() if example is not None else None, f)
+        self.entries[example_id] = {"digest": digest, "inputs": inputs}
+
+    def save(self, active_ids: Set[str]) -> None:
+        """
+        Write the manifest, dropping entries for examples that no longer exist.
+
+        Args:
+            active_ids: IDs of the examples seen in this build
+        """
+        for example_id in list(self.entries):
+            if example_id not in active_ids:
+                del self.entries[example_id]
+                fragment_file = self.fragments_dir / f"{example_id}.json"
+                if fragment_file.exists():
+                    fragment_file.unlink()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "version": BUILD_CACHE_VERSION,
+            "compiler": self.compiler_hash,
+            "examples": self.entries,
+        }
+        with open(self.manifest_file, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        logger.info(f"Build cache: {self.hits} reused, {self.misses} recompiled")
+
+
+def compile_examples(
+    example_dirs: List[ExampleDirectory],
+    cache: Optional[BuildCache] = None,
+    jobs: int = 1,
+) -> Iterator[Optional[Example]]:
+    """
+    Compile example directories, reusing cached fragments when possible.
+
+    Results are yielded in the order of example_dirs as soon as they are
+    ready. Examples that need compiling are processed serially, or in a pool
+    of worker processes when jobs > 1. Only a couple of examples per worker
+    are in flight at a time, so memory use does not grow with the number of
+    examples. A failing example is logged and skipped rather than aborting
+    the build.
+
+    Args:
+        example_dirs: Inventory entries of the example directories
+        cache: Optional build cache
+        jobs: Number of worker processes to use
 
-def process_examples(example_dirs: List[Path], project_root: Path) -> Dict[str, Any]:
+    Yields:
+        Compiled example per directory (None for skipped or failed examples)
     """
-    Process all example directories and compile them into a JSON structure.
+    failures = []
+    executor = None
+    in_flight: Deque[Tuple[ExampleDirectory, Any, Any, bool, Any]] = deque()
+    max_in_flight = 2 * jobs if jobs > 1 else 1
+
+    def resolve(example_dir, digest, inputs, hit, result) -> Optional[Example]:
+        if hit:
+            logger.debug(f"Reusing cached fragment for {example_dir.name}")
+            return result
+
+        try:
+            if result is None:
+                logger.info(f"Processing example: {example_dir.name}")
+                with profiler.span(
+                    "process_example_directory",
+                    EXAMPLE_CATEGORY,
+                    example=example_dir.name,
+                ):
+                    example_data = process_example_directory(example_dir)
+            elif profiler.enabled:
+                example_data, events = result.result()
+                profiler.events.extend(events)
+                logger.info(f"Processed example: {example_dir.name}")
+            else:
+                example_data = result.result()
+                logger.info(f"Processed example: {example_dir.name}")
+        except Exception as e:
+            logger.error(f"Failed to process {example_dir.name}: {e}")
+            failures.append(example_dir.name)
+            return None
+
+        if cache is not None:
+            cache.store(example_dir.name, digest, inputs, example_data)
+        return example_data
+
+    try:
+        for example_dir in example_dirs:
+            digest, inputs, hit, result = None, None, False, None
+            if cache is not None:
+                digest, inputs = cache.input_hashes(example_dir)
+                hit, result = cache.lookup(example_dir.name, digest)
+
+            if not hit and jobs > 1:
+                # The pool is only started once an example actually needs it
+                if executor is None:
+                    logger.info(f"Compiling examples with {jobs} workers")
+                    executor = ProcessPoolExecutor(
+                        max_workers=jobs,
+                        initializer=enable_in_worker if profiler.enabled else None,
+                    )
+                if profiler.enabled:
+                    result = executor.submit(profile_example_directory, example_dir)
+                else:
+                    result = executor.submit(process_example_directory, example_dir)
+
+            in_flight.append((example_dir, digest, inputs, hit, result))
+            if len(in_flight) >= max_in_flight:
+                yield resolve(*in_flight.popleft())
+
+        while in_flight:
+            yield resolve(*in_flight.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if failures:
+        logger.error(
+            f"{len(failures)} example(s) failed to build: {', '.join(failures)}"
+        )
+
+
+def process_examples(
+    example_dirs: List[ExampleDirectory],
+    project_root: Path,
+    cache: Optional[BuildCache] = None,
+    jobs: int = 1,
+    section_report_file: Optional[Path] = None,
+) -> Tuple[Iterator[Example], List[Section]]:
+    """
+    Compile example directories into the examples and sections of a catalog.
     Organizes examples into sections if sections.json is available.
 
+    The display order only depends on the directory names and sections.json,
+    so it is worked out before anything is compiled. Examples are then
+    compiled lazily, in that order, as the returned iterator is consumed, and
+    each one can be written out and released before the next is compiled.
+    The sections list, the section report and the build cache manifest are
+    finalised once the iterator is exhausted.
+
     Args:
-        example_dirs: List of paths to example directories
+        example_dirs: Inventory entries of the example directories
         project_root: Path to the project root directory
+        cache: Optional build cache used to skip unchanged examples
+        jobs: Number of worker processes used to compile examples
+        section_report_file: Optional path for a JSON report of section mismatches
 
     Returns:
-        Dictionary representing the compiled examples data with sections
+        Tuple containing (examples in display order, section definitions)
     """
-    # Process all examples
-    examples = []
-    example_ids = set()
 
-    for example_dir in example_dirs:
-        logger.info(f"Processing example: {example_dir.name}")
-        example_data = process_example_directory(example_dir)
-        if example_data:
-            examples.append(example_data)
-            example_ids.add(example_data["id"])
+    def example_order(example_dir: ExampleDirectory) -> int:
+        return int(example_dir.name.split("-")[0])
 
-    # Sort examples by order
-    examples.sort(key=lambda e: e["order"])
-    
     # Load sections if available
-    sections_data = load_sections(project_root)
-    sections = sections_data.get("sections", [])
-    
-    # If we have sections defined, organize examples by section
+    sections = load_sections(project_root)
+
     if sections:
-        # Add section information to each example
+        # Resolve against a copy, the real list is completed at the end
+        section_of, _ = resolve_sections(
+            [example_dir.name for example_dir in example_dirs], list(sections)
+        )
+
+        # Order by section order then example order
+        section_order = {}
         for section in sections:
-            section_id = section["id"]
-            for example_id in section.get("examples", []):
-                if example_id in example_ids:
-                    # Find the example and add section info
-                    for example in examples:
-                        if example["id"] == example_id:
-                            example["section_id"] = section_id
-                            example["section_title"] = section["title"]
-                            break
-        
-        # For examples not assigned to a section, create a default section
-        uncategorized_examples = [e for e in examples if "section_id" not in e]
-        if uncategorized_examples:
-            default_section = {
-                "id": "999-misc",
-                "title": "Miscellaneous Examples",
-                "description": "Additional examples that don't fit into other categories",
-                "order": 999
-            }
-            for example in uncategorized_examples:
-                example["section_id"] = default_section["id"]
-                example["section_title"] = default_section["title"]
-            
-            # Add default section if needed
-            sections.append(default_section)
-        
-        # Final sorted list based on section order then example order
-        sorted_examples = sorted(
-            examples, 
-            key=lambda e: (
-                next((s["order"] for s in sections if s["id"] == e.get("section_id", "999-misc")), 999),
-                e["order"]
-            )
+            section_order.setdefault(section.id, section.order)
+        ordered_dirs = sorted(
+            example_dirs,
+            key=lambda d: (
+                section_order.get(section_of[d.name].id, 999),
+                example_order(d),
+            ),
         )
-        
-        return {
-            "examples": sorted_examples,
-            "sections": sections
-        }
-    
-    # If no sections, return flat structure
-    return {"examples": examples}
+    else:
+        ordered_dirs = sorted(example_dirs, key=example_order)
+
+    def compiled_examples() -> Iterator[Example]:
+        compiled_ids = []
+        for example in compile_examples(ordered_dirs, cache, jobs):
+            if example is None:
+                continue
+            # Add section information to the example
+            if sections:
+                section = section_of[example.id]
+                example.section_id = section.id
+                example.section_title = section.title
+            compiled_ids.append(example.id)
+            yield example
+
+        if cache is not None:
+            cache.save({example_dir.name for example_dir in example_dirs})
+
+        if sections:
+            # Uncategorized examples all sort last, in example order, so the
+            # report lists them in the same order as before
+            _, report = resolve_sections(compiled_ids, sections)
+            log_section_report(report)
+            if section_report_file is not None:
+                section_report_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(section_report_file, "w") as f:
+                    json.dump(report, f, indent=2)
+                logger.info(f"Wrote section report to {section_report_file}")
+
+    return compiled_examples(), sections
+
+
+def write_catalog(
+    examples: Iterable[Example],
+    sections: List[Section],
+    output_file: Path,
+    schema: int,
+    pretty: bool = False,
+    layout: str = "single",
+) -> None:
+    """
+    Stream the compiled examples into a catalog.
+
+    Each example is serialised as soon as it is compiled, and the catalog is
+    renamed into place only once it is complete, so an interrupted build
+    leaves the previous catalog untouched.
+
+    The single layout writes one JSON file. The sharded layout writes an
+    index.json plus one file per example into a directory named after the
+    output file (data/examples.json -> data/examples/). Writing either layout
+    removes the other, so the site generator never picks up stale data.
+
+    Args:
+        examples: Compiled examples from process_examples
+        sections: Section definitions from process_examples
+        output_file: Path to the output JSON file
+        schema: Catalog version to write
+        pretty: Whether to indent the JSON
+        layout: "single" or "sharded"
+    """
+    # Version 1 has always been pretty-printed
+    if pretty or schema == 1:
+        dump_options = {"indent": 2}
+    else:
+        dump_options = {"separators": (",", ":")}
+
+    shard_dir = output_file.with_suffix("")
+
+    if layout == "sharded":
+        count = catalog.write_sharded_catalog(
+            examples, sections, shard_dir, dump_options
+        )
+        if output_file.exists():
+            output_file.unlink()
+        logger.info(f"Wrote {count} example shards to {shard_dir}")
+        return
+
+    count = catalog.write_catalog_file(
+        examples, sections, output_file, schema, dump_options
+    )
+    logger.info(f"Wrote {count} examples to {output_file}")
+
+    if (shard_dir / "index.json").exists():
+        for shard_file in shard_dir.glob("*.json"):
+            shard_file.unlink()
+        if not any(shard_dir.iterdir()):
+            shard_dir.rmdir()
 
 
-def parse_args() -> argparse.Namespace:
-    """Parse command-line arguments."""
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command-line arguments.
+
+    Args:
+        argv: Arguments to parse, instead of the command line
+    """
     parser = argparse.ArgumentParser(description="Build Gemini by Example website data")
     parser.add_argument("--examples-dir", type=str, help="Path to examples directory")
     parser.add_argument("--output", type=str, help="Path to output JSON file")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
-    return parser.parse_args()
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to compile examples (0 = all cores)",
+    )
+    parser.add_argument(
+        "--schema",
+        type=int,
+        choices=[1, catalog.CATALOG_VERSION],
+        default=catalog.CATALOG_VERSION,
+        help="Catalog version to write (1 is the original verbose layout)",
+    )
+    parser.add_argument(
+        "--pretty", action="store_true", help="Indent the output JSON"
+    )
+    parser.add_argument(
+        "--layout",
+        choices=["single", "sharded"],
+        default="single",
+        help="Write one catalog file, or an index plus one file per example",
+    )
+    parser.add_argument(
+        "--section-report",
+        type=str,
+        help="Write a JSON report of section IDs that do not match any example",
+    )
+    parser.add_argument(
+        "--cache-dir", type=str, help="Path to the build cache directory"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompile every example, ignoring the build cache",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.layout == "sharded" and args.schema == 1:
+        parser.error("--layout sharded requires the current catalog schema")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> Inventory:
+    """
+    Main entry point for the build script.
 
+    Args:
+        argv: Command-line arguments, instead of the script's own (as passed
+            by build_static_site.py)
 
-def main():
-    """Main entry point for the build script."""
-    args = parse_args()
+    Returns:
+        The inventory of the examples directory, for later build stages
+    """
+    args = parse_args(argv)
 
     # Set verbose logging if requested
     if args.verbose:
@@ -407,19 +924,41 @@ def main():
         Path(args.output) if args.output else project_root / "data" / "examples.json"
     )
 
+    # Only write the profile here if build_static_site.py is not profiling
+    profiling = start_from_args(args)
+
     logger.info(f"Scanning examples directory: {examples_dir}")
-    example_dirs = scan_examples_directory(examples_dir)
+    with profiler.span("scan_examples"):
+        inventory = Inventory.scan(examples_dir)
+    example_dirs = inventory.directories
     logger.info(f"Found {len(example_dirs)} example directories")
 
+    cache = None
+    if not args.no_cache:
+        cache_dir = (
+            Path(args.cache_dir) if args.cache_dir else project_root / ".build-cache"
+        )
+        cache = BuildCache(cache_dir)
+
     logger.info("Processing examples...")
-    data = process_examples(example_dirs, project_root)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    section_report_file = Path(args.section_report) if args.section_report else None
+    examples, sections = process_examples(
+        example_dirs, project_root, cache, jobs, section_report_file
+    )
 
     logger.info(f"Writing output to {output_file}")
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, "w") as f:
-        json.dump(data, f, indent=2)
+    # Examples are compiled as the catalog is written, so this is one stage
+    with profiler.span("compile_and_write_catalog"):
+        write_catalog(
+            examples, sections, output_file, args.schema, args.pretty, args.layout
+        )
 
     logger.info("Build complete!")
+    if profiling:
+        profiler.finish()
+    return inventory
 
 
 if __name__ == "__main__":
@@ -6,14 +6,52 @@ This script generates a complete static site from the examples.json file,
 following the same layout and styling as the original examples site.
 """
 
+import argparse
+import hashlib
 import json
 import logging
 import os
-import shutil
 from pathlib import Path
 from html import escape
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Set, Tuple
 import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from textwrap import indent
+
+from site_generator import templates
+from site_generator.assets import fingerprinted_name, headers_file
+from site_generator.catalog import (
+    decode_catalog,
+    example_fingerprint,
+    load_sharded_catalog,
+)
+from site_generator.compress import (
+    compress_outputs,
+    discard_compressed_copies,
+    log_report,
+)
+from site_generator.graph import SiteGraph
+from site_generator.highlight import HighlightCache, Highlighter, pygments_available
+from site_generator.minify import minify_html
+from site_generator.offline import (
+    SERVICE_WORKER_PATH,
+    PrecacheHashes,
+    retire_service_worker,
+    write_service_worker,
+)
+from site_generator.search import SearchIndexCache, build_search_index
+from site_generator.inventory import IMAGE_SUFFIXES, Inventory
+from site_generator.output import OutputSync, atomic_write
+from site_generator.profiling import (
+    EXAMPLE_CATEGORY,
+    add_profile_arguments,
+    enable_in_worker,
+    profiler,
+    start_from_args,
+)
+from site_generator.models import Catalog, Example
 
 # Configure logging
 logging.basicConfig(
@@ -26,108 +64,410 @@ SITE_TITLE = "Structured Outputs by Example"
 SITE_DESCRIPTION = "Learn to work with structured outputs through annotated examples"
 
 
-def load_examples_data() -> Dict[str, Any]:
-    """Load examples and sections from the JSON file."""
-    try:
-        data_file = Path(__file__).parent / "data" / "examples.json"
-        logger.info("Loading examples from %s" % data_file)
-        with open(data_file, "r") as f:
-            data = json.load(f)
+# Dates of the build shown on example pages: the "Last updated" footer and
+# the JSON-LD dates. Both are days, so that a page cached by an earlier build
+# the same day shows the same dates as the pages rendered now; page digests
+# include them (see PageCache.page_digest), so the pages are rendered again
+# once the date changes.
+FOOTER_DATE_FORMAT = "%B %-d, %Y"
+JSON_LD_DATE_FORMAT = "%Y-%m-%d"
 
-        examples = data.get("examples", [])
-        sections = data.get("sections", [])
-        logger.info(
-            "Loaded %d examples and %d sections" % (len(examples), len(sections))
-        )
-        return {"examples": examples, "sections": sections}
-    except Exception as e:
-        logger.error("Error loading examples: %s" % e)
-        return {"examples": [], "sections": []}
+# Time stamped on every output of the current build (see set_build_time)
+_build_time: Optional[datetime] = None
 
 
-def load_examples() -> List[Dict[str, Any]]:
-    """Load examples from the JSON file (backward compatibility)."""
-    return load_examples_data().get("examples", [])
+def set_build_time(timestamp: Optional[datetime] = None) -> datetime:
+    """
+    Fix the time stamped on the outputs of a build.
+
+    Every page and file of a build shows the same time, however long the
+    build takes and whichever process renders it.
+
+    Args:
+        timestamp: The build time; defaults to SOURCE_DATE_EPOCH if set in the
+            environment (for reproducible builds), else the current time
+
+    Returns:
+        The build time
+    """
+    global _build_time
+    if timestamp is None:
+        source_date_epoch = os.environ.get("SOURCE_DATE_EPOCH")
+        if source_date_epoch:
+            timestamp = datetime.fromtimestamp(int(source_date_epoch))
+        else:
+            timestamp = datetime.now()
+    _build_time = timestamp
+    return timestamp
+
+
+def build_time() -> datetime:
+    """Time of the current build, fixed on first use if not set."""
+    if _build_time is None:
+        return set_build_time()
+    return _build_time
+
+
+@lru_cache(maxsize=16)
+def _format_time(timestamp: datetime, time_format: str) -> str:
+    return timestamp.strftime(time_format)
+
+
+def format_build_time(time_format: str) -> str:
+    """The build time formatted with strftime, memoised for every page."""
+    return _format_time(build_time(), time_format)
+
+
+# Fingerprinted path of each static asset (see set_asset_paths)
+_asset_paths: Dict[str, str] = {}
 
 
-def find_next_example(
-    examples: List[Dict[str, Any]], current_example: Dict[str, Any]
-) -> Optional[Dict[str, Any]]:
+def set_asset_paths(paths: Dict[str, str]) -> None:
     """
-    Find the next example based on the example order and section.
-    This function respects section organization, continuing to the next section when needed.
+    Set the fingerprinted paths that pages link static assets with.
 
     Args:
-        examples: List of all examples
-        current_example: The current example
+        paths: Fingerprinted path of each asset, as returned by
+            copy_static_files
+    """
+    _asset_paths.clear()
+    _asset_paths.update(paths)
+
+
+def asset_url(path: str, base_url: str) -> str:
+    """
+    URL of a static asset, under its fingerprinted name if it was published.
+
+    Args:
+        path: The asset's path in the output directory, such as
+            "static/js/script.js"
+        base_url: The base URL for relative links
 
     Returns:
-        The next example or None if there is no next example
+        The URL to link the asset with
     """
-    current_order = current_example["order"]
-    current_section_id = current_example.get("section_id")
+    return f"{base_url}/{_asset_paths.get(path, path)}"
 
-    # First, try to find the next example in the same section
-    if current_section_id:
-        same_section_examples = [
-            e for e in examples if e.get("section_id") == current_section_id
-        ]
-        for example in sorted(same_section_examples, key=lambda e: e["order"]):
-            if example["order"] > current_order:
-                return example
 
-    # If we're at the end of a section or there's no section info,
-    # find the next example in any section
-    for example in sorted(examples, key=lambda e: e["order"]):
-        if example["order"] > current_order:
-            return example
+# Build-time highlighter of code blocks, if enabled (see set_highlighter)
+_highlighter: Optional[Highlighter] = None
 
-    return None
+
+def set_highlighter(highlighter: Optional[Highlighter]) -> None:
+    """
+    Highlight code blocks at build time, or leave them to the browser.
+
+    Args:
+        highlighter: The highlighter, or None to highlight in the browser
+    """
+    global _highlighter
+    _highlighter = highlighter
 
 
-def find_prev_example(
-    examples: List[Dict[str, Any]], current_example: Dict[str, Any]
-) -> Optional[Dict[str, Any]]:
+def highlight_code(code: str, language: str = "python") -> str:
     """
-    Find the previous example based on the example order and section.
-    This function respects section organization, going back to the previous section when needed.
+    Code as HTML for a code block.
 
     Args:
-        examples: List of all examples
-        current_example: The current example
+        code: The code
+        language: Its language, as a Pygments lexer name
 
     Returns:
-        The previous example or None if there is no previous example
+        The code highlighted if build-time highlighting is enabled, else
+        just escaped
     """
-    current_order = current_example["order"]
-    current_section_id = current_example.get("section_id")
+    if _highlighter is None:
+        return escape(code)
+    return _highlighter.highlight(code, language)
 
-    # First, try to find the previous example in the same section
-    if current_section_id:
-        same_section_examples = [
-            e for e in examples if e.get("section_id") == current_section_id
-        ]
-        prev_example = None
-        for example in sorted(
-            same_section_examples, key=lambda e: e["order"], reverse=True
+
+def highlight_keys(example: Example) -> List[str]:
+    """
+    Highlight cache keys of the code blocks of an example page.
+
+    Args:
+        example: The example
+
+    Returns:
+        The keys, or an empty list if build-time highlighting is disabled
+    """
+    if _highlighter is None:
+        return []
+    return [
+        _highlighter.key(segment.display_code.strip(), "python")
+        for segment in example.body.code_segments
+    ] + [
+        _highlighter.key(segment.command, "bash")
+        for segment in example.body.shell_segments
+    ]
+
+
+# Whether pages are minified before they are written (see set_minify)
+_minify = False
+
+
+def set_minify(enabled: bool) -> None:
+    """
+    Minify pages before writing them, or write them as rendered.
+
+    Args:
+        enabled: Whether to minify pages
+    """
+    global _minify
+    _minify = enabled
+
+
+def finish_page(page: str) -> str:
+    """
+    A rendered page as it is written.
+
+    Args:
+        page: The rendered page
+
+    Returns:
+        The page, minified if minification is enabled
+    """
+    return minify_html(page) if _minify else page
+
+
+# Whether pages register the service worker (see set_service_worker)
+_service_worker = False
+
+
+def set_service_worker(enabled: bool) -> None:
+    """
+    Have pages register the site's service worker, or remove an earlier one.
+
+    Args:
+        enabled: Whether the build publishes a service worker
+    """
+    global _service_worker
+    _service_worker = enabled
+
+
+def load_examples_data() -> Catalog:
+    """
+    Load examples and sections from the catalog.
+
+    A sharded catalog (data/examples/index.json) is preferred over the single
+    data/examples.json file; its example bodies are only read when accessed.
+    """
+    try:
+        data_dir = Path(__file__).parent / "data"
+        shard_dir = data_dir / "examples"
+        if (shard_dir / "index.json").exists():
+            logger.info("Loading example index from %s" % shard_dir)
+            data = load_sharded_catalog(shard_dir)
+        else:
+            data_file = data_dir / "examples.json"
+            logger.info("Loading examples from %s" % data_file)
+            with open(data_file, "r") as f:
+                data = decode_catalog(json.load(f))
+
+        logger.info(
+            "Loaded %d examples and %d sections"
+            % (len(data.examples), len(data.sections))
+        )
+        return data
+    except Exception as e:
+        logger.error("Error loading examples: %s" % e)
+        return Catalog()
+
+
+# Bump when the layout of the page manifest changes
+PAGE_CACHE_VERSION = 1
+
+# Files made from the whole catalog, recorded in the page cache by name
+LLMS_FILES = ("llms-ctx.txt", "llms.txt")
+
+# Source files whose changes invalidate every rendered page: this script and
+# every site_generator module it imports, directly or not (keep in step with
+# the imports above)
+RENDERER_SOURCES = [__file__] + [
+    str(Path(__file__).parent / "site_generator" / name)
+    for name in (
+        "__init__.py",
+        "assets.py",
+        "catalog.py",
+        "compress.py",
+        "graph.py",
+        "highlight.py",
+        "inventory.py",
+        "minify.py",
+        "models.py",
+        "offline.py",
+        "output.py",
+        "profiling.py",
+        "search.py",
+        "templates.py",
+    )
+]
+
+
+class PageCache:
+    """
+    Manifest of the example pages rendered by previous builds.
+
+    Each page is recorded with a digest of everything it is rendered from:
+    the example itself, the IDs and titles of its previous and next examples,
+    its section title, the images in its example directory and the build
+    dates it shows. A page whose
+    digest is unchanged and whose output file still exists is not rendered
+    again. Any change to the renderer's source or to the build settings
+    shared by every page (such as the fingerprinted assets they link)
+    invalidates every page.
+
+    The llms files, which are made from every example, are recorded the same
+    way under their file names, with a digest of the whole catalog (see
+    catalog_digest), so a build that changed no example does not read every
+    example's body again.
+    """
+
+    def __init__(self, manifest_file: Path, settings: Optional[Dict[str, Any]] = None):
+        self.manifest_file = manifest_file
+        digest = hashlib.sha256()
+        for source in RENDERER_SOURCES:
+            digest.update(Path(source).read_bytes())
+        digest.update(json.dumps(settings or {}, sort_keys=True).encode("utf-8"))
+        self.renderer_hash = digest.hexdigest()
+        self.pages: Dict[str, str] = {}
+        self._load_manifest()
+
+    def _load_manifest(self) -> None:
+        """Load the manifest of the previous build, discarding it if stale."""
+        try:
+            with open(self.manifest_file, "r") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning("Ignoring unreadable page manifest: %s" % e)
+            return
+
+        if (
+            manifest.get("version") != PAGE_CACHE_VERSION
+            or manifest.get("renderer") != self.renderer_hash
         ):
-            if example["order"] < current_order:
-                return example
+            logger.info("Renderer changed since last build, re-rendering all pages")
+            return
+
+        self.pages = manifest.get("pages", {})
+
+    def page_digest(
+        self,
+        example: Example,
+        graph: SiteGraph,
+        inventory: Optional[Inventory] = None,
+    ) -> str:
+        """
+        Digest the inputs of an example page.
+
+        Args:
+            example: The example
+            graph: Navigation of the site, for the previous/next links
+            inventory: Inventory of the examples directory
+
+        Returns:
+            Hex digest of the page's inputs
+        """
+        neighbours = [
+            [neighbour.id, neighbour.title] if neighbour else None
+            for neighbour in (graph.prev(example), graph.next(example))
+        ]
+
+        images = []
+        directory = inventory.directory(example.id) if inventory else None
+        if directory is not None:
+            images = [
+                [entry.name, entry.size, entry.mtime_ns]
+                for entry in directory.files_with_suffix(*IMAGE_SUFFIXES)
+            ]
+
+        dates = [
+            format_build_time(FOOTER_DATE_FORMAT),
+            format_build_time(JSON_LD_DATE_FORMAT),
+        ]
+        key = json.dumps(
+            [
+                example_fingerprint(example),
+                neighbours,
+                example.section_title,
+                images,
+                dates,
+            ]
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def catalog_digest(self, graph: SiteGraph, *inputs: str) -> str:
+        """
+        Digest the inputs of a file made from the whole catalog.
+
+        Args:
+            graph: Navigation of the site, for its examples and sections
+            inputs: Other inputs of the file, such as the build date it shows
+
+        Returns:
+            Hex digest of every example, every section and the other inputs
+        """
+        key = json.dumps(
+            [
+                [example_fingerprint(example) for example in graph.examples],
+                [section.to_dict() for section in graph.sections],
+                inputs,
+            ]
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def is_fresh(self, key: str, digest: str, output_file: Path) -> bool:
+        """
+        Check whether a page can be kept from the previous build.
+
+        Args:
+            key: The example ID, or the file name of an llms file
+            digest: Digest of the page's current inputs
+            output_file: The page's output file
+
+        Returns:
+            True if the page is up to date
+        """
+        return self.pages.get(key) == digest and output_file.exists()
+
+    def record(self, key: str, digest: str) -> None:
+        """Record the digest a page (or llms file) was rendered from."""
+        self.pages[key] = digest
+
+    def save(self, active_ids: Set[str]) -> None:
+        """
+        Write the manifest, dropping pages of examples that no longer exist.
+
+        Args:
+            active_ids: IDs of the examples in this build, and the names of
+                the llms files
+        """
+        manifest = {
+            "version": PAGE_CACHE_VERSION,
+            "renderer": self.renderer_hash,
+            "pages": {
+                example_id: digest
+                for example_id, digest in sorted(self.pages.items())
+                if example_id in active_ids
+            },
+        }
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.manifest_file) as f:
+            json.dump(manifest, f, indent=2)
 
-    # If we're at the beginning of a section or there's no section info,
-    # find the previous example in any section
-    prev_example = None
-    for example in sorted(examples, key=lambda e: e["order"], reverse=True):
-        if example["order"] < current_order:
-            return example
 
-    return None
+def load_examples() -> List[Example]:
+    """Load examples from the JSON file (backward compatibility)."""
+    return load_examples_data().examples
 
 
 def generate_html_head(
     title: str, include_main_css: bool = True, base_url: str = ".", 
     description: str = None, page_type: str = "article", 
-    canonical_path: str = "", example_data: Dict[str, Any] = None
+    canonical_path: str = "", example_data: Optional[Example] = None,
+    prefetch_urls: Tuple[str, ...] = ()
 ) -> str:
     """Generate HTML head section with enhanced SEO elements.
 
@@ -139,6 +479,8 @@ def generate_html_head(
         page_type: Schema.org type for the page ("article", "website", etc.)
         canonical_path: Path for canonical URL (if empty, no canonical URL is added)
         example_data: Example data for structured data generation
+        prefetch_urls: Pages the reader is likely to open next, which the
+            browser may fetch ahead while idle
     """
     # Use provided description or fall back to site description
     page_description = description if description else SITE_DESCRIPTION
@@ -149,561 +491,215 @@ def generate_html_head(
     # Canonical URL
     canonical_url = f"{site_url}/{canonical_path}" if canonical_path else site_url
     
-    head = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    
-    <!-- Primary Meta Tags -->
-    <title>{escape(title)}</title>
-    <meta name="description" content="{escape(page_description)}">
-    <meta name="author" content="Jason Liu">
-    <meta name="keywords" content="structured outputs, LLM, Instructor, Pydantic, data extraction, structured data">
-    
-    <!-- Canonical URL -->
-    {f'<link rel="canonical" href="{canonical_url}">' if canonical_path else ''}
-    
-    <!-- Open Graph / Facebook -->
-    <meta property="og:type" content="{page_type}">
-    <meta property="og:url" content="{canonical_url if canonical_path else site_url}">
-    <meta property="og:title" content="{escape(title)}">
-    <meta property="og:description" content="{escape(page_description)}">
-    
-    <!-- Twitter -->
-    <meta property="twitter:card" content="summary_large_image">
-    <meta property="twitter:url" content="{canonical_url if canonical_path else site_url}">
-    <meta property="twitter:title" content="{escape(title)}">
-    <meta property="twitter:description" content="{escape(page_description)}">
-"""
+    canonical_link = ""
+    if canonical_path:
+        canonical_link = f'<link rel="canonical" href="{canonical_url}">'
+    head = templates.head_meta(
+        title=escape(title),
+        description=escape(page_description),
+        canonical_link=canonical_link,
+        page_type=page_type,
+        url=canonical_url,
+    )
 
     # Add structured data JSON-LD if we have example data
     if example_data and page_type == "article":
-        # Import json here to avoid circular imports
-        import json
-        from datetime import datetime
-        
         # Extract section title if available
-        section_title = example_data.get("section_title", "")
+        section_title = example_data.section_title or ""
         
         # Extract code keywords (use the example ID as a fallback)
         keywords = ["structured data", "LLM", "Instructor", "Pydantic"]
-        if example_data.get("id"):
+        if example_data.id:
             # Convert "001-example-name" to "example name" for keywords
-            example_keyword = "-".join(example_data["id"].split("-")[1:])
+            example_keyword = "-".join(example_data.id.split("-")[1:])
             keywords.append(example_keyword.replace("-", " "))
         
         # Generate JSON-LD for TechArticle
-        json_ld = {
-            "@context": "https://schema.org",
-            "@type": "TechArticle",
-            "headline": example_data.get("title", title),
-            "description": page_description,
-            "author": {
-                "@type": "Person",
-                "name": "Jason Liu"
-            },
-            "publisher": {
-                "@type": "Organization",
-                "name": "Structured Outputs by Example",
-                "url": site_url
-            },
-            "mainEntityOfPage": canonical_url if canonical_path else site_url,
-            "datePublished": datetime.now().strftime("%Y-%m-%dT%H:%M:%S+00:00"),
-            "dateModified": datetime.now().strftime("%Y-%m-%dT%H:%M:%S+00:00"),
-            "articleSection": section_title,
-            "keywords": keywords
-        }
-        
-        head += f"""
-    <!-- Structured Data / JSON-LD -->
-    <script type="application/ld+json">
-    {json.dumps(json_ld, indent=2)}
-    </script>
-"""
-    
-    head += """
-    <!-- Stylesheets -->
-    <link rel='stylesheet' href='https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/default.min.css'>
-    <script src='https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js'></script>
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/firacode@6.2.0/distr/fira_code.css">
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono&display=swap');
-        
-        code, pre code, .hljs {
-            font-family: 'Fira Code', 'JetBrains Mono', monospace;
-            font-feature-settings: "liga" 1;
-        }
+        date = json.dumps(format_build_time(JSON_LD_DATE_FORMAT))
+        json_ld = templates.article_json_ld(
+            headline=json.dumps(example_data.title),
+            description=json.dumps(page_description),
+            site_url=json.dumps(site_url),
+            url=json.dumps(canonical_url if canonical_path else site_url),
+            date=date,
+            section=json.dumps(section_title),
+            keywords=",\n    ".join(json.dumps(keyword) for keyword in keywords),
+        )
         
-        @supports (font-variation-settings: normal) {
-            code, pre code, .hljs {
-                font-family: 'Fira Code VF', 'JetBrains Mono', monospace;
-            }
-        }
-    </style>
-    <script>
-        document.addEventListener('DOMContentLoaded', (event) => {
-            hljs.highlightAll();
-        });
-    </script>
-"""
-    if include_main_css:
-        head += """    <style>
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Helvetica, Arial, sans-serif;
-            line-height: 1.5;
-            color: #222;
-            margin: 0;
-            padding: 0;
-        }
-        .container {
-            max-width: 1100px;
-            margin: 0 auto;
-            padding: 0 20px;
-        }
-        header {
-            border-bottom: 1px solid #eee;
-            padding: 15px 0;
-            margin-bottom: 20px;
-        }
-        .site-title {
-            text-decoration: none;
-            color: #0066CC;
-            font-weight: 500;
-            font-size: 20px;
-        }
-        main {
-            padding-bottom: 40px;
-        }
-        footer {
-            border-top: 1px solid #eee;
-            padding: 15px 0;
-            margin-top: 20px;
-            color: #666;
-            font-size: 0.9em;
-        }
-        h1 {
-            font-size: 36px;
-            font-weight: 500;
-            margin: 0 0 25px 0;
-            color: #333;
-        }
-        p {
-            margin: 20px 0;
-            color: #444;
-            line-height: 1.6;
-        }
-        a {
-            color: #0066CC;
-            text-decoration: none;
-        }
-        a:hover {
-            text-decoration: underline;
-        }
-        .example-link {
-            margin: 4px 0;
-            line-height: 1.3;
-        }
-        .row {
-            display: flex;
-            width: 100%;
-            margin-bottom: 30px;
-            gap: 40px;
-        }
-        .docs {
-            flex: 0.75;
-            min-width: 0;
-            color: #444;
-            line-height: 1.6;
-            font-size: 1em;
-        }
-        .code {
-            flex: 2.25;
-            min-width: 0;
-            position: relative;
-        }
-        pre {
-            margin: 0;
-            padding: 20px;
-            background-color: #f8f8f8;
-            border-radius: 5px;
-            overflow-x: auto;
-            line-height: 1.5;
-        }
-        /* Prevent double styling from highlight.js */
-        pre code.hljs, pre code {
-            background-color: transparent;
-            padding: 0;
-            margin: 0;
-            border: none;
-        }
-        .leading {
-            margin-bottom: 5px;
-        }
-        hr {
-            border: none;
-            border-top: 1px solid #eee;
-            margin: 20px 0;
-        }
-        .buttons {
-            position: absolute;
-            top: 5px;
-            right: 5px;
-            z-index: 10;
-        }
-        .copy {
-            cursor: pointer;
-            width: 18px;
-            height: 18px;
-            opacity: 0.6;
-            color: #666;
-            background-color: #f8f8f8;
-            border-radius: 3px;
-            padding: 3px;
-        }
-        .copy:hover {
-            opacity: 1;
-            color: #0066CC;
-        }
-        .tooltip {
-            position: absolute;
-            background: #333;
-            color: white;
-            padding: 2px 8px;
-            border-radius: 4px;
-            font-size: 12px;
-            top: -25px;
-            right: 0;
-        }
-        .command-prompt {
-            color: #888;
-        }
-        .command-text {
-            font-weight: bold;
-        }
-        .navigation {
-            margin-top: 30px;
-            padding-top: 15px;
-            border-top: 1px solid #eee;
-            display: flex;
-            justify-content: space-between;
-            flex-wrap: wrap;
-        }
-        .prev, .next {
-            margin: 5px 0;
-            font-weight: 500;
-        }
-        .prev {
-            margin-right: auto;
-        }
-        .next {
-            margin-left: auto;
-        }
-        .prev span, .next span {
-            color: #666;
-            font-weight: normal;
-        }
-        @media (max-width: 900px) {
-            .row {
-                flex-direction: column;
-            }
-            .docs, .code {
-                width: 100%;
-            }
-            .newsletter-banner {
-                flex-direction: column;
-                gap: 10px;
-                align-items: stretch !important;
-            }
-            .newsletter-banner > span {
-                text-align: center;
-                margin-bottom: 5px;
-            }
-            .newsletter-banner > div {
-                width: 100% !important;
-            }
-        }
-    </style>
-"""
-    
-    # Add PostHog tracking script
-    head += """    <!-- PostHog Analytics -->
-    <script>
-    !function(t,e){var o,n,p,r;e.__SV||(window.posthog=e,e._i=[],e.init=function(i,s,a){function g(t,e){var o=e.split(".");2==o.length&&(t=t[o[0]],e=o[1]),t[e]=function(){t.push([e].concat(Array.prototype.slice.call(arguments,0)))}}(p=t.createElement("script")).type="text/javascript",p.crossOrigin="anonymous",p.async=!0,p.src=s.api_host.replace(".i.posthog.com","-assets.i.posthog.com")+"/static/array.js",(r=t.getElementsByTagName("script")[0]).parentNode.insertBefore(p,r);var u=e;for(void 0!==a?u=e[a]=[]:a="posthog",u.people=u.people||[],u.toString=function(t){var e="posthog";return"posthog"!==a&&(e+="."+a),t||(e+=" (stub)"),e},u.people.toString=function(){return u.toString(1)+".people (stub)"},o="init capture register register_once register_for_session unregister unregister_for_session getFeatureFlag getFeatureFlagPayload isFeatureEnabled reloadFeatureFlags updateEarlyAccessFeatureEnrollment getEarlyAccessFeatures on onFeatureFlags onSurveysLoaded onSessionId getSurveys getActiveMatchingSurveys renderSurvey canRenderSurvey canRenderSurveyAsync identify setPersonProperties group resetGroups setPersonPropertiesForFlags resetPersonPropertiesForFlags setGroupPropertiesForFlags resetGroupPropertiesForFlags reset get_distinct_id getGroups get_session_id get_session_replay_url alias set_config startSessionRecording stopSessionRecording sessionRecordingStarted captureException loadToolbar get_property getSessionProperty createPersonProfile opt_in_capturing opt_out_capturing has_opted_in_capturing has_opted_out_capturing clear_opt_in_out_capturing debug getPageViewId captureTraceFeedback captureTraceMetric".split(" "),n=0;n<o.length;n++)g(u,o[n]);e._i.push([i,s,a])},e.__SV=1)}(document,window.posthog||[]);
-    posthog.init('phc_3BLxAMqz3UaIZ3My7F034KHaU2jRQpVIG9HOAdR3HXc', {
-        api_host: 'https://us.i.posthog.com',
-        person_profiles: 'identified_only', // or 'always' to create profiles for anonymous users as well
-    })
-    </script>
-"""
+        head += templates.json_ld_script(json_ld=json_ld)
+
+    for url in prefetch_urls:
+        head += templates.prefetch_link(href=url)
+    if _service_worker:
+        head += templates.service_worker_meta(
+            url=f"{base_url}/{SERVICE_WORKER_PATH}"
+        )
     
-    head += f"""</head>
-<body>
-    <div class="container">
-        <header style="display: flex; justify-content: space-between; align-items: center;">
-            <a href="{base_url}/" class="site-title">Structured Outputs by Example</a>
-            <a href="https://github.com/jxnl/structuredoutputsbyexample" target="_blank" style="display: inline-flex; align-items: center; font-size: 0.9em; color: #0066CC; text-decoration: none; gap: 5px;">
-                <svg width="16" height="16" viewBox="0 0 16 16" fill="currentColor">
-                    <path fill-rule="evenodd" d="M8 0C3.58 0 0 3.58 0 8c0 3.54 2.29 6.53 5.47 7.59.4.07.55-.17.55-.38 0-.19-.01-.82-.01-1.49-2.01.37-2.53-.49-2.69-.94-.09-.23-.48-.94-.82-1.13-.28-.15-.68-.52-.01-.53.63-.01 1.08.58 1.23.82.72 1.21 1.87.87 2.33.66.07-.52.28-.87.51-1.07-1.78-.2-3.64-.89-3.64-3.95 0-.87.31-1.59.82-2.15-.08-.2-.36-1.02.08-2.12 0 0 .67-.21 2.2.82.64-.18 1.32-.27 2-.27.68 0 1.36.09 2 .27 1.53-1.04 2.2-.82 2.2-.82.44 1.1.16 1.92.08 2.12.51.56.82 1.27.82 2.15 0 3.07-1.87 3.75-3.65 3.95.29.25.54.73.54 1.48 0 1.07-.01 1.93-.01 2.2 0 .21.15.46.55.38A8.013 8.013 0 0016 8c0-4.42-3.58-8-8-8z"></path>
-                </svg>
-                Star on GitHub
-            </a>
-        </header>
-        
-        <div class="newsletter-banner" style="background-color: #f1f8ff; border-radius: 5px; padding: 10px 15px; margin-bottom: 15px; display: flex; align-items: center; justify-content: space-between; font-size: 0.9em;">
-            <span>Stay updated when new content is added and get tips from the Instructor team</span>
-            <div style="width: 40%;">
-                <iframe src="https://embeds.beehiiv.com/2faf420d-8480-4b6e-8d6f-9c5a105f917a?slim=true" data-test-id="beehiiv-embed" height="52" width="100%" frameborder="0" scrolling="no" style="margin: 0; border-radius: 0px !important; background-color: transparent;"></iframe>
-            </div>
-        </div>
-        
-        <main>
-"""
-    return head
-
-
-def generate_html_footer() -> str:
-    """Generate HTML footer section with current date."""
-    from datetime import datetime
-
-    current_date = datetime.now().strftime("%B %-d, %Y")
-
-    return (
-        """        </main>
-        <footer>
-            <p>by <a href="https://github.com/jxnl/instructor">Instructor</a> | <a href="https://github.com/jxnl/instructor">GitHub</a> | <span style="color: #888; font-size: 0.9em;">Last updated: """
-        + current_date
-        + """</span></p>
-        </footer>
-    </div>
-    <script>
-        // Function to copy code to clipboard
-        function copyCode(button) {
-            const codeBlock = button.closest('.code').querySelector('pre');
-            const code = codeBlock.textContent;
-            copyToClipboard(code, button);
-        }
-        
-        // Function to copy all Python code
-        document.addEventListener('DOMContentLoaded', function() {
-            const copyAllButton = document.getElementById('copy-all-python');
-            if (copyAllButton) {
-                copyAllButton.addEventListener('click', function() {
-                    const allCodeElement = document.getElementById('all-python-code');
-                    const code = allCodeElement.textContent;
-                    copyToClipboard(code, copyAllButton);
-                });
-            }
-        });
-        
-        // Shared function to copy text and show tooltip
-        function copyToClipboard(text, element) {
-            // For older browsers, fallback to textarea method
-            if (!navigator.clipboard) {
-                const textArea = document.createElement('textarea');
-                textArea.value = text;
-                textArea.style.position = 'fixed';  // Avoid scrolling to bottom
-                document.body.appendChild(textArea);
-                textArea.focus();
-                textArea.select();
-                
-                try {
-                    document.execCommand('copy');
-                    showTooltip(element, 'Copied!');
-                } catch (err) {
-                    console.error('Failed to copy text: ', err);
-                    showTooltip(element, 'Error!');
-                }
-                
-                document.body.removeChild(textArea);
-                return;
-            }
-            
-            // Use clipboard API if available
-            navigator.clipboard.writeText(text).then(() => {
-                showTooltip(element, 'Copied!');
-            }).catch(err => {
-                console.error('Failed to copy text: ', err);
-                showTooltip(element, 'Error!');
-            });
-        }
-        
-        // Helper to show tooltip
-        function showTooltip(element, message) {
-            // Check if there's already a tooltip
-            let tooltip = element.parentElement.querySelector('.tooltip');
-            if (tooltip) {
-                tooltip.textContent = message;
-            } else {
-                // Create and append new tooltip
-                tooltip = document.createElement('span');
-                tooltip.textContent = message;
-                tooltip.className = 'tooltip';
-                tooltip.style.position = 'absolute';
-                tooltip.style.background = '#333';
-                tooltip.style.color = 'white';
-                tooltip.style.padding = '2px 8px';
-                tooltip.style.borderRadius = '4px';
-                tooltip.style.fontSize = '12px';
-                tooltip.style.top = '-25px';
-                tooltip.style.right = '0';
-                
-                // Make sure the parent has position relative for tooltip positioning
-                if (getComputedStyle(element.parentElement).position === 'static') {
-                    element.parentElement.style.position = 'relative';
-                }
-                
-                element.parentElement.appendChild(tooltip);
-            }
-            
-            // Remove tooltip after 1.5 seconds
-            setTimeout(() => tooltip.remove(), 1500);
-        }
+    # Stylesheets, analytics and the site header are the same on every page
+    highlight_url = None
+    if _highlighter is not None:
+        highlight_url = f"{base_url}/{_highlighter.stylesheet_path}"
+    return head + templates.head_assets(include_main_css, base_url, highlight_url)
 
-        // Enable keyboard navigation between examples
-        document.addEventListener('keydown', function(e) {
-            if (e.ctrlKey || e.altKey || e.shiftKey || e.metaKey) {
-                return;
-            }
-            
-            if (e.key === 'ArrowRight') {
-                const nextLink = document.querySelector('.next a');
-                if (nextLink) {
-                    window.location.href = nextLink.getAttribute('href');
-                }
-            }
-            
-            if (e.key === 'ArrowLeft') {
-                const prevLink = document.querySelector('.prev a');
-                if (prevLink) {
-                    window.location.href = prevLink.getAttribute('href');
-                }
-            }
-        });
-    </script>
-</body>
-</html>
-"""
+
+def generate_html_footer(base_url: str = ".") -> str:
+    """Generate HTML footer section with the build date.
+
+    Args:
+        base_url: The base URL for relative links
+    """
+    return templates.footer(
+        format_build_time(FOOTER_DATE_FORMAT),
+        asset_url("static/js/script.js", base_url),
     )
 
 
 def generate_index_html(
-    examples: List[Dict[str, Any]], sections: List[Dict[str, Any]], output_dir: Path
+    graph: SiteGraph,
+    output_dir: Path,
+    outputs: Optional[OutputSync] = None,
+    search_index: Optional[str] = None,
 ) -> None:
-    """Generate index.html page with section grouping."""
+    """Generate index.html page with section grouping.
+
+    Args:
+        graph: Navigation of the site
+        output_dir: Output directory for the site
+        outputs: Tracker of the emitted files (defaults to an untracked one)
+        search_index: Path of the search index (see generate_search_index);
+            the page has no search field without it
+    """
+    if outputs is None:
+        outputs = OutputSync(output_dir)
+    examples = graph.examples
     logger.info(
         "Generating index page with %d examples and %d sections"
-        % (len(examples), len(sections))
+        % (len(examples), len(graph.sections))
     )
 
     output_file = output_dir / "index.html"
-    with open(output_file, "w") as f:
-        f.write(generate_html_head(
+    parts = [
+        generate_html_head(
             SITE_TITLE, 
             base_url=".", 
             page_type="website", 
-            canonical_path=""
-        ))
-
-        # Page content
-        f.write(
-            f"""
-            <p style="margin: 20px 0; color: #444; line-height: 1.6;">
-                A hands-on guide to structured data extraction from LLMs using <a href="https://github.com/jxnl/instructor" target="_blank">Instructor</a> 
-                and <a href="https://docs.pydantic.dev/" target="_blank">Pydantic</a>.
-            </p>
-            <p style="margin: 20px 0; color: #444; line-height: 1.6;">
-                Start with the <a href="{examples[0]["id"]}/">first example</a> 
-                or browse below. Use arrow keys to navigate.
-            </p>
-            <p style="margin: 20px 0; color: #444; line-height: 1.6;">
-                Requires Python <code>&gt;=3.9</code> and latest versions of Instructor and Pydantic.
-            </p>
-            <div style="margin-top: 20px;">
-"""
-        )
-
-        # If we have sections defined, group examples by section
-        if sections:
-            # Group examples by section_id
-            examples_by_section = {}
-            for example in examples:
-                section_id = example.get("section_id", "999-misc")
-                if section_id not in examples_by_section:
-                    examples_by_section[section_id] = []
-                examples_by_section[section_id].append(example)
-
-            # Display sections and their examples
-            for section in sorted(sections, key=lambda s: s["order"]):
-                section_examples = examples_by_section.get(section["id"], [])
-                if not section_examples:
-                    continue
-
-                # Section header
-                f.write(
-                    f"""                <h3 style="margin-top: 25px; margin-bottom: 10px; color: #333; font-size: 1.3em;">{section["title"]}</h3>
-"""
-                )
-                # Only include description paragraph if it's not empty
-                description = section.get("description", "")
-                if description:
-                    f.write(
-                        f"""                <p style="margin: 0 0 10px 0; color: #555; font-size: 0.9em;">{description}</p>
-"""
+            canonical_path="",
+            prefetch_urls=(f"{examples[0].id}/",),
+        ),
+        templates.index_intro(first_example_id=examples[0].id),
+    ]
+    if search_index is not None:
+        parts.append(templates.index_search(index_url=escape(search_index)))
+
+    # If we have sections defined, group examples by section
+    if graph.sections:
+        # Display sections and their examples
+        for section, section_examples in graph.populated_sections():
+            parts.append(templates.index_section_title(title=section.title))
+            # Only include description paragraph if it's not empty
+            if section.description:
+                parts.append(
+                    templates.index_section_description(
+                        description=section.description
                     )
+                )
 
-                # Example links for this section
-                for example in sorted(section_examples, key=lambda e: e["order"]):
-                    f.write(
-                        f"""                <div class="example-link">
-                        <a href="{example["id"]}/">{example["title"]}</a>
-                    </div>
-"""
+            # Example links for this section
+            for example in section_examples:
+                parts.append(
+                    templates.index_example_link(
+                        id=example.id, title=example.title
                     )
-        else:
-            # Fallback to flat list if no sections
-            for example in examples:
-                f.write(
-                    f"""                <div class="example-link">
-                        <a href="{example["id"]}/">{example["title"]}</a>
-                    </div>
-"""
                 )
+    else:
+        # Fallback to flat list if no sections
+        for example in examples:
+            parts.append(
+                templates.index_example_link(id=example.id, title=example.title)
+            )
 
-        f.write("            </div>\n")
-        f.write(generate_html_footer())
+    parts.append(templates.INDEX_END)
+    parts.append(generate_html_footer())
+    outputs.write_text(output_file, finish_page("".join(parts)))
 
     logger.info("Generated index page at %s" % output_file)
 
 
+def generate_search_index(
+    graph: SiteGraph,
+    output_dir: Path,
+    outputs: Optional[OutputSync] = None,
+    cache: Optional[SearchIndexCache] = None,
+) -> str:
+    """
+    Publish the search index of the examples under its fingerprinted name.
+
+    Only the index page links the index, so a change to it does not
+    invalidate the example pages.
+
+    Args:
+        graph: Navigation of the site
+        output_dir: Output directory for the site
+        outputs: Tracker of the emitted files (defaults to an untracked one)
+        cache: Terms of the examples indexed by previous builds
+
+    Returns:
+        Path of the index, relative to the output directory
+    """
+    if outputs is None:
+        outputs = OutputSync(output_dir)
+    index = build_search_index(graph.examples, cache)
+    path = fingerprinted_name("static/search-index.json", index.encode("utf-8"))
+    outputs.write_text(output_dir / path, index)
+    logger.info(
+        "Generated search index %s (%d bytes)" % (path, len(index.encode("utf-8")))
+    )
+    return path
+
+
 def copy_example_images(
-    example: Dict[str, Any], project_root: Path, output_dir: Path
+    example: Example,
+    project_root: Path,
+    output_dir: Path,
+    inventory: Optional[Inventory] = None,
+    outputs: Optional[OutputSync] = None,
 ) -> None:
     """
     Copy images from the example directory to the output directory.
 
+    Images that are already up to date are not copied again.
+
     Args:
         example: The example data
         project_root: Project root path
         output_dir: Output directory for the example
+        inventory: Inventory of the examples directory, used instead of
+            checking each image on disk
+        outputs: Tracker of the emitted files (defaults to an untracked one)
     """
-    image_data = example.get("image_data", [])
+    image_data = example.body.image_data
     if not image_data:
         return
+    if outputs is None:
+        outputs = OutputSync(output_dir)
 
     # Create images directory in the example output directory
     images_dir = output_dir / "images"
-    images_dir.mkdir(exist_ok=True, parents=True)
 
     # Copy each image
     for image in image_data:
-        src_path = project_root / image["path"]
-        dst_path = images_dir / image["filename"]
+        src_path = project_root / image.path
+        dst_path = images_dir / image.filename
 
-        if src_path.exists():
+        if inventory is not None:
+            found = inventory.stat(src_path) is not None
+        else:
+            found = src_path.exists()
+
+        if found:
             try:
-                shutil.copy2(src_path, dst_path)
-                logger.info(f"Copied image {src_path} to {dst_path}")
+                if outputs.copy_file(src_path, dst_path):
+                    logger.info(f"Copied image {src_path} to {dst_path}")
             except Exception as e:
                 logger.error(f"Failed to copy image {src_path}: {e}")
         else:
@@ -711,30 +707,102 @@ def copy_example_images(
 
 
 def generate_example_html(
-    example: Dict[str, Any], examples: List[Dict[str, Any]], output_dir: Path
+    example: Example,
+    graph: SiteGraph,
+    output_dir: Path,
+    inventory: Optional[Inventory] = None,
+    project_root: Optional[Path] = None,
+    outputs: Optional[OutputSync] = None,
 ) -> None:
-    """Generate an individual example page."""
+    """
+    Generate an individual example page.
+
+    Args:
+        example: The example to render
+        graph: Navigation of the site, for the previous/next links
+        output_dir: Output directory for the site
+        inventory: Inventory of the examples directory
+        project_root: Root that image paths are relative to (defaults to the
+            directory of this script)
+        outputs: Tracker of the emitted files (defaults to an untracked one)
+    """
+    write_example_page(
+        example,
+        graph.prev(example),
+        graph.next(example),
+        output_dir,
+        inventory,
+        project_root,
+        outputs,
+    )
+
+
+def write_example_page(
+    example: Example,
+    prev_example: Optional[Example],
+    next_example: Optional[Example],
+    output_dir: Path,
+    inventory: Optional[Inventory] = None,
+    project_root: Optional[Path] = None,
+    outputs: Optional[OutputSync] = None,
+) -> None:
+    """
+    Write an example page and its images, given its previous/next examples.
+
+    Only the ID and title of the previous and next examples are used.
+
+    Args:
+        example: The example to render
+        prev_example: The previous example, if any
+        next_example: The next example, if any
+        output_dir: Output directory for the site
+        inventory: Inventory of the examples directory
+        project_root: Root that image paths are relative to (defaults to the
+            directory of this script)
+        outputs: Tracker of the emitted files (defaults to an untracked one)
+    """
+    if outputs is None:
+        outputs = OutputSync(output_dir)
     logger.info(
-        "Generating page for example: %s - %s" % (example["id"], example["title"])
+        "Generating page for example: %s - %s" % (example.id, example.title)
     )
 
     # Create directory for example
-    example_dir = output_dir / example["id"]
-    example_dir.mkdir(exist_ok=True, parents=True)
+    example_dir = output_dir / example.id
 
     # Copy images if any
-    script_dir = Path(__file__).parent
-    copy_example_images(example, script_dir, example_dir)
+    if project_root is None:
+        project_root = Path(__file__).parent
+    copy_example_images(example, project_root, example_dir, inventory, outputs)
 
-    # Create index.html in the example directory
+    # Create index.html in the example directory, unless it is unchanged
     output_file = example_dir / "index.html"
+    page = finish_page(render_example_page(example, prev_example, next_example))
+    if outputs.write_text(output_file, page):
+        logger.info("Generated example page at %s" % output_file)
+    else:
+        logger.info("Example page %s is unchanged" % output_file)
 
-    # Find the next and previous examples
-    next_example = find_next_example(examples, example)
-    prev_example = find_prev_example(examples, example)
-    
+
+def render_example_page(
+    example: Example,
+    prev_example: Optional[Example],
+    next_example: Optional[Example],
+) -> str:
+    """
+    Render the HTML of an example page.
+
+    Args:
+        example: The example to render
+        prev_example: The previous example, if any
+        next_example: The next example, if any
+
+    Returns:
+        The page
+    """
     # Extract description from example
-    page_description = example.get("description", SITE_DESCRIPTION)
+    body = example.body
+    page_description = body.description
     
     # Only use first sentence of description if it's too long
     if len(page_description) > 160:
@@ -742,349 +810,375 @@ def generate_example_html(
         page_description = first_sentence
         
     # Build canonical path
-    canonical_path = f"{example['id']}/"
+    canonical_path = f"{example.id}/"
 
-    with open(output_file, "w") as f:
-        f.write(generate_html_head(
-            f"{example['title']} - {SITE_TITLE}", 
+    # The page is rendered into one list of fragments, joined at the end
+    parts = [
+        generate_html_head(
+            f"{example.title} - {SITE_TITLE}", 
             base_url="..",
             description=page_description,
             page_type="article",
             canonical_path=canonical_path,
-            example_data=example
-        ))
+            example_data=example,
+            # Readers mostly go on to the next example, or back one
+            prefetch_urls=tuple(
+                f"../{neighbour.id}/"
+                for neighbour in (next_example, prev_example)
+                if neighbour is not None
+            ),
+        )
+    ]
 
-        # Collect all Python code for the "Copy All" button first
-        all_python_code = ""
-        for segment in example["code_segments"]:
-            code_text = segment.get("display_code", "").strip()
-            if code_text:
-                all_python_code += code_text + "\n"
+    # Strip each segment's code once, it is used for the button and the rows
+    code_texts = [segment.display_code.strip() for segment in body.code_segments]
 
-        # Section and page title with "Copy All" button
-        section_title = example.get("section_title", "")
+    # Collect all Python code for the "Copy All" button first
+    all_python_code = "".join(
+        code_text + "\n" for code_text in code_texts if code_text
+    )
 
-        # Header container with flexbox to position title and button
-        f.write(
-            """            <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 20px;">
-                <div>
-"""
-        )
+    # Section and page title with "Copy All" button
+    section_title = example.section_title or ""
 
-        # Title part
-        if section_title:
-            f.write(
-                f"""                    <div style="margin-bottom: 10px; color: #666; font-size: 0.9em;">
-                        <a href="../" style="text-decoration: none; color: #666;">{section_title}</a>
-                    </div>
-                    <h1 style="margin: 0; margin-bottom: 10px;">{example["title"]}</h1>
-"""
-            )
-        else:
-            f.write(
-                f"""                    <h1 style="margin: 0; margin-bottom: 10px;">{example["title"]}</h1>
-"""
+    # Header container with flexbox to position title and button
+    parts.append(templates.TITLE_START)
+
+    # Title part
+    if section_title:
+        parts.append(
+            templates.example_section_title(
+                section_title=section_title, title=example.title
             )
+        )
+    else:
+        parts.append(templates.example_title(title=example.title))
 
-        f.write(
-            """                </div>
-"""
+    parts.append(templates.TITLE_TEXT_END)
+
+    # Button part (if we have Python code)
+    if all_python_code:
+        # GitHub edit URL - extract the base name from the example ID (after the dash)
+        example_id_parts = example.id.split("-", 1)
+        python_filename = (
+            example_id_parts[1] if len(example_id_parts) > 1 else example.id
         )
+        github_edit_url = f"https://github.com/jxnl/structuredoutputsbyexample/edit/main/examples/{example.id}/{python_filename}.py"
 
-        # Button part (if we have Python code)
-        if all_python_code:
-            # GitHub edit URL - extract the base name from the example ID (after the dash)
-            example_id_parts = example["id"].split("-", 1)
-            python_filename = (
-                example_id_parts[1] if len(example_id_parts) > 1 else example["id"]
-            )
-            github_edit_url = f"https://github.com/jxnl/structuredoutputsbyexample/edit/main/examples/{example['id']}/{python_filename}.py"
-
-            f.write(
-                """                <div style="position: relative; margin-top: 10px; display: flex; gap: 8px;">
-                    <button id="copy-all-python" style="background-color: #f1f8ff; border: 1px solid #c8e1ff; border-radius: 6px; padding: 6px 12px; font-size: 14px; color: #0066CC; cursor: pointer; display: flex; align-items: center; gap: 6px;">
-                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
-                            <path d="M16 1H4C2.9 1 2 1.9 2 3V17H4V3H16V1ZM19 5H8C6.9 5 6 5.9 6 7V21C6 22.1 6.9 23 8 23H19C20.1 23 21 22.1 21 21V7C21 5.9 20.1 5 19 5ZM19 21H8V7H19V21Z" fill="currentColor"/>
-                        </svg>
-                        Copy All Python
-                    </button>"""
-                + f"""
-                    <a href="{github_edit_url}" target="_blank" style="background-color: #f6f1ff; border: 1px solid #d8c9f7; border-radius: 6px; padding: 6px 12px; font-size: 14px; color: #6f42c1; text-decoration: none; cursor: pointer; display: flex; align-items: center; gap: 6px;">
-                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
-                            <path d="M3 17.25V21h3.75L17.81 9.94l-3.75-3.75L3 17.25zM20.71 7.04c.39-.39.39-1.02 0-1.41l-2.34-2.34c-.39-.39-1.02-.39-1.41 0l-1.83 1.83 3.75 3.75 1.83-1.83z" fill="currentColor"/>
-                        </svg>
-                        Edit
-                    </a>
-                    <div id="all-python-code" style="display: none;">{escape(all_python_code)}</div>
-                </div>"""
+        parts.append(
+            templates.copy_all_buttons(
+                github_edit_url=github_edit_url,
+                all_python_code=escape(all_python_code),
             )
-
-        # Close header container
-        f.write(
-            """            </div>
-"""
         )
 
-        # Description if available
-        if example.get("description"):
-            # Replace newlines with <br> tags to preserve formatting
-            formatted_description = example["description"].replace("\n", "<br>")
-            f.write(
-                f"""            <p style="margin: 20px 0 40px 0; color: #444; line-height: 1.6; font-size: 1.1em; white-space: pre-line;">
-                {formatted_description}
-            </p>
-"""
+    # Close header container
+    parts.append(templates.TITLE_END)
+
+    # Description if available
+    if body.description:
+        # Replace newlines with <br> tags to preserve formatting
+        formatted_description = body.description.replace("\n", "<br>")
+        parts.append(templates.example_description(description=formatted_description))
+
+    # Group segments by section headers
+    sections = []
+    current_section = None
+    current_segments = []
+
+    for segment, code_text in zip(body.code_segments, code_texts):
+        annotation = segment.annotation
+
+        # Skip completely empty segments
+        if not annotation and not code_text:
+            continue
+
+        # If annotation with no code, it's a section header
+        if annotation and not code_text:
+            # Add previous section if exists
+            if current_section:
+                sections.append(
+                    {"header": current_section, "segments": current_segments}
+                )
+
+            # Start a new section
+            current_section = annotation
+            current_segments = []
+        else:
+            # Add to current section
+            current_segments.append((segment, code_text))
+
+    # Add the final section
+    if current_section and current_segments:
+        sections.append({"header": current_section, "segments": current_segments})
+
+    # Process each section
+    for i, section in enumerate(sections):
+        # Add divider if not first section
+        if i > 0:
+            parts.append(templates.DIVIDER)
+
+        # The section header is shown next to every segment of the section
+        section_header = ""
+        if section["header"]:
+            # Replace newlines with <br> tags in section header
+            section_header = templates.segment_header(
+                header=section["header"].replace("\n", "<br>")
             )
 
-        # Group segments by section headers
-        sections = []
-        current_section = None
-        current_segments = []
+        # Process segments in this section
+        for segment, code_text in section["segments"]:
+            combined_annotation = section_header
 
-        for segment in example["code_segments"]:
-            annotation = segment.get("annotation", "")
-            code_text = segment.get("display_code", "").strip()
+            annotation = segment.annotation
+            if annotation:
+                # Replace newlines with <br> tags to preserve formatting
+                combined_annotation += annotation.replace("\n", "<br>")
 
-            # Skip completely empty segments
-            if not annotation and not code_text:
+            # If there's no code or annotation, skip
+            if not code_text and not combined_annotation:
                 continue
 
-            # If annotation with no code, it's a section header
-            if annotation and not code_text:
-                # Add previous section if exists
-                if current_section:
-                    sections.append(
-                        {"header": current_section, "segments": current_segments}
-                    )
+            parts.append(templates.ROW_START)
 
-                # Start a new section
-                current_section = annotation
-                current_segments = []
-            else:
-                # Add to current section
-                current_segments.append(segment)
-
-        # Add the final section
-        if current_section and current_segments:
-            sections.append({"header": current_section, "segments": current_segments})
-
-        # Process each section
-        for i, section in enumerate(sections):
-            # Add divider if not first section
-            if i > 0:
-                f.write(
-                    """            <hr>
-"""
-                )
+            # Left column (annotation)
+            if combined_annotation:
+                parts.append(templates.docs_column(annotation=combined_annotation))
 
-            # Process segments in this section
-            for segment in section["segments"]:
-                combined_annotation = ""
-                if section["header"]:
-                    # Replace newlines with <br> tags in section header
-                    header_with_breaks = section["header"].replace("\n", "<br>")
-                    combined_annotation += f"<div style='font-size: 0.9em; color: #666;'>{header_with_breaks}</div>\n"
-
-                annotation = segment.get("annotation", "")
-                if annotation:
-                    # Replace newlines with <br> tags to preserve formatting
-                    annotation = annotation.replace("\n", "<br>")
-                    combined_annotation += annotation
-
-                code_text = segment.get("display_code", "").strip()
-
-                # If there's no code or annotation, skip
-                if not code_text and not combined_annotation:
-                    continue
-
-                # Start row
-                f.write(
-                    """            <div class="row">
-"""
-                )
+            # Right column (code) - without individual copy buttons
+            if code_text:
+                parts.append(templates.code_column(code=highlight_code(code_text)))
 
-                # Left column (annotation)
-                if combined_annotation:
-                    f.write(
-                        f"""                <div class="docs">
-                    {combined_annotation}
-                </div>
-"""
-                    )
+            parts.append(templates.ROW_END)
 
-                # Right column (code) - without individual copy buttons
-                if code_text:
-                    f.write(
-                        f"""                <div class="code">
-                    <pre><code class="language-python">{escape(code_text)}</code></pre>
-                </div>
-"""
+    # Shell segments if available
+    shell_segments = body.shell_segments
+    if shell_segments:
+        parts.append(templates.SHELL_START)
+
+        for segment in shell_segments:
+            parts.append(templates.ROW_START)
+
+            # Left column (explanation)
+            explanation = segment.explanation
+            if explanation:
+                # Replace newlines with <br> tags to preserve formatting in explanations
+                parts.append(
+                    templates.shell_docs_column(
+                        explanation=escape(explanation.replace("\n", "<br>"))
                     )
+                )
 
-                # End row
-                f.write(
-                    """            </div>
-"""
+            # Right column (command + output); like highlight.js, only the
+            # command is highlighted, the output is shown as is
+            parts.append(
+                templates.shell_code_column(
+                    command=highlight_code(segment.command, "bash"),
+                    output=escape(segment.output),
                 )
+            )
 
-        # Shell segments if available
-        shell_segments = example.get("shell_segments", [])
-        if shell_segments:
-            f.write(
-                """            <hr>
-            <h2>Running the Example</h2>
-"""
+            parts.append(templates.ROW_END)
+
+    # Images section if available
+    image_data = body.image_data
+    if image_data:
+        parts.append(templates.DIVIDER)
+        for image in image_data:
+            # Create a figure with the image
+            parts.append(templates.image_figure(filename=image.filename))
+
+    # Documentation links section if available
+    documentation_links = body.documentation_links
+    if documentation_links:
+        parts.append(templates.LINKS_START)
+        for i, link in enumerate(documentation_links, 1):
+            parts.append(templates.documentation_link(link=link, number=i))
+        parts.append(templates.LINKS_END)
+
+    # Navigation links
+    parts.append(templates.NAVIGATION_START)
+
+    # Previous example link
+    if prev_example:
+        parts.append(
+            templates.navigation_prev(
+                id=prev_example.id, title=prev_example.title
             )
+        )
 
-            for segment in shell_segments:
-                explanation = segment.get("explanation", "")
-                # Replace newlines with <br> tags to preserve formatting in explanations
-                if explanation:
-                    explanation = explanation.replace("\n", "<br>")
-                command = segment.get("command", "")
-                output = segment.get("output", "")
+    # Next example link
+    if next_example:
+        parts.append(
+            templates.navigation_next(
+                id=next_example.id, title=next_example.title
+            )
+        )
 
-                f.write(
-                    """            <div class="row">
-"""
-                )
+    parts.append(templates.NAVIGATION_END)
 
-                # Left column (explanation)
-                if explanation:
-                    f.write(
-                        f"""                <div class="docs" style='font-size: 0.9em; color: #666;'>
-                    {escape(explanation)}
-                </div>
-"""
-                    )
+    parts.append(generate_html_footer(".."))
+    return "".join(parts)
 
-                # Right column (command + output)
-                f.write(
-                    f"""                <div class="code">
-                    <div class="buttons">
-                        <svg class="copy" title="Copy command" onclick="copyCode(this)" width="18" height="18" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
-                            <path d="M16 1H4C2.9 1 2 1.9 2 3V17H4V3H16V1ZM19 5H8C6.9 5 6 5.9 6 7V21C6 22.1 6.9 23 8 23H19C20.1 23 21 22.1 21 21V7C21 5.9 20.1 5 19 5ZM19 21H8V7H19V21Z" fill="currentColor"/>
-                        </svg>
-                    </div>
-                    <pre><code class="language-shell"><span><span class="command-prompt">$ </span><span class="command-text">{escape(command)}</span></span>
-{escape(output)}</code></pre>
-                </div>
-"""
-                )
 
-                f.write(
-                    """            </div>
-"""
-                )
+# Settings shared by every page in a render worker (see init_render_worker)
+_render_worker_state: Dict[str, Any] = {}
 
-        # Images section if available
-        image_data = example.get("image_data", [])
-        if image_data:
-            f.write(
-                """            <hr>
-"""
-            )
 
-            for image in image_data:
-                filename = image.get("filename", "")
-
-                # Create a figure with the image
-                f.write(
-                    f"""            <div style="margin: 30px 0; text-align: center;">
-                <figure>
-                    <img src="images/{filename}" alt="An illustration or output
-                    from the example code" style="max-width: 100%; border: 1px solid #eee;
-                    border-radius: 4px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                    <figcaption style="margin-top: 10px; color: #666; font-style: italic;"></figcaption>
-                </figure>
-            </div>
-"""
-                )
+def init_render_worker(
+    timestamp: datetime,
+    asset_paths: Dict[str, str],
+    highlighter: Optional[Highlighter],
+    minify: bool,
+    service_worker: bool,
+    inventory: Optional[Inventory],
+    project_root: Path,
+    profiling: bool,
+) -> None:
+    """
+    Process pool initializer for rendering example pages.
 
-        # Documentation links section if available
-        documentation_links = example.get("documentation_links", [])
-        if documentation_links:
-            f.write(
-                """            <hr>
-            <h4>Further Information</h4>
-            <ul style="font-size: 0.9em;">
-"""
-            )
-            for i, link in enumerate(documentation_links, 1):
-                f.write(
-                    f"""                <li><a href="{link}"
-                         target="_blank">Documentation link {i}</a></li>
-"""
-                )
-            f.write(
-                """            </ul>
-"""
-            )
+    Args:
+        timestamp: Build time of the main process
+        asset_paths: Fingerprinted paths of the static assets
+        highlighter: Build-time highlighter of code blocks, if enabled
+        minify: Whether to minify pages
+        service_worker: Whether pages register the service worker
+        inventory: Inventory of the examples directory
+        project_root: Root that image paths are relative to
+        profiling: Whether to record profiling spans
+    """
+    set_build_time(timestamp)
+    set_asset_paths(asset_paths)
+    set_highlighter(highlighter)
+    set_minify(minify)
+    set_service_worker(service_worker)
+    _render_worker_state["inventory"] = inventory
+    _render_worker_state["project_root"] = project_root
+    if profiling:
+        enable_in_worker()
+
+
+def render_page_in_worker(
+    example: Example,
+    prev_example: Optional[Example],
+    next_example: Optional[Example],
+    output_dir: Path,
+) -> Tuple[OutputSync, List[Dict[str, Any]], Dict[str, str], List[str]]:
+    """
+    Write an example page in a worker process.
 
-        # Navigation links
-        f.write(
-            """            <div class="navigation">
-"""
-        )
+    Args:
+        example: The example to render
+        prev_example: The previous example, if any
+        next_example: The next example, if any
+        output_dir: Output directory for the site
 
-        # Previous example link
-        if prev_example:
-            f.write(
-                f"""                <p class="prev">
-                    <span>← Previous:</span> <a href="../{prev_example["id"]}/">{prev_example["title"]}</a>
-                </p>
-"""
-            )
+    Returns:
+        Tuple containing (the files the page emitted, profiling spans to merge
+        into the main process's trace, code the page highlighted for the
+        highlight cache, and the highlight cache keys of its code blocks)
+    """
+    outputs = OutputSync(output_dir)
+    with profiler.span("generate_example_html", EXAMPLE_CATEGORY, example=example.id):
+        write_example_page(
+            example,
+            prev_example,
+            next_example,
+            output_dir,
+            _render_worker_state["inventory"],
+            _render_worker_state["project_root"],
+            outputs,
+        )
+    events, profiler.events = profiler.events, []
+    highlighted = _highlighter.take_added() if _highlighter is not None else {}
+    return outputs, events, highlighted, highlight_keys(example)
 
-        # Next example link
-        if next_example:
-            f.write(
-                f"""                <p class="next">
-                    <span>Next:</span> <a href="../{next_example["id"]}/">{next_example["title"]}</a> →
-                </p>
-"""
-            )
 
-        f.write(
-            """            </div>
-"""
-        )
+def page_link(example: Optional[Example]) -> Optional[Example]:
+    """Copy of an example with only what previous/next links need."""
+    if example is None:
+        return None
+    return Example(id=example.id, title=example.title, order=example.order)
 
-        f.write(generate_html_footer())
 
-    logger.info("Generated example page at %s" % output_file)
+def copy_static_files(
+    source_dir: Path, output_dir: Path, outputs: Optional[OutputSync] = None
+) -> Dict[str, str]:
+    """
+    Publish static files under fingerprinted names, skipping unchanged ones.
 
+    Args:
+        source_dir: The static files
+        output_dir: Output directory for the site
+        outputs: Tracker of the emitted files (defaults to an untracked one)
 
-def copy_static_files(source_dir: Path, output_dir: Path) -> None:
-    """Copy static files to the output directory."""
+    Returns:
+        Fingerprinted path of each file, both relative to the output directory
+        (such as "static/js/script.js" -> "static/js/script.0123456789ab.js")
+    """
+    if outputs is None:
+        outputs = OutputSync(output_dir)
     target_dir = output_dir / "static"
 
-    # Create target directory
-    target_dir.mkdir(exist_ok=True, parents=True)
-
-    # Copy static files
+    asset_paths = {}
     if source_dir.exists():
         logger.info("Copying static files from %s to %s" % (source_dir, target_dir))
-        shutil.copytree(source_dir, target_dir, dirs_exist_ok=True)
+        for source_file in sorted(source_dir.rglob("*")):
+            if not source_file.is_file():
+                continue
+            path = f"static/{source_file.relative_to(source_dir).as_posix()}"
+            asset_paths[path] = fingerprinted_name(path, source_file.read_bytes())
+            outputs.copy_file(source_file, output_dir / asset_paths[path])
     else:
         logger.warning("Static directory %s does not exist" % source_dir)
+    return asset_paths
+
+
+def write_site_stylesheet(output_dir: Path, outputs: OutputSync) -> None:
+    """
+    Publish the main stylesheet under its fingerprinted name.
+
+    Pages link the stylesheet instead of inlining it, so it is downloaded
+    once and cached. Stylesheets of earlier builds are pruned with the other
+    stale outputs.
+
+    Args:
+        output_dir: The output directory
+        outputs: Tracker of the emitted files
+    """
+    css = templates.SITE_CSS
+    outputs.write_text(output_dir / templates.SITE_STYLESHEET, css)
+
+    # What each page saves by linking the stylesheet instead of inlining it
+    inline = "    <style>\n" + indent(css, " " * 8) + "    </style>\n"
+    link = templates.stylesheet_link(href=f"../{templates.SITE_STYLESHEET}")
+    logger.info(
+        "Published %s (%d bytes); each page is %d bytes smaller than with the "
+        "stylesheet inlined"
+        % (
+            templates.SITE_STYLESHEET,
+            len(css.encode("utf-8")),
+            len(inline.encode("utf-8")) - len(link.encode("utf-8")),
+        )
+    )
 
 
-def extract_code_from_example(example: Dict[str, Any]) -> str:
+def extract_code_from_example(example: Example) -> str:
     """Extract all Python code from an example's code segments."""
     code = ""
-    for segment in example.get("code_segments", []):
-        if segment.get("display_code", "").strip():
-            code += segment.get("display_code", "").strip() + "\n"
+    for segment in example.body.code_segments:
+        if segment.display_code.strip():
+            code += segment.display_code.strip() + "\n"
     return code.strip()
 
 
-def extract_shell_from_example(example: Dict[str, Any]) -> str:
+def extract_shell_from_example(example: Example) -> str:
     """Extract shell commands and outputs from an example."""
     shell = ""
-    for segment in example.get("shell_segments", []):
-        cmd = segment.get("command", "").strip()
-        out = segment.get("output", "").strip()
+    for segment in example.body.shell_segments:
+        cmd = segment.command.strip()
+        out = segment.output.strip()
         if cmd:
             shell += f"$ {cmd}\n"
             if out:
@@ -1093,22 +1187,18 @@ def extract_shell_from_example(example: Dict[str, Any]) -> str:
 
 
 def generate_llms_ctx_txt(
-    examples: List[Dict[str, Any]], sections: List[Dict[str, Any]], output_dir: Path
+    graph: SiteGraph,
+    output_dir: Path,
+    outputs: Optional[OutputSync] = None,
 ) -> None:
     """Generate llms-ctx.txt file with organized headers and full example code."""
+    if outputs is None:
+        outputs = OutputSync(output_dir)
     logger.info("Generating llms-ctx.txt")
 
     output_file = output_dir / "llms-ctx.txt"
 
-    # Group examples by section
-    examples_by_section = {}
-    for example in examples:
-        section_id = example.get("section_id", "999-misc")
-        if section_id not in examples_by_section:
-            examples_by_section[section_id] = []
-        examples_by_section[section_id].append(example)
-
-    with open(output_file, "w") as f:
+    with outputs.open_text(output_file) as f:
         # Main heading and introduction
         f.write("# Structured Outputs by Example\n\n")
         f.write(
@@ -1120,37 +1210,29 @@ def generate_llms_ctx_txt(
 
         # Table of contents
         f.write("## Table of Contents\n\n")
-        for section in sorted(sections, key=lambda s: s["order"]):
-            section_examples = examples_by_section.get(section["id"], [])
-            if not section_examples:
-                continue
-
-            f.write(f"* {section['title']}\n")
-            for example in sorted(section_examples, key=lambda e: e["order"]):
-                f.write(f"  * {example['title']}\n")
+        for section, section_examples in graph.populated_sections():
+            f.write(f"* {section.title}\n")
+            for example in section_examples:
+                f.write(f"  * {example.title}\n")
         f.write("\n")
 
         # Each section with its examples
-        for section in sorted(sections, key=lambda s: s["order"]):
-            section_examples = examples_by_section.get(section["id"], [])
-            if not section_examples:
-                continue
-
+        for section, section_examples in graph.populated_sections():
             # Section heading
-            f.write(f"## {section['title']}\n\n")
+            f.write(f"## {section.title}\n\n")
 
             # Section description if available
-            if section.get("description"):
-                f.write(f"{section['description']}\n\n")
+            if section.description:
+                f.write(f"{section.description}\n\n")
 
             # Each example in the section
-            for example in sorted(section_examples, key=lambda e: e["order"]):
+            for example in section_examples:
                 # Example heading
-                f.write(f"### {example['title']}\n\n")
+                f.write(f"### {example.title}\n\n")
 
                 # Example description if available
-                if example.get("description"):
-                    f.write(f"{example['description']}\n\n")
+                if example.body.description:
+                    f.write(f"{example.body.description}\n\n")
 
                 # Python code
                 python_code = extract_code_from_example(example)
@@ -1167,13 +1249,13 @@ def generate_llms_ctx_txt(
                     f.write("\n```\n\n")
 
                 # Image references if any
-                if example.get("image_data"):
+                if example.body.image_data:
                     f.write(
                         "*This example includes images which can be viewed on the website.*\n\n"
                     )
 
                 # Documentation links if any
-                documentation_links = example.get("documentation_links", [])
+                documentation_links = example.body.documentation_links
                 if documentation_links:
                     f.write("For more information, see the original documentation:\n")
                     for link in documentation_links:
@@ -1184,22 +1266,18 @@ def generate_llms_ctx_txt(
 
 
 def generate_llms_txt(
-    examples: List[Dict[str, Any]], sections: List[Dict[str, Any]], output_dir: Path
+    graph: SiteGraph,
+    output_dir: Path,
+    outputs: Optional[OutputSync] = None,
 ) -> None:
     """Generate llms.txt file with simplified content and links to examples."""
+    if outputs is None:
+        outputs = OutputSync(output_dir)
     logger.info("Generating simplified llms.txt")
 
     output_file = output_dir / "llms.txt"
 
-    # Group examples by section
-    examples_by_section = {}
-    for example in examples:
-        section_id = example.get("section_id", "999-misc")
-        if section_id not in examples_by_section:
-            examples_by_section[section_id] = []
-        examples_by_section[section_id].append(example)
-
-    with open(output_file, "w") as f:
+    with outputs.open_text(output_file) as f:
         # Main heading and introduction
         f.write("# Structured Outputs by Example\n\n")
         f.write(
@@ -1221,20 +1299,16 @@ def generate_llms_txt(
         )
 
         # Each section with its examples
-        for section in sorted(sections, key=lambda s: s["order"]):
-            section_examples = examples_by_section.get(section["id"], [])
-            if not section_examples:
-                continue
-
+        for section, section_examples in graph.populated_sections():
             # Section heading
-            f.write(f"## {section['title']}\n\n")
+            f.write(f"## {section.title}\n\n")
 
             # Each example in the section as a bullet point
-            for example in sorted(section_examples, key=lambda e: e["order"]):
-                f.write(f"- {example['title']}")
-                if example.get("description"):
+            for example in section_examples:
+                f.write(f"- {example.title}")
+                if example.body.description:
                     # Format multi-line descriptions with proper indentation
-                    desc_lines = example["description"].split("\n")
+                    desc_lines = example.body.description.split("\n")
                     # Add first line after the title
                     f.write(f": {desc_lines[0]}")
                     # Add remaining lines with proper indentation
@@ -1248,9 +1322,7 @@ def generate_llms_txt(
             f.write("\n")
 
         # Add footer information
-        from datetime import datetime
-
-        current_date = datetime.now().strftime("%B %-d, %Y")
+        current_date = format_build_time(FOOTER_DATE_FORMAT)
 
         f.write("## Resources\n\n")
         f.write("- [Instructor GitHub](https://github.com/jxnl/instructor)\n")
@@ -1263,73 +1335,99 @@ def generate_llms_txt(
     logger.info(f"Generated simplified llms.txt at {output_file}")
 
 
-def clean_docs_directory(output_dir: Path) -> None:
+def generate_catalog_file(
+    name: str,
+    generate: Callable[[SiteGraph, Path, OutputSync], None],
+    graph: SiteGraph,
+    output_dir: Path,
+    outputs: OutputSync,
+    page_cache: Optional[PageCache] = None,
+    *inputs: str,
+) -> None:
     """
-    Clean up old files and example directories in the docs directory.
+    Generate an llms file, unless no example changed since the previous build.
 
-    Preserves important files like CNAME, .nojekyll, etc.
+    The llms files read the body of every example, which a sharded catalog
+    otherwise only loads for the pages that are rendered again.
+
+    Args:
+        name: The file's name in the output directory
+        generate: Function writing the file (generate_llms_txt or
+            generate_llms_ctx_txt)
+        graph: Navigation of the site
+        output_dir: Output directory for the site
+        outputs: Tracker of the emitted files
+        page_cache: Digests of the previous build, if cached
+        inputs: Other inputs of the file, such as the build date it shows
+    """
+    output_file = output_dir / name
+    digest = None
+    if page_cache is not None:
+        digest = page_cache.catalog_digest(graph, *inputs)
+        if page_cache.is_fresh(name, digest, output_file):
+            outputs.keep_file(output_file)
+            logger.info("%s is up to date" % name)
+            return
+    generate(graph, output_dir, outputs)
+    if page_cache is not None:
+        page_cache.record(name, digest)
+
+
+def find_legacy_outputs(
+    output_dir: Path, static_dir: Optional[Path] = None
+) -> List[Path]:
+    """
+    Find the generated files of a docs directory built without a manifest.
+
+    These are the files older builds deleted before every build: the index
+    page, the llms files and everything in example directories (folders named
+    like 001-*), plus the static files they copied under their own names.
+    Other files, such as CNAME and .nojekyll, are left alone.
 
     Args:
         output_dir: Path to the docs directory
+        static_dir: The static files older builds copied to docs/static
+
+    Returns:
+        The generated files
     """
-    logger.info("Cleaning up old example directories and files in %s" % output_dir)
-
-    # Files to preserve (never delete these)
-    preserve_files = {
-        "CNAME",  # Custom domain configuration
-        ".nojekyll",  # GitHub Pages configuration
-        ".gitignore",  # Git ignore file
-    }
-
-    # Directories to preserve (never delete these)
-    preserve_dirs = {"static"}  # Static assets directory
-
-    # Remove index.html
-    index_file = output_dir / "index.html"
-    if index_file.exists():
-        index_file.unlink()
-        logger.info("Removed %s" % index_file)
-
-    # Remove llms.txt and llms-ctx.txt
-    llms_file = output_dir / "llms.txt"
-    if llms_file.exists():
-        llms_file.unlink()
-        logger.info("Removed %s" % llms_file)
-
-    llms_ctx_file = output_dir / "llms-ctx.txt"
-    if llms_ctx_file.exists():
-        llms_ctx_file.unlink()
-        logger.info("Removed %s" % llms_ctx_file)
-
-    # Remove all example directories (folders that match the pattern \d{3}-*)
+    legacy_outputs = [
+        output_dir / name for name in ("index.html", "llms.txt", "llms-ctx.txt")
+    ]
     for item in output_dir.iterdir():
-        if item.is_dir() and item.name not in preserve_dirs:
-            # Check if it's an example directory (matches pattern 001-*, 002-*, etc.)
-            if re.match(r"^\d{3}-", item.name):
-                shutil.rmtree(item)
-                logger.info("Removed directory %s" % item)
+        if item.is_dir() and re.match(r"^\d{3}-", item.name):
+            legacy_outputs.extend(path for path in item.rglob("*") if path.is_file())
+    if static_dir is not None and static_dir.exists():
+        legacy_outputs.extend(
+            output_dir / "static" / path.relative_to(static_dir)
+            for path in static_dir.rglob("*")
+            if path.is_file()
+        )
+    return legacy_outputs
 
 
 def generate_sitemap(
-    examples: List[Dict[str, Any]], sections: List[Dict[str, Any]], output_dir: Path
+    graph: SiteGraph,
+    output_dir: Path,
+    outputs: Optional[OutputSync] = None,
 ) -> None:
     """Generate sitemap.xml file for search engines.
     
     Args:
-        examples: List of examples data
-        sections: List of sections data
+        graph: Navigation of the site
         output_dir: Output directory for the site
+        outputs: Tracker of the emitted files (defaults to an untracked one)
     """
-    from datetime import datetime
-    
+    if outputs is None:
+        outputs = OutputSync(output_dir)
     logger.info("Generating sitemap.xml")
     
     site_url = "https://structuredoutputsbyexample.com"
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = build_time().strftime("%Y-%m-%d")
     
     output_file = output_dir / "sitemap.xml"
     
-    with open(output_file, "w") as f:
+    with outputs.open_text(output_file) as f:
         # XML header
         f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
         f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
@@ -1343,9 +1441,9 @@ def generate_sitemap(
         f.write('  </url>\n')
         
         # Example pages
-        for example in examples:
+        for example in graph.examples:
             f.write('  <url>\n')
-            f.write(f'    <loc>{site_url}/{example["id"]}/</loc>\n')
+            f.write(f'    <loc>{site_url}/{example.id}/</loc>\n')
             f.write(f'    <lastmod>{today}</lastmod>\n')
             f.write('    <changefreq>monthly</changefreq>\n')
             f.write('    <priority>0.8</priority>\n')
@@ -1357,17 +1455,22 @@ def generate_sitemap(
     logger.info(f"Generated sitemap at {output_file}")
 
 
-def generate_robots_txt(output_dir: Path) -> None:
+def generate_robots_txt(
+    output_dir: Path, outputs: Optional[OutputSync] = None
+) -> None:
     """Generate robots.txt file for search engines.
     
     Args:
         output_dir: Output directory for the site
+        outputs: Tracker of the emitted files (defaults to an untracked one)
     """
+    if outputs is None:
+        outputs = OutputSync(output_dir)
     logger.info("Generating robots.txt")
     
     output_file = output_dir / "robots.txt"
     
-    with open(output_file, "w") as f:
+    with outputs.open_text(output_file) as f:
         f.write("User-agent: *\n")
         f.write("Allow: /\n\n")
         f.write("Sitemap: https://structuredoutputsbyexample.com/sitemap.xml\n")
@@ -1375,53 +1478,364 @@ def generate_robots_txt(output_dir: Path) -> None:
     logger.info(f"Generated robots.txt at {output_file}")
 
 
-def generate_static_site() -> None:
-    """Generate the complete static site."""
-    data = load_examples_data()
-    examples = data.get("examples", [])
-    sections = data.get("sections", [])
+def generate_headers_file(
+    output_dir: Path, outputs: Optional[OutputSync] = None
+) -> None:
+    """Generate the _headers file with the Cache-Control of every response.
+
+    Everything under static/ is fingerprinted (see copy_static_files and
+    write_site_stylesheet) and cached as immutable; pages and other files
+    are revalidated on every visit.
+
+    Args:
+        output_dir: Output directory for the site
+        outputs: Tracker of the emitted files (defaults to an untracked one)
+    """
+    if outputs is None:
+        outputs = OutputSync(output_dir)
+    outputs.write_text(output_dir / "_headers", headers_file(["/static/*"]))
+
+
+def generate_static_site(
+    inventory: Optional[Inventory] = None,
+    use_cache: bool = True,
+    jobs: int = 1,
+    highlight: bool = False,
+    compress: bool = False,
+    compression_report_file: Optional[Path] = None,
+    minify: bool = False,
+    service_worker: bool = False,
+) -> None:
+    """
+    Generate the complete static site.
+
+    With jobs > 1, example pages are rendered in a pool of worker processes
+    while this process writes the other outputs. Every output of a build is
+    stamped with the same build time, so the result does not depend on the
+    number of workers.
+
+    Args:
+        inventory: Inventory of the examples directory from the examples
+            builder; the directory is scanned again if not given
+        use_cache: Whether to skip example pages whose inputs are unchanged
+            since the previous build
+        jobs: Number of worker processes rendering example pages
+        highlight: Whether to highlight code at build time (with Pygments)
+            instead of in the browser
+        compress: Whether to write gzip and brotli copies of the text outputs
+        compression_report_file: Optional path for a JSON report of the raw
+            and compressed size of every text output
+        minify: Whether to minify the HTML pages
+        service_worker: Whether to publish a service worker that keeps the
+            site cached for offline reading
+    """
+    timestamp = set_build_time()
+
+    with profiler.span("load_examples_data"):
+        data = load_examples_data()
+    examples = data.examples
 
     if not examples:
         logger.error("No examples found. Exiting.")
         return
 
+    with profiler.span("build_site_graph"):
+        graph = SiteGraph.from_catalog(data)
+
     script_dir = Path(__file__).parent
     output_dir = script_dir / "docs"
     static_dir = script_dir / "static"
 
+    if inventory is None:
+        with profiler.span("scan_examples"):
+            inventory = Inventory.scan(script_dir / "examples")
+
     # Create output directory
     output_dir.mkdir(exist_ok=True, parents=True)
     logger.info("Generating static site in %s" % output_dir)
 
-    # Clean up old files and directories
-    clean_docs_directory(output_dir)
+    # Every output is written only if it changed; files of the previous build
+    # that this one does not emit are pruned at the end
+    outputs = OutputSync(output_dir, script_dir / ".build-cache" / "outputs.json")
 
     # Copy static files
-    copy_static_files(static_dir, output_dir)
+    with profiler.span("copy_static_files"):
+        asset_paths = copy_static_files(static_dir, output_dir, outputs)
+        write_site_stylesheet(output_dir, outputs)
+    set_asset_paths(asset_paths)
+
+    # Highlight code at build time, reusing what earlier builds highlighted
+    highlighter = None
+    highlight_cache = None
+    if highlight and not pygments_available():
+        logger.warning(
+            "Pygments is not installed (see requirements.txt), code is "
+            "highlighted in the browser"
+        )
+    elif highlight:
+        if use_cache:
+            highlight_cache = HighlightCache(
+                script_dir / ".build-cache" / "highlight.json"
+            )
+        highlighter = Highlighter(highlight_cache)
+        outputs.write_text(
+            output_dir / highlighter.stylesheet_path, highlighter.stylesheet
+        )
+    set_highlighter(highlighter)
+    set_minify(minify)
+    set_service_worker(service_worker)
+
+    # Find the example pages whose inputs changed since the previous build
+    page_cache = None
+    if use_cache:
+        page_cache = PageCache(
+            script_dir / ".build-cache" / "pages.json",
+            {
+                "assets": asset_paths,
+                "highlighter": highlighter.version if highlighter else None,
+                "minify": minify,
+                "service_worker": service_worker,
+            },
+        )
+    stale_pages = []
+    for example in examples:
+        digest = None
+        if page_cache is not None:
+            digest = page_cache.page_digest(example, graph, inventory)
+            page_file = output_dir / example.id / "index.html"
+            if page_cache.is_fresh(example.id, digest, page_file):
+                outputs.keep_directory(page_file.parent)
+                continue
+        stale_pages.append((example, digest))
+
+    # Hand the pages to the workers first, so they render while this process
+    # writes the other outputs
+    executor = None
+    futures: List[Optional[Future]] = [None] * len(stale_pages)
+    if jobs > 1 and stale_pages:
+        logger.info("Rendering example pages with %d workers" % jobs)
+        executor = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_render_worker,
+            initargs=(
+                timestamp,
+                asset_paths,
+                highlighter,
+                minify,
+                service_worker,
+                inventory,
+                script_dir,
+                profiler.enabled,
+            ),
+        )
+        futures = [
+            executor.submit(
+                render_page_in_worker,
+                example,
+                page_link(graph.prev(example)),
+                page_link(graph.next(example)),
+                output_dir,
+            )
+            for example, _ in stale_pages
+        ]
 
-    # Generate llms-ctx.txt file (original format with full examples)
-    generate_llms_ctx_txt(examples, sections, output_dir)
+    try:
+        # Generate llms-ctx.txt file (original format with full examples)
+        with profiler.span("generate_llms_ctx_txt"):
+            generate_catalog_file(
+                "llms-ctx.txt",
+                generate_llms_ctx_txt,
+                graph,
+                output_dir,
+                outputs,
+                page_cache,
+            )
 
-    # Generate llms.txt file (simplified format with links)
-    generate_llms_txt(examples, sections, output_dir)
+        # Generate llms.txt file (simplified format with links)
+        with profiler.span("generate_llms_txt"):
+            generate_catalog_file(
+                "llms.txt",
+                generate_llms_txt,
+                graph,
+                output_dir,
+                outputs,
+                page_cache,
+                format_build_time(FOOTER_DATE_FORMAT),
+            )
 
-    # Generate index page
-    generate_index_html(examples, sections, output_dir)
+        # Generate the search index, reading only examples changed since the
+        # previous build
+        with profiler.span("generate_search_index"):
+            search_cache = None
+            if use_cache:
+                search_cache = SearchIndexCache(
+                    script_dir / ".build-cache" / "search.json"
+                )
+            search_index = generate_search_index(
+                graph, output_dir, outputs, search_cache
+            )
+            if search_cache is not None:
+                search_cache.save(example.id for example in examples)
+
+        # Generate index page
+        with profiler.span("generate_index_html"):
+            generate_index_html(graph, output_dir, outputs, search_index)
+
+        # Generate SEO files
+        with profiler.span("generate_seo_files"):
+            generate_sitemap(graph, output_dir, outputs)
+            generate_robots_txt(output_dir, outputs)
+            generate_headers_file(output_dir, outputs)
+
+        # Generate the example pages, or collect them from the workers
+        with profiler.span("generate_example_pages"):
+            for (example, digest), future in zip(stale_pages, futures):
+                if future is None:
+                    with profiler.span(
+                        "generate_example_html", EXAMPLE_CATEGORY, example=example.id
+                    ):
+                        generate_example_html(
+                            example, graph, output_dir, inventory, outputs=outputs
+                        )
+                    keys = highlight_keys(example)
+                else:
+                    page_outputs, events, highlighted, keys = future.result()
+                    outputs.merge(page_outputs)
+                    profiler.events.extend(events)
+                    if highlighter is not None:
+                        highlighter.added.update(highlighted)
+                if page_cache is not None:
+                    page_cache.record(example.id, digest)
+                if highlight_cache is not None:
+                    highlight_cache.record_page(example.id, keys)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if page_cache is not None:
+        page_cache.save({example.id for example in examples} | set(LLMS_FILES))
+    logger.info(
+        "Rendered %d of %d example pages" % (len(stale_pages), len(examples))
+    )
 
-    # Generate example pages
-    for example in examples:
-        generate_example_html(example, examples, output_dir)
-    
-    # Generate SEO files
-    generate_sitemap(examples, sections, output_dir)
-    generate_robots_txt(output_dir)
+    if highlighter is not None:
+        highlighted = highlighter.take_added()
+        logger.info("Highlighted %d new code blocks" % len(highlighted))
+        if highlight_cache is not None:
+            highlight_cache.update(highlighted)
+            highlight_cache.save(example.id for example in examples)
+
+    # List every page and asset for the service worker, now that they are all
+    # written, or retire the worker of an earlier build
+    if service_worker:
+        with profiler.span("generate_service_worker"):
+            precache_hashes = None
+            if use_cache:
+                precache_hashes = PrecacheHashes(
+                    script_dir / ".build-cache" / "precache.json"
+                )
+            write_service_worker(outputs, precache_hashes)
+            if precache_hashes is not None:
+                precache_hashes.save(outputs.emitted)
+    else:
+        retire_service_worker(outputs)
+
+    # Write compressed copies of the text outputs, in the same worker count
+    if compress:
+        with profiler.span("compress_outputs"):
+            report = compress_outputs(outputs, jobs)
+        log_report(report)
+        if compression_report_file is not None:
+            compression_report_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(compression_report_file, "w") as f:
+                json.dump(report, f, indent=2)
+            logger.info("Wrote compression report to %s" % compression_report_file)
+    else:
+        discard_compressed_copies(outputs)
+
+    # Remove what earlier builds emitted and this one did not
+    with profiler.span("prune_outputs"):
+        pruned = outputs.prune(find_legacy_outputs(output_dir, static_dir))
+        outputs.save()
+    logger.info(
+        "Wrote %d of %d output files, removed %d stale files"
+        % (len(outputs.written), len(outputs.emitted), pruned)
+    )
 
     logger.info(
         "Static site generation complete! The site is available at %s" % output_dir
     )
 
 
+def parse_args() -> Tuple[argparse.Namespace, List[str]]:
+    """
+    Parse the command-line arguments of the site generator.
+
+    Other arguments are left for the examples builder, which is run first and
+    also gets the options the two share (--jobs and --no-cache). Profiling
+    options are not passed on: the builder records its spans in the
+    generator's profile.
+
+    Returns:
+        Tuple containing (the generator's arguments, the arguments of the
+        examples builder)
+    """
+    parser = argparse.ArgumentParser(
+        description="Build the Structured Outputs by Example static site"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render every example page, ignoring the previous build",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to compile examples and render "
+        "pages (0 = all cores)",
+    )
+    parser.add_argument(
+        "--highlight",
+        action="store_true",
+        help="Highlight code at build time with Pygments instead of in the "
+        "browser",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Minify the HTML pages (code blocks are left untouched)",
+    )
+    parser.add_argument(
+        "--service-worker",
+        action="store_true",
+        help="Publish a service worker that caches the whole site for instant "
+        "repeat visits and offline reading",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Write gzip (and, if brotli is installed, brotli) copies of every "
+        "text output",
+    )
+    parser.add_argument(
+        "--compression-report",
+        type=str,
+        help="Write a JSON report of the raw and compressed size of every text "
+        "output (with --compress)",
+    )
+    add_profile_arguments(parser)
+    args, builder_args = parser.parse_known_args()
+    builder_args += ["--jobs", str(args.jobs)]
+    if args.no_cache:
+        builder_args.append("--no-cache")
+    return args, builder_args
+
+
 if __name__ == "__main__":
+    args, builder_args = parse_args()
+    profiling = start_from_args(args)
+
     # First run the examples builder by importing it directly
     logger.info("Running examples builder first...")
     import sys
@@ -1432,13 +1846,31 @@ if __name__ == "__main__":
         sys.path.append(str(build_examples_dir))
 
     # Import and run the main function from build_examples
+    inventory = None
     try:
         from build_examples import main as build_examples_main
 
-        build_examples_main()
+        with profiler.span("build_examples"):
+            inventory = build_examples_main(builder_args)
     except Exception as e:
         logger.error(f"Error running build_examples: {e}")
         logger.warning("Continuing with static site generation...")
 
-    # Then generate the static site
-    generate_static_site()
+    # Then generate the static site, reusing the builder's scan of the examples
+    with profiler.span("generate_static_site"):
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        generate_static_site(
+            inventory,
+            use_cache=not args.no_cache,
+            jobs=jobs,
+            highlight=args.highlight,
+            compress=args.compress,
+            minify=args.minify,
+            service_worker=args.service_worker,
+            compression_report_file=(
+                Path(args.compression_report) if args.compression_report else None
+            ),
+        )
+
+    if profiling:
+        profiler.finish()
@@ -0,0 +1,83 @@
+"""
+Fingerprinted site assets.
+
+Assets are published under names that contain a hash of their content, so a
+changed asset gets a new URL. Browsers and the edge can then cache every
+asset indefinitely, and only the pages that reference them need to be
+fetched again.
+"""
+
+import hashlib
+from pathlib import PurePosixPath
+from typing import Iterable
+
+# Hex digits of the content hash kept in fingerprinted names
+FINGERPRINT_LENGTH = 12
+
+# Cache-Control of fingerprinted assets: their content never changes under a
+# given URL, so they are cached for a year without revalidation
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Cache-Control of everything else (pages, text files, example images): kept
+# by the browser but revalidated on every visit, so a new deploy is seen at
+# once and pages never reference assets that were pruned
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+def content_hash(content: bytes) -> str:
+    """
+    Short hash of an asset's content.
+
+    Args:
+        content: The asset's bytes
+
+    Returns:
+        The first FINGERPRINT_LENGTH hex digits of its SHA-256
+    """
+    return hashlib.sha256(content).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def fingerprinted_name(path: str, content: bytes) -> str:
+    """
+    Insert the hash of an asset's content into its file name.
+
+    Args:
+        path: The asset's path, such as "static/site.css"
+        content: The asset's bytes
+
+    Returns:
+        The path with the hash before the suffix, such as
+        "static/site.0123456789ab.css"
+    """
+    posix_path = PurePosixPath(path)
+    name = f"{posix_path.stem}.{content_hash(content)}{posix_path.suffix}"
+    return str(posix_path.with_name(name))
+
+
+def headers_file(immutable_patterns: Iterable[str]) -> str:
+    """
+    Content of a _headers file for Cloudflare static assets.
+
+    Every response is revalidated, except those matching the patterns of
+    fingerprinted assets, which are immutable.
+
+    Args:
+        immutable_patterns: URL patterns of fingerprinted assets, such as
+            "/static/*"
+
+    Returns:
+        The file's content
+    """
+    lines = [
+        "# Generated by build_static_site.py",
+        "/*",
+        f"  Cache-Control: {REVALIDATE_CACHE_CONTROL}",
+    ]
+    for pattern in immutable_patterns:
+        lines += [
+            "",
+            pattern,
+            "  ! Cache-Control",
+            f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}",
+        ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,400 @@
+"""
+Serialisation of the compiled examples catalog (data/examples.json).
+
+Version 1 is the original layout: every code segment stores its source twice
+(``code`` and ``display_code``) together with its annotation and line ranges,
+and the file is pretty-printed. Version 2 stores the text of each segment once
+and derives everything else when the catalog is loaded. Both versions decode
+to the same in-memory model (see site_generator/models.py).
+
+A version 2 catalog can also be sharded: a small index.json holding the
+metadata of every example, plus one JSON file per example that is only read
+when the example's body is first accessed.
+
+Catalogs are written as a stream, one example at a time, into a temporary
+file that is renamed over the previous catalog once it is complete.
+"""
+
+import hashlib
+import json
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from site_generator.models import (
+    Catalog,
+    CodeSegment,
+    Example,
+    ExampleBody,
+    ImageRef,
+    Section,
+    ShellSegment,
+    map_comments_to_code,
+)
+from site_generator.output import atomic_write, write_text_if_changed
+
+CATALOG_VERSION = 2
+
+
+def split_lines(text: str) -> List[str]:
+    """
+    Split text into lines the way file.readlines() does (on "\\n" only).
+
+    Args:
+        text: The text to split
+
+    Returns:
+        List of lines, each keeping its trailing newline
+    """
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def encode_example(example: Example) -> Dict[str, Any]:
+    """
+    Encode an example in the version 2 layout.
+
+    Code segments are reduced to {"code": text} or {"comment": text}, and the
+    line number of the first segment is stored once as "first_line".
+
+    Args:
+        example: The compiled example
+
+    Returns:
+        The compact example
+    """
+    segments = example.body.code_segments
+    first_line = segments[0].start_line if segments else 1
+
+    compact_segments = []
+    expected_line = first_line
+    for segment in segments:
+        if segment.start_line != expected_line:
+            raise ValueError(
+                f"Code segments of {example.id} are not contiguous at "
+                f"line {segment.start_line}"
+            )
+        expected_line = segment.end_line + 1
+        key = "comment" if segment.is_comment else "code"
+        compact_segments.append({key: segment.code})
+
+    encoded = {}
+    for key, value in example.to_dict().items():
+        if key == "code_segments":
+            encoded["first_line"] = first_line
+            value = compact_segments
+        encoded[key] = value
+    return encoded
+
+
+def encoded_fingerprint(encoded: Dict[str, Any]) -> str:
+    """
+    Digest of an encoded example, whatever layout and options it is written in.
+
+    Args:
+        encoded: The example, as returned by encode_example
+
+    Returns:
+        Hex digest of its canonical JSON
+    """
+    content = json.dumps(encoded, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def example_fingerprint(example: Example) -> str:
+    """
+    Digest of everything stored about an example.
+
+    Examples loaded from a sharded catalog already carry this digest in the
+    index, which is used as is so their bodies are not loaded.
+
+    Args:
+        example: The example
+
+    Returns:
+        Hex digest that changes whenever the example's content changes
+    """
+    if example.content_hash:
+        return example.content_hash
+    return encoded_fingerprint(encode_example(example))
+
+
+def decode_body(encoded: Dict[str, Any]) -> ExampleBody:
+    """
+    Decode the body of a version 2 example, deriving the full code segments.
+
+    Args:
+        encoded: Compact example data
+
+    Returns:
+        The example body
+    """
+    segments = []
+    line_number = encoded.get("first_line", 1)
+    for compact in encoded.get("code_segments", []):
+        is_comment = "comment" in compact
+        lines = split_lines(compact["comment"] if is_comment else compact["code"])
+        segments.append(CodeSegment.from_lines(lines, is_comment, line_number))
+        line_number += len(lines)
+    map_comments_to_code(segments)
+
+    return ExampleBody(
+        description=encoded.get("description", ""),
+        code_segments=segments,
+        shell_segments=[
+            ShellSegment.from_dict(segment)
+            for segment in encoded.get("shell_segments", [])
+        ],
+        image_data=[ImageRef.from_dict(image) for image in encoded.get("image_data", [])],
+        documentation_links=encoded.get("documentation_links", []),
+    )
+
+
+def decode_example(encoded: Dict[str, Any]) -> Example:
+    """
+    Decode a version 2 example.
+
+    Args:
+        encoded: Compact example data
+
+    Returns:
+        The example
+    """
+    return Example(
+        id=encoded["id"],
+        title=encoded.get("title", "Untitled Example"),
+        order=encoded["order"],
+        section_id=encoded.get("section_id"),
+        section_title=encoded.get("section_title"),
+        body_data=decode_body(encoded),
+    )
+
+
+def decode_catalog(data: Dict[str, Any]) -> Catalog:
+    """
+    Decode a catalog of any supported version.
+
+    Args:
+        data: Parsed contents of examples.json
+
+    Returns:
+        The catalog
+    """
+    version = data.get("version", 1)
+    if version == 1:
+        examples = [Example.from_dict(example) for example in data.get("examples", [])]
+    elif version == 2:
+        examples = [decode_example(example) for example in data.get("examples", [])]
+    else:
+        raise ValueError(f"Unsupported examples catalog version: {version}")
+
+    sections = [Section.from_dict(section) for section in data.get("sections", [])]
+    return Catalog(examples=examples, sections=sections)
+
+
+def stream_json_object(
+    f: TextIO, fields: Iterable[Tuple[str, Any]], dump_options: Dict[str, Any]
+) -> None:
+    """
+    Write a JSON object field by field.
+
+    A field whose value is an iterator is written as an array, one item at a
+    time, so the items never have to be held in memory together. fields is
+    consumed lazily, so later fields may depend on earlier iterators having
+    been exhausted. The output is identical to json.dump() of the equivalent
+    dict with the same options.
+
+    Args:
+        f: File to write to
+        fields: (key, value) pairs of the object, in order
+        dump_options: Keyword arguments for json.dumps (indent, separators)
+    """
+    indent = dump_options.get("indent")
+    if indent is None:
+        item_separator, key_separator = dump_options.get("separators", (", ", ": "))
+    else:
+        item_separator, key_separator = dump_options.get("separators", (",", ": "))
+
+    def newline(level: int) -> str:
+        return "" if indent is None else "\n" + " " * (indent * level)
+
+    def dumps(value: Any, level: int) -> str:
+        text = json.dumps(value, **dump_options)
+        return text if indent is None else text.replace("\n", newline(level))
+
+    f.write("{")
+    first_field = True
+    for key, value in fields:
+        if not first_field:
+            f.write(item_separator)
+        f.write(newline(1) + json.dumps(key) + key_separator)
+        first_field = False
+
+        if not isinstance(value, Iterator):
+            f.write(dumps(value, 1))
+            continue
+
+        f.write("[")
+        empty = True
+        for item in value:
+            if not empty:
+                f.write(item_separator)
+            f.write(newline(2) + dumps(item, 2))
+            empty = False
+        f.write("]" if empty else newline(1) + "]")
+    f.write("}" if first_field else newline(0) + "}")
+
+
+def write_catalog_file(
+    examples: Iterable[Example],
+    sections: List[Section],
+    output_file: Path,
+    schema: int,
+    dump_options: Dict[str, Any],
+) -> int:
+    """
+    Stream a catalog into a single file.
+
+    Examples are encoded and written as they are produced. Sections are
+    written after the last example, so sections may still be filled in while
+    examples is being consumed.
+
+    Args:
+        examples: The examples, in display order
+        sections: The section definitions
+        output_file: Path to the catalog file
+        schema: Catalog version to write
+        dump_options: Keyword arguments for json.dumps
+
+    Returns:
+        Number of examples written
+    """
+    if schema not in (1, CATALOG_VERSION):
+        raise ValueError(f"Unsupported examples catalog version: {schema}")
+
+    count = 0
+
+    def encoded_examples() -> Iterator[Dict[str, Any]]:
+        nonlocal count
+        for example in examples:
+            count += 1
+            yield example.to_dict() if schema == 1 else encode_example(example)
+
+    def fields() -> Iterator[Tuple[str, Any]]:
+        if schema != 1:
+            yield "version", schema
+        yield "examples", encoded_examples()
+        if sections:
+            yield "sections", [section.to_dict() for section in sections]
+
+    with atomic_write(output_file) as f:
+        stream_json_object(f, fields(), dump_options)
+    return count
+
+
+def load_shard_body(shard_file: Path) -> ExampleBody:
+    """
+    Read the body of an example from its shard.
+
+    Args:
+        shard_file: Path to the example's shard
+
+    Returns:
+        The example body
+    """
+    with open(shard_file, "r") as f:
+        return decode_body(json.load(f))
+
+
+def write_sharded_catalog(
+    examples: Iterable[Example],
+    sections: List[Section],
+    shard_dir: Path,
+    dump_options: Dict[str, Any],
+) -> int:
+    """
+    Write a catalog in the sharded layout.
+
+    Each shard is written as its example is produced. Shards whose contents
+    are unchanged are not rewritten. index.json is replaced atomically once
+    every shard it refers to is written, and only then are the shards of
+    examples that no longer exist removed, so a reader (or an interrupted
+    build) never sees an index referring to a missing shard.
+
+    Args:
+        examples: The examples, in display order
+        sections: The section definitions, read once examples is exhausted
+        shard_dir: Directory receiving index.json and the example shards
+        dump_options: Keyword arguments for json.dumps
+
+    Returns:
+        Number of examples written
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = []
+    for example in examples:
+        encoded = encode_example(example)
+        content = json.dumps(encoded, **dump_options)
+        shard_file = shard_dir / f"{example.id}.json"
+        write_text_if_changed(shard_file, content)
+
+        entry = {"id": example.id, "title": example.title, "order": example.order}
+        if example.section_id is not None:
+            entry["section_id"] = example.section_id
+            entry["section_title"] = example.section_title
+        entry["hash"] = encoded_fingerprint(encoded)
+        entry["file"] = shard_file.name
+        entries.append(entry)
+
+    index = {"version": CATALOG_VERSION, "layout": "sharded", "examples": entries}
+    if sections:
+        index["sections"] = [section.to_dict() for section in sections]
+    with atomic_write(shard_dir / "index.json") as f:
+        json.dump(index, f, **dump_options)
+
+    # Only once the new index is in place, so the old one never refers to a
+    # missing shard
+    shard_names = {entry["file"] for entry in entries}
+    for stale_file in shard_dir.glob("*.json"):
+        if stale_file.name != "index.json" and stale_file.name not in shard_names:
+            stale_file.unlink()
+    return len(entries)
+
+
+def load_sharded_catalog(shard_dir: Path) -> Catalog:
+    """
+    Load the index of a sharded catalog.
+
+    Example bodies are not read until they are accessed.
+
+    Args:
+        shard_dir: Directory containing index.json and the example shards
+
+    Returns:
+        The catalog
+    """
+    with open(shard_dir / "index.json", "r") as f:
+        index = json.load(f)
+
+    version = index.get("version")
+    if version != CATALOG_VERSION:
+        raise ValueError(f"Unsupported sharded catalog version: {version}")
+
+    examples = [
+        Example(
+            id=entry["id"],
+            title=entry["title"],
+            order=entry["order"],
+            section_id=entry.get("section_id"),
+            section_title=entry.get("section_title"),
+            content_hash=entry.get("hash", ""),
+            body_loader=partial(load_shard_body, shard_dir / entry["file"]),
+        )
+        for entry in index["examples"]
+    ]
+    sections = [Section.from_dict(section) for section in index.get("sections", [])]
+    return Catalog(examples=examples, sections=sections)
@@ -0,0 +1,210 @@
+"""
+Pre-compressed copies of the site's text outputs.
+
+With --compress, build_static_site.py writes a gzip (.gz) and a brotli (.br)
+copy next to every text output, so they can be served compressed without
+compressing them on every request. Both are compressed at their highest
+level, which is too slow to do per request but only has to be done once per
+build, and only for outputs whose content changed. The brotli package is
+listed in requirements.txt; without it, only the gzip copies are written,
+with a warning.
+"""
+
+import gzip
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from site_generator.output import OutputSync
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Outputs worth compressing (images and fonts are compressed already)
+COMPRESSIBLE_SUFFIXES = (".html", ".txt", ".xml", ".css", ".js", ".json", ".svg")
+
+GZIP_SUFFIX = ".gz"
+BROTLI_SUFFIX = ".br"
+
+
+def encodings() -> List[str]:
+    """Suffixes of the compressed copies this build can write."""
+    if brotli is None:
+        return [GZIP_SUFFIX]
+    return [GZIP_SUFFIX, BROTLI_SUFFIX]
+
+
+def compress(data: bytes, suffix: str) -> bytes:
+    """
+    Compress data for a compressed copy.
+
+    gzip output does not record a time or file name, so it only depends on
+    the data.
+
+    Args:
+        data: The content of the output
+        suffix: GZIP_SUFFIX or BROTLI_SUFFIX
+
+    Returns:
+        The compressed content
+    """
+    if suffix == GZIP_SUFFIX:
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def is_compressed_copy(relative: str) -> bool:
+    """Whether an output path is the compressed copy of a text output."""
+    for suffix in (GZIP_SUFFIX, BROTLI_SUFFIX):
+        if relative.endswith(suffix):
+            return relative[: -len(suffix)].endswith(COMPRESSIBLE_SUFFIXES)
+    return False
+
+
+def discard_compressed_copies(outputs: OutputSync) -> None:
+    """
+    Stop emitting the compressed copies claimed from the previous build.
+
+    Kept directories (see OutputSync.keep_directory) claim every file they
+    held, copies included. Copies are only emitted by compress_outputs, so
+    that a build without --compress prunes them.
+
+    Args:
+        outputs: Tracker of the emitted files
+    """
+    outputs.emitted -= {path for path in outputs.emitted if is_compressed_copy(path)}
+
+
+def compress_output(
+    root: Path, relative: str, suffixes: List[str]
+) -> Tuple[OutputSync, Dict[str, Any]]:
+    """
+    Write the compressed copies of one output.
+
+    Runs in the worker processes of compress_outputs.
+
+    Args:
+        root: The output directory
+        relative: Path of the output, relative to root
+        suffixes: Suffixes of the copies to write
+
+    Returns:
+        Tuple containing (the copies written, sizes of the output and its
+        copies)
+    """
+    outputs = OutputSync(root)
+    source = root / relative
+    data = source.read_bytes()
+    sizes = {"file": relative, "raw": len(data)}
+    for suffix in suffixes:
+        content = compress(data, suffix)
+        outputs.write_bytes(source.with_name(source.name + suffix), content)
+        sizes[suffix] = len(content)
+    return outputs, sizes
+
+
+def _up_to_date(source: Path, copies: List[Path]) -> bool:
+    """Whether every copy exists and is at least as recent as the output."""
+    try:
+        source_mtime = source.stat().st_mtime_ns
+        return all(copy.stat().st_mtime_ns >= source_mtime for copy in copies)
+    except FileNotFoundError:
+        return False
+
+
+def compress_outputs(outputs: OutputSync, jobs: int = 1) -> List[Dict[str, Any]]:
+    """
+    Write compressed copies of every text output of a build.
+
+    Outputs this build did not rewrite keep their copies, unless a copy is
+    missing or older than the output. The rest are compressed in a pool of
+    worker processes when jobs > 1.
+
+    Args:
+        outputs: Tracker of the emitted files; the copies are emitted to it
+        jobs: Number of worker processes
+
+    Returns:
+        Raw and compressed size of every text output, largest first
+    """
+    suffixes = encodings()
+    if brotli is None:
+        logger.warning(
+            "brotli is not installed (see requirements.txt), only gzip copies "
+            "are written"
+        )
+    discard_compressed_copies(outputs)
+
+    stale = []
+    report = []
+    for relative in sorted(outputs.emitted):
+        if not relative.endswith(COMPRESSIBLE_SUFFIXES):
+            continue
+        source = outputs.root / relative
+        copies = [source.with_name(source.name + suffix) for suffix in suffixes]
+        if relative not in outputs.written and _up_to_date(source, copies):
+            sizes = {"file": relative, "raw": source.stat().st_size}
+            for suffix, copy in zip(suffixes, copies):
+                outputs.keep_file(copy)
+                sizes[suffix] = copy.stat().st_size
+            report.append(sizes)
+        else:
+            stale.append(relative)
+
+    executor: Optional[ProcessPoolExecutor] = None
+    if jobs > 1 and len(stale) > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        if executor is not None:
+            results = executor.map(
+                compress_output,
+                [outputs.root] * len(stale),
+                stale,
+                [suffixes] * len(stale),
+                chunksize=max(1, len(stale) // (jobs * 4)),
+            )
+        else:
+            results = (
+                compress_output(outputs.root, relative, suffixes) for relative in stale
+            )
+        for copy_outputs, sizes in results:
+            outputs.merge(copy_outputs)
+            report.append(sizes)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    logger.info(f"Compressed {len(stale)} of {len(report)} text outputs")
+    report.sort(key=lambda sizes: (-sizes["raw"], sizes["file"]))
+    return report
+
+
+def log_report(report: List[Dict[str, Any]], largest: int = 10) -> None:
+    """
+    Log the sizes of the largest outputs and the totals.
+
+    Args:
+        report: Sizes as returned by compress_outputs
+        largest: Number of outputs to list
+    """
+    suffixes = encodings()
+    header = f"{'raw':>10}" + "".join(f"{suffix:>10}" for suffix in suffixes)
+    lines = [f"{header}  file"]
+    for sizes in report[:largest]:
+        lines.append(
+            f"{sizes['raw']:>10}"
+            + "".join(f"{sizes.get(suffix, 0):>10}" for suffix in suffixes)
+            + f"  {sizes['file']}"
+        )
+    totals = f"{sum(sizes['raw'] for sizes in report):>10}" + "".join(
+        f"{sum(sizes.get(suffix, 0) for sizes in report):>10}" for suffix in suffixes
+    )
+    lines.append(f"{totals}  total of {len(report)} files")
+    if brotli is None:
+        lines.append("(brotli is not installed, only gzip copies were written)")
+    logger.info("Compressed sizes in bytes:\n" + "\n".join(lines))
@@ -0,0 +1,150 @@
+"""
+Navigation structure of the site.
+
+The site graph is built once from the catalog and answers the questions every
+page and generated file asks of it: which examples come before and after an
+example, which examples belong to a section, and in which order sections are
+listed. Each answer is a dictionary lookup instead of a scan of the catalog.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple, Union
+
+from site_generator.models import MISC_SECTION_ID, Catalog, Example, Section
+
+
+def _neighbours(
+    examples: List[Example],
+) -> Dict[str, Tuple[Optional[Example], Optional[Example]]]:
+    """
+    Find the previous and next example of every example in a group.
+
+    The next example is the first, in order, with a higher order; the
+    previous one is the first with the highest lower order. Examples sharing
+    an order keep their catalog order, as with a stable sort.
+
+    Args:
+        examples: The examples of the group, in catalog order
+
+    Returns:
+        (previous, next) example per example ID
+    """
+    ordered = sorted(examples, key=lambda e: e.order)
+    orders = [example.order for example in ordered]
+    neighbours = {}
+    for example in ordered:
+        before = bisect_left(orders, example.order)
+        prev_example = None
+        if before:
+            prev_example = ordered[bisect_left(orders, orders[before - 1])]
+        after = bisect_right(orders, example.order)
+        next_example = ordered[after] if after < len(ordered) else None
+        neighbours[example.id] = (prev_example, next_example)
+    return neighbours
+
+
+class SiteGraph:
+    """
+    Precomputed navigation of a catalog.
+
+    Previous/next links prefer the example's own section and continue into
+    the neighbouring section at its ends. Examples without a section are
+    grouped under MISC_SECTION_ID.
+    """
+
+    def __init__(self, examples: List[Example], sections: List[Section]):
+        """
+        Args:
+            examples: Examples in catalog order
+            sections: Sections of the catalog
+        """
+        self.examples = examples
+        self.sections = sorted(sections, key=lambda s: s.order)
+        self.examples_by_id = {example.id: example for example in examples}
+        self.sections_by_id = {section.id: section for section in self.sections}
+
+        # Examples per section, in order
+        grouped: Dict[str, List[Example]] = {}
+        for example in examples:
+            grouped.setdefault(example.section_id or MISC_SECTION_ID, []).append(
+                example
+            )
+        self._section_examples = {
+            section_id: sorted(members, key=lambda e: e.order)
+            for section_id, members in grouped.items()
+        }
+
+        # Neighbours across the whole site, then within each section
+        self._prev: Dict[str, Optional[Example]] = {}
+        self._next: Dict[str, Optional[Example]] = {}
+        site_neighbours = _neighbours(examples)
+        by_section: Dict[str, List[Example]] = {}
+        for example in examples:
+            if example.section_id:
+                by_section.setdefault(example.section_id, []).append(example)
+        section_neighbours: Dict[str, Tuple[Optional[Example], Optional[Example]]] = {}
+        for members in by_section.values():
+            section_neighbours.update(_neighbours(members))
+
+        for example in examples:
+            prev_example, next_example = section_neighbours.get(
+                example.id, (None, None)
+            )
+            site_prev, site_next = site_neighbours[example.id]
+            self._prev[example.id] = prev_example or site_prev
+            self._next[example.id] = next_example or site_next
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog) -> "SiteGraph":
+        """Build the graph of a loaded catalog."""
+        return cls(catalog.examples, catalog.sections)
+
+    def prev(self, example: Example) -> Optional[Example]:
+        """The example before this one, or None for the first example."""
+        return self._prev[example.id]
+
+    def next(self, example: Example) -> Optional[Example]:
+        """The example after this one, or None for the last example."""
+        return self._next[example.id]
+
+    def section_examples(self, section_id: str) -> List[Example]:
+        """
+        The examples of a section, in order.
+
+        Args:
+            section_id: The section ID (MISC_SECTION_ID for examples without
+                a section)
+
+        Returns:
+            The section's examples (empty for an unknown section)
+        """
+        return self._section_examples.get(section_id, [])
+
+    def populated_sections(self) -> List[Tuple[Section, List[Example]]]:
+        """
+        The sections that have examples, in order, each with its examples.
+
+        Examples in no known section are not included.
+        """
+        return [
+            (section, self.section_examples(section.id))
+            for section in self.sections
+            if self.section_examples(section.id)
+        ]
+
+    def section_of(self, example: Example) -> Optional[Section]:
+        """The section an example is listed under, if it is a known section."""
+        return self.sections_by_id.get(example.section_id or MISC_SECTION_ID)
+
+    def breadcrumbs(self, example: Example) -> List[Union[Section, Example]]:
+        """
+        The path from the site root to an example.
+
+        Args:
+            example: The example
+
+        Returns:
+            The example's section (if known) followed by the example
+        """
+        section = self.section_of(example)
+        return [section, example] if section is not None else [example]
@@ -0,0 +1,213 @@
+"""
+Build-time syntax highlighting.
+
+With --highlight, build_static_site.py colours code blocks with Pygments
+while rendering pages, instead of loading highlight.js in every browser. The
+token colours come from a small stylesheet published next to the site's
+other assets.
+
+Highlighting is the slowest part of rendering a page, so highlighted code is
+kept in a cache between builds, keyed by a hash of the code, its language and
+the highlighter's version and style. Pygments is listed in
+requirements.txt; without it, --highlight warns and highlighting stays in
+the browser.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from site_generator.assets import fingerprinted_name
+from site_generator.output import atomic_write
+
+try:
+    import pygments
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+except ImportError:
+    pygments = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the highlight cache changes
+HIGHLIGHT_CACHE_VERSION = 2
+
+# Pygments style of the token colours
+DEFAULT_STYLE = "default"
+
+
+def pygments_available() -> bool:
+    """Whether Pygments is installed."""
+    return pygments is not None
+
+
+class HighlightCache:
+    """
+    Highlighted code of previous builds.
+
+    Entries are keyed by Highlighter.key, so code highlighted by another
+    version or style of the highlighter is simply not found. The keys of the
+    code blocks of each page are recorded when the page is rendered, and
+    saving keeps only the entries of the current catalog's pages, so pages
+    kept from an earlier build keep their entries without being read again.
+    """
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = cache_file
+        self.entries: Dict[str, str] = {}
+        self.pages: Dict[str, List[str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load the cache of the previous build."""
+        try:
+            with open(self.cache_file, "r") as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable highlight cache: {e}")
+            return
+
+        if cache.get("version") == HIGHLIGHT_CACHE_VERSION:
+            self.entries = cache.get("entries", {})
+            self.pages = cache.get("pages", {})
+
+    def update(self, entries: Dict[str, str]) -> None:
+        """
+        Add highlighted code.
+
+        Args:
+            entries: Highlighted HTML per key
+        """
+        self.entries.update(entries)
+
+    def record_page(self, example_id: str, keys: List[str]) -> None:
+        """
+        Record the code blocks of a rendered page.
+
+        Args:
+            example_id: The page's example ID
+            keys: Keys of its code blocks
+        """
+        self.pages[example_id] = keys
+
+    def save(self, live_ids: Iterable[str]) -> None:
+        """
+        Write the cache, dropping entries no longer in use.
+
+        Args:
+            live_ids: IDs of the examples of the current catalog
+        """
+        pages = {
+            example_id: self.pages[example_id]
+            for example_id in sorted(live_ids)
+            if example_id in self.pages
+        }
+        live_keys = {key for keys in pages.values() for key in keys}
+        entries = {
+            key: self.entries[key] for key in sorted(live_keys) if key in self.entries
+        }
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.cache_file) as f:
+            json.dump(
+                {
+                    "version": HIGHLIGHT_CACHE_VERSION,
+                    "pages": pages,
+                    "entries": entries,
+                },
+                f,
+            )
+
+
+class Highlighter:
+    """
+    Highlights code with Pygments, reusing cached results.
+
+    Code highlighted since the highlighter was created is also collected in
+    `added`, so that worker processes can hand it back to the main process.
+    """
+
+    def __init__(
+        self, cache: Optional[HighlightCache] = None, style: str = DEFAULT_STYLE
+    ):
+        """
+        Args:
+            cache: Highlighted code of previous builds
+            style: Pygments style of the token colours
+        """
+        if pygments is None:
+            raise RuntimeError("Build-time highlighting requires Pygments")
+        self.cache = cache
+        self.style = style
+        self.version = f"pygments-{pygments.__version__}-{style}"
+        self.added: Dict[str, str] = {}
+        self._formatter = HtmlFormatter(nowrap=True, style=style)
+        self._lexers: Dict[str, object] = {}
+
+        # Token colours, scoped to the code blocks the renderer emits
+        self.stylesheet = (
+            "\n".join(
+                self._formatter.get_token_style_defs(
+                    ["code.language-python", "code.language-shell"]
+                )
+            )
+            + "\n"
+        )
+        self.stylesheet_path = fingerprinted_name(
+            "static/highlight.css", self.stylesheet.encode("utf-8")
+        )
+
+    def key(self, code: str, language: str) -> str:
+        """
+        Cache key of a code block.
+
+        Args:
+            code: The code
+            language: Its language, as a Pygments lexer name
+
+        Returns:
+            Hex digest of the code, the language and the highlighter version
+        """
+        key = json.dumps([code, language, self.version])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def highlight(self, code: str, language: str = "python") -> str:
+        """
+        Highlight a code block.
+
+        Args:
+            code: The code
+            language: Its language, as a Pygments lexer name
+
+        Returns:
+            The code as escaped HTML, with a <span> per token
+        """
+        key = self.key(code, language)
+        if self.cache is not None and key in self.cache.entries:
+            return self.cache.entries[key]
+        if key in self.added:
+            return self.added[key]
+
+        lexer = self._lexers.get(language)
+        if lexer is None:
+            lexer = get_lexer_by_name(language, stripnl=False, ensurenl=False)
+            self._lexers[language] = lexer
+        html = pygments.highlight(code, lexer, self._formatter)
+        # The formatter ends the last line with a newline the code may not have
+        if not code.endswith("\n") and html.endswith("\n"):
+            html = html[:-1]
+        self.added[key] = html
+        return html
+
+    def take_added(self) -> Dict[str, str]:
+        """
+        The code highlighted since the last call, and forget it.
+
+        Returns:
+            Highlighted HTML per key
+        """
+        added, self.added = self.added, {}
+        return added
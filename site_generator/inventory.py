@@ -0,0 +1,186 @@
+"""
+Filesystem inventory of the examples directory.
+
+A single os.scandir pass records every example directory and the name, size
+and modification time of each file in it. The compiler, the image copier and
+the file watcher query this inventory instead of globbing and stat-ing the
+same files again.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# Example directories start with their numeric order ("001-introduction")
+EXAMPLE_DIR_PATTERN = re.compile(r"^\d+")
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif")
+
+
+@dataclass(frozen=True, slots=True)
+class FileEntry:
+    """A file seen during the scan."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+
+@dataclass(slots=True)
+class ExampleDirectory:
+    """An example directory and the files it contains, sorted by name."""
+
+    path: Path
+    files: Dict[str, FileEntry] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    def files_with_suffix(self, *suffixes: str) -> List[FileEntry]:
+        """
+        List the files whose name ends with one of the given suffixes.
+
+        Args:
+            suffixes: File suffixes to match, including the dot
+
+        Returns:
+            Matching files, sorted by name
+        """
+        return [entry for name, entry in self.files.items() if name.endswith(suffixes)]
+
+    def file(self, name: str) -> Optional[FileEntry]:
+        """Return the file with the given name, if present."""
+        return self.files.get(name)
+
+
+def scan_directory(path: Path) -> ExampleDirectory:
+    """
+    Record the files of one example directory.
+
+    Args:
+        path: Path to the example directory
+
+    Returns:
+        The directory listing
+    """
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append(
+                    FileEntry(Path(entry.path), stat.st_size, stat.st_mtime_ns)
+                )
+    entries.sort(key=lambda e: e.name)
+    return ExampleDirectory(path, {entry.name: entry for entry in entries})
+
+
+class Inventory:
+    """
+    The example directories under an examples root, in build order.
+
+    Directories are ordered by their numeric prefix, the order in which the
+    compiler processes them.
+    """
+
+    def __init__(self, root: Path, directories: Iterable[ExampleDirectory]):
+        self.root = root
+        self.directories: List[ExampleDirectory] = list(directories)
+        self._by_name = {directory.name: directory for directory in self.directories}
+
+    @classmethod
+    def scan(cls, root: Path) -> "Inventory":
+        """
+        Scan an examples directory.
+
+        Args:
+            root: Path to the examples directory
+
+        Returns:
+            The inventory
+        """
+        directories = []
+        with os.scandir(root) as it:
+            for entry in it:
+                if EXAMPLE_DIR_PATTERN.match(entry.name) and entry.is_dir():
+                    directories.append(scan_directory(root / entry.name))
+
+        directories.sort(key=lambda d: int(d.name.split("-")[0]))
+        return cls(root, directories)
+
+    def directory(self, name: str) -> Optional[ExampleDirectory]:
+        """Return the example directory with the given name, if present."""
+        return self._by_name.get(name)
+
+    def tracks(self, path: Path) -> bool:
+        """
+        Whether a path is one the scan records.
+
+        Only the files directly inside example directories are scanned, so a
+        change to any other path (such as a file in a subdirectory of an
+        example) cannot be detected by comparing inventories.
+
+        Args:
+            path: Path to a file
+
+        Returns:
+            True if the path is a file of an example directory
+        """
+        return (
+            path.parent.parent == self.root
+            and EXAMPLE_DIR_PATTERN.match(path.parent.name) is not None
+        )
+
+    def stat(self, path: Path) -> Optional[FileEntry]:
+        """
+        Look up a file by path.
+
+        Files inside an example directory are answered from the scan. Other
+        paths are stat-ed directly.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            The file entry, or None if the file does not exist
+        """
+        if path.parent.parent == self.root:
+            directory = self._by_name.get(path.parent.name)
+            return directory.file(path.name) if directory else None
+
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return FileEntry(path, stat.st_size, stat.st_mtime_ns)
+
+    def files(self) -> Dict[Path, FileEntry]:
+        """Return every scanned file, keyed by path."""
+        return {
+            entry.path: entry
+            for directory in self.directories
+            for entry in directory.files.values()
+        }
+
+    def changes(self, previous: "Inventory") -> List[Path]:
+        """
+        List the files added, removed or modified since an earlier scan.
+
+        Args:
+            previous: The earlier inventory of the same root
+
+        Returns:
+            Paths of the changed files, sorted
+        """
+        before = previous.files()
+        after = self.files()
+        changed = [path for path, entry in after.items() if before.get(path) != entry]
+        changed.extend(path for path in before if path not in after)
+        return sorted(changed)
@@ -0,0 +1,207 @@
+"""
+HTML minification of generated pages.
+
+With --minify, build_static_site.py passes every page through minify_html
+before writing it. The pass only makes changes that cannot alter what is
+displayed:
+
+- Runs of whitespace in text collapse to a single character (a newline if the
+  run contained one), which renders the same in normal white-space mode.
+- Comments are dropped.
+- Inline style attributes used more than once on a page become classes,
+  defined in a <style> block ahead of the page's stylesheets.
+
+Elements whose whitespace matters are copied verbatim, with everything they
+contain: code blocks (pre, code, textarea), scripts and style sheets,
+elements styled with a white-space: pre* mode, and hidden elements, which
+hold text for scripts (such as the code of the "Copy All" button).
+"""
+
+import html
+import re
+from typing import Dict, List
+
+# Elements copied verbatim, with their content
+PROTECTED_TAGS = frozenset(["pre", "code", "textarea", "script", "style"])
+
+# Elements whose content is not markup, so only their end tag ends them
+RAW_TEXT_TAGS = frozenset(["script", "style", "textarea"])
+
+# Inline styles that make an element's whitespace significant or its text
+# data for scripts; such elements are copied verbatim too
+PROTECTED_STYLES = re.compile(r"white-space:\s*pre|display:\s*none")
+
+# Prefix of the classes that replace repeated inline styles
+STYLE_CLASS_PREFIX = "s-"
+
+# A tag or comment, with attribute values that may contain ">"
+_MARKUP = re.compile(
+    r"<!--.*?-->"
+    r"|<(/?)([A-Za-z][A-Za-z0-9-]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.S,
+)
+_STYLE_ATTRIBUTE = re.compile(r"""\sstyle=(?:"([^"]*)"|'([^']*)')""")
+_CLASS_ATTRIBUTE = re.compile(r"""\sclass=(?:"([^"]*)"|'([^']*)')""")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _collapse_whitespace(text: str) -> str:
+    return _WHITESPACE.sub(lambda m: "\n" if "\n" in m.group() else " ", text)
+
+
+def _is_protected(name: str, attributes: str) -> bool:
+    """Whether an element must be copied verbatim."""
+    if name.lower() in PROTECTED_TAGS:
+        return True
+    style = _STYLE_ATTRIBUTE.search(attributes)
+    return style is not None and bool(PROTECTED_STYLES.search(_style_value(style)))
+
+
+def _verbatim_end(page: str, start_tag: "re.Match[str]") -> int:
+    """
+    Find the end of an element that is copied verbatim.
+
+    Args:
+        page: The page
+        start_tag: Match of the element's start tag in page
+
+    Returns:
+        Position just after the element's end tag (or the end of the page if
+        it is not closed)
+    """
+    name = start_tag.group(2).lower()
+    if start_tag.group(3).rstrip().endswith("/"):
+        return start_tag.end()
+    if name in RAW_TEXT_TAGS:
+        end_tag = re.compile(rf"</{name}\s*>", re.I).search(page, start_tag.end())
+        return end_tag.end() if end_tag is not None else len(page)
+
+    # Count nested elements of the same name until the matching end tag
+    depth = 1
+    for match in _MARKUP.finditer(page, start_tag.end()):
+        if match.group(2) is None or match.group(2).lower() != name:
+            continue
+        if match.group(1):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+        elif not match.group(3).rstrip().endswith("/"):
+            depth += 1
+    return len(page)
+
+
+def _style_value(style: "re.Match[str]") -> str:
+    """The value of a matched style attribute."""
+    return style.group(1) if style.group(1) is not None else style.group(2)
+
+
+def _count_style(attributes: str, style_counts: Dict[str, int]) -> None:
+    """Count a tag's inline style, unless it must stay inline."""
+    style = _STYLE_ATTRIBUTE.search(attributes)
+    # Nothing but an inline style overrides an inline !important declaration
+    if style is not None and "!important" not in style.group():
+        value = _style_value(style)
+        style_counts[value] = style_counts.get(value, 0) + 1
+
+
+def _style_rule(style: str) -> str:
+    """
+    Declarations of an inline style as the body of a class rule.
+
+    Each declaration is marked !important, so that, like an inline style, it
+    overrides the site stylesheet's normal rules whatever their specificity.
+    """
+    declarations = [d.strip() for d in html.unescape(style).split(";") if d.strip()]
+    return ";".join(f"{declaration} !important" for declaration in declarations)
+
+
+def minify_html(page: str) -> str:
+    """
+    Minify a generated HTML page.
+
+    Args:
+        page: The page
+
+    Returns:
+        The page with collapsed whitespace, no comments and repeated inline
+        styles replaced by classes
+    """
+    # Split the page into text, markup and verbatim chunks; tags are kept as
+    # (name, attributes, closing) until the styles to share are known
+    chunks: List[object] = []
+    style_counts: Dict[str, int] = {}
+    # Text since the last tag; comments are dropped from it
+    text = ""
+    position = 0
+    match = _MARKUP.search(page)
+    while match is not None:
+        closing, name, attributes = match.group(1), match.group(2), match.group(3)
+        text += page[position : match.start()]
+        position = match.end()
+        if name is not None:
+            chunks.append(_collapse_whitespace(text))
+            text = ""
+            if not closing and _is_protected(name, attributes):
+                position = _verbatim_end(page, match)
+                chunks.append(page[match.start() : position])
+            else:
+                if not closing:
+                    _count_style(attributes, style_counts)
+                chunks.append((name, attributes, closing))
+        match = _MARKUP.search(page, position)
+    chunks.append(_collapse_whitespace(text + page[position:]))
+
+    # Styles used more than once become classes, in order of first use
+    classes: Dict[str, str] = {}
+    for value, count in style_counts.items():
+        if count > 1:
+            classes[value] = f"{STYLE_CLASS_PREFIX}{len(classes)}"
+
+    # The classes are defined before the site's stylesheets, so that those
+    # win ties between !important rules, as they did against inline styles
+    style_block = ""
+    if classes:
+        rules = "".join(
+            f".{class_name}{{{_style_rule(value)}}}"
+            for value, class_name in classes.items()
+        )
+        style_block = f"<style>{rules}</style>"
+
+    parts = []
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            parts.append(chunk)
+            continue
+        name, attributes, closing = chunk
+        name_lower = name.lower()
+        if style_block and (
+            (name_lower == "link" and "stylesheet" in attributes)
+            or (name_lower == "head" and closing)
+        ):
+            parts.append(style_block)
+            style_block = ""
+        if not closing and classes:
+            attributes = _share_style(attributes, classes)
+        parts.append(f"<{closing}{name}{attributes}>")
+    return "".join(parts)
+
+
+def _share_style(attributes: str, classes: Dict[str, str]) -> str:
+    """Replace a tag's inline style by its class, if it has one."""
+    style = _STYLE_ATTRIBUTE.search(attributes)
+    if style is None:
+        return attributes
+    class_name = classes.get(_style_value(style))
+    if class_name is None:
+        return attributes
+
+    attributes = attributes[: style.start()] + attributes[style.end() :]
+    existing = _CLASS_ATTRIBUTE.search(attributes)
+    if existing is None:
+        return f' class="{class_name}"' + attributes
+    names = existing.group(1) if existing.group(1) is not None else existing.group(2)
+    return (
+        attributes[: existing.start()]
+        + f' class="{names} {class_name}"'
+        + attributes[existing.end() :]
+    )
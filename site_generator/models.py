@@ -0,0 +1,297 @@
+"""
+Data model shared by the examples compiler and the site generator.
+
+The compiler builds these objects from the example sources, and the site
+generator gets them back from the catalog. Defaults are applied once, in the
+from_dict constructors, so rendering code can use plain attribute access.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Section that collects examples not listed in sections.json
+MISC_SECTION_ID = "999-misc"
+
+
+def comment_annotation(lines: List[str]) -> str:
+    """
+    Build the annotation text for a block of comment lines.
+
+    Args:
+        lines: Comment lines, including their "#" markers
+
+    Returns:
+        The annotation with comment markers removed, one line per comment line
+    """
+    texts = [line.rstrip().lstrip("# ") for line in lines]
+    # Leading empty comment lines never contribute blank lines
+    first = 0
+    while first < len(texts) and not texts[first]:
+        first += 1
+    return "\n".join(texts[first:])
+
+
+@dataclass(slots=True)
+class CodeSegment:
+    """A run of consecutive code lines, or of consecutive comment lines."""
+
+    code: str
+    is_comment: bool
+    start_line: int
+    end_line: int
+    annotation: str = ""
+    target_line_range: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def from_lines(
+        cls, lines: List[str], is_comment: bool, start_line: int
+    ) -> "CodeSegment":
+        """Build a segment from its source lines."""
+        return cls(
+            code="".join(lines),
+            is_comment=is_comment,
+            start_line=start_line,
+            end_line=start_line + len(lines) - 1,
+            annotation=comment_annotation(lines) if is_comment else "",
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CodeSegment":
+        """Build a segment from its version 1 catalog form."""
+        target = data.get("target_line_range")
+        start_line, end_line = data["line_range"]
+        return cls(
+            code=data["code"],
+            is_comment=data["is_comment"],
+            start_line=start_line,
+            end_line=end_line,
+            annotation=data.get("annotation", ""),
+            target_line_range=tuple(target) if target else None,
+        )
+
+    @property
+    def display_code(self) -> str:
+        """The code shown on the page (empty for comment segments)."""
+        return "" if self.is_comment else self.code
+
+    @property
+    def line_range(self) -> Tuple[int, int]:
+        return (self.start_line, self.end_line)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise in the version 1 catalog form."""
+        data = {
+            "code": self.code,
+            "display_code": self.display_code,
+            "annotation": self.annotation,
+            "is_comment": self.is_comment,
+            "start_line": self.start_line,
+            "line_range": self.line_range,
+        }
+        if self.target_line_range is not None:
+            data["target_line_range"] = self.target_line_range
+        return data
+
+
+def map_comments_to_code(segments: List[CodeSegment]) -> None:
+    """
+    Determine which code blocks each comment should align with.
+    Modifies the segments list in place.
+
+    Args:
+        segments: List of code segments
+    """
+    # Walk backwards so the next code segment is always known
+    next_code_range = None
+    for i in range(len(segments) - 1, -1, -1):
+        segment = segments[i]
+        if not segment.is_comment:
+            next_code_range = segment.line_range
+        elif next_code_range is not None:
+            # Found a code segment after this comment
+            segment.target_line_range = next_code_range
+        elif i > 0 and not segments[i - 1].is_comment:
+            # No code after, but there's code before
+            segment.target_line_range = segments[i - 1].line_range
+        else:
+            # No related code found
+            segment.target_line_range = segment.line_range
+
+
+@dataclass(slots=True)
+class ShellSegment:
+    """A shell command with its optional explanation and captured output."""
+
+    command: str
+    explanation: str = ""
+    output: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ShellSegment":
+        return cls(
+            command=data.get("command", ""),
+            explanation=data.get("explanation", ""),
+            output=data.get("output", ""),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "explanation": self.explanation,
+            "command": self.command,
+            "output": self.output,
+        }
+
+
+@dataclass(slots=True)
+class ImageRef:
+    """An image shipped with an example."""
+
+    path: str
+    filename: str
+    caption: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ImageRef":
+        return cls(
+            path=data["path"],
+            filename=data.get("filename", ""),
+            caption=data.get("caption", ""),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"path": self.path, "filename": self.filename, "caption": self.caption}
+
+
+@dataclass(slots=True)
+class Section:
+    """A group of examples shown together on the index page."""
+
+    id: str
+    title: str
+    description: str = ""
+    order: int = 999
+    examples: Optional[List[str]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Section":
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            description=data.get("description", ""),
+            order=data.get("order", 999),
+            examples=data.get("examples"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "order": self.order,
+        }
+        if self.examples is not None:
+            data["examples"] = self.examples
+        return data
+
+
+@dataclass(slots=True)
+class ExampleBody:
+    """The content of an example, everything but its catalog metadata."""
+
+    description: str = ""
+    code_segments: List[CodeSegment] = field(default_factory=list)
+    shell_segments: List[ShellSegment] = field(default_factory=list)
+    image_data: List[ImageRef] = field(default_factory=list)
+    documentation_links: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Example:
+    """
+    A compiled example.
+
+    The metadata fields are always available. The body is either given up
+    front or read on first access through body_loader (used by sharded
+    catalogs, which only load the examples that are actually rendered).
+    """
+
+    id: str
+    title: str
+    order: int
+    section_id: Optional[str] = None
+    section_title: Optional[str] = None
+    content_hash: str = ""
+    body_data: Optional[ExampleBody] = field(default=None, repr=False)
+    body_loader: Optional[Callable[[], ExampleBody]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    @property
+    def body(self) -> ExampleBody:
+        if self.body_data is None:
+            self.body_data = self.body_loader() if self.body_loader else ExampleBody()
+        return self.body_data
+
+    @property
+    def body_loaded(self) -> bool:
+        return self.body_data is not None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Example":
+        """Build an example from its version 1 catalog form."""
+        body = ExampleBody(
+            description=data.get("description", ""),
+            code_segments=[
+                CodeSegment.from_dict(segment)
+                for segment in data.get("code_segments", [])
+            ],
+            shell_segments=[
+                ShellSegment.from_dict(segment)
+                for segment in data.get("shell_segments", [])
+            ],
+            image_data=[ImageRef.from_dict(image) for image in data.get("image_data", [])],
+            documentation_links=data.get("documentation_links", []),
+        )
+        return cls(
+            id=data["id"],
+            title=data.get("title", "Untitled Example"),
+            order=data["order"],
+            section_id=data.get("section_id"),
+            section_title=data.get("section_title"),
+            body_data=body,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise in the version 1 catalog form."""
+        body = self.body
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "description": body.description,
+            "order": self.order,
+            "code_segments": [segment.to_dict() for segment in body.code_segments],
+            "shell_segments": [segment.to_dict() for segment in body.shell_segments],
+            "image_data": [image.to_dict() for image in body.image_data],
+            "documentation_links": body.documentation_links,
+        }
+        if self.section_id is not None:
+            data["section_id"] = self.section_id
+            data["section_title"] = self.section_title
+        return data
+
+
+@dataclass(slots=True)
+class Catalog:
+    """All compiled examples, in display order, and their sections."""
+
+    examples: List[Example] = field(default_factory=list)
+    sections: List[Section] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise in the version 1 catalog form."""
+        data: Dict[str, Any] = {
+            "examples": [example.to_dict() for example in self.examples]
+        }
+        if self.sections:
+            data["sections"] = [section.to_dict() for section in self.sections]
+        return data
@@ -0,0 +1,217 @@
+"""
+Service worker and precache manifest of the site.
+
+With --service-worker, build_static_site.py publishes a service worker
+(sw.js, at the root so that it controls every page) and a precache manifest
+listing every page and asset of the build with a hash of its content. The
+worker keeps them all in the browser's cache and answers from it, so repeat
+visits load instantly and the whole site can be read offline. A new deploy
+changes the manifest's fingerprinted name, and with it sw.js, so browsers
+install the new worker, which downloads only the files whose hash changed.
+
+The manifest is built from the files the build emitted through OutputSync,
+after every other output is written, so it lists exactly the files of this
+build and never one that is about to be pruned. Hashes of files the build
+did not rewrite are reused from the previous build.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from site_generator import templates
+from site_generator.assets import content_hash, fingerprinted_name
+from site_generator.inventory import IMAGE_SUFFIXES
+from site_generator.output import OutputSync, atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the precache hash cache changes
+PRECACHE_CACHE_VERSION = 1
+
+# Path of the service worker; its scope is the directory it is served from
+SERVICE_WORKER_PATH = "sw.js"
+
+# Path of the precache manifest, before it is fingerprinted
+PRECACHE_MANIFEST_PATH = "static/precache-manifest.json"
+
+# Outputs a reader needs offline: pages, their assets and the search index
+# (but not the llms files, the sitemap or compressed copies)
+PRECACHE_SUFFIXES = (".html", ".css", ".js", ".json", ".svg") + IMAGE_SUFFIXES
+
+
+def is_precached(relative: str) -> bool:
+    """Whether an output path belongs in the precache manifest."""
+    return relative.endswith(PRECACHE_SUFFIXES) and relative != SERVICE_WORKER_PATH
+
+
+def precache_url(relative: str) -> str:
+    """
+    URL of an output, relative to the service worker's scope.
+
+    Pages are linked as their directory, so "001-getting-started/index.html"
+    is cached as "001-getting-started/" and "index.html" as "./".
+    """
+    if relative == "index.html":
+        return "./"
+    if relative.endswith("/index.html"):
+        return relative[: -len("index.html")]
+    return relative
+
+
+class PrecacheHashes:
+    """
+    Content hashes of the outputs listed by previous builds.
+
+    Each hash is kept with the size and modification time of the file it was
+    computed from. Outputs are only rewritten when their content changes
+    (see OutputSync), so a file the build did not rewrite, and whose size and
+    modification time are unchanged, still has its recorded hash.
+    """
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = cache_file
+        self.entries: Dict[str, List] = {}
+        # Number of files hashed by this build
+        self.hashed = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Load the cache of the previous build."""
+        try:
+            with open(self.cache_file, "r") as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable precache cache: {e}")
+            return
+
+        if cache.get("version") == PRECACHE_CACHE_VERSION:
+            self.entries = cache.get("files", {})
+
+    def hash(self, path: Path, relative: str, rewritten: bool) -> str:
+        """
+        Hash of an output's content, reused from the previous build if valid.
+
+        Args:
+            path: The output file
+            relative: Its path relative to the output directory
+            rewritten: Whether this build wrote the file
+
+        Returns:
+            The hash of its content
+        """
+        stat = path.stat()
+        entry = self.entries.get(relative)
+        if (
+            not rewritten
+            and entry is not None
+            and entry[0] == stat.st_size
+            and entry[1] == stat.st_mtime_ns
+        ):
+            return entry[2]
+        digest = content_hash(path.read_bytes())
+        self.hashed += 1
+        self.entries[relative] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def save(self, live_paths: Iterable[str]) -> None:
+        """
+        Write the cache, dropping outputs that no longer exist.
+
+        Args:
+            live_paths: Paths of the outputs of this build
+        """
+        files = {
+            relative: self.entries[relative]
+            for relative in sorted(live_paths)
+            if relative in self.entries
+        }
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.cache_file) as f:
+            json.dump(
+                {"version": PRECACHE_CACHE_VERSION, "files": files},
+                f,
+                separators=(",", ":"),
+            )
+
+
+def precache_manifest(
+    outputs: OutputSync, hashes: Optional[PrecacheHashes] = None
+) -> Dict[str, str]:
+    """
+    List the outputs of a build for the service worker.
+
+    Args:
+        outputs: Tracker of the emitted files, once every output is written
+        hashes: Hashes of previous builds, updated with the files hashed
+
+    Returns:
+        Content hash of every precached output, by URL relative to the
+        service worker's scope, in URL order
+    """
+    files = {}
+    for relative in sorted(outputs.emitted):
+        if not is_precached(relative):
+            continue
+        path = outputs.root / relative
+        if hashes is None:
+            files[precache_url(relative)] = content_hash(path.read_bytes())
+        else:
+            files[precache_url(relative)] = hashes.hash(
+                path, relative, relative in outputs.written
+            )
+    hashed = len(files) if hashes is None else hashes.hashed
+    logger.info(f"Listed {len(files)} files for the service worker ({hashed} hashed)")
+    return dict(sorted(files.items()))
+
+
+def write_service_worker(
+    outputs: OutputSync, hashes: Optional[PrecacheHashes] = None
+) -> str:
+    """
+    Publish the precache manifest and the service worker of a build.
+
+    Args:
+        outputs: Tracker of the emitted files, once every other output is
+            written; the manifest and the worker are emitted to it
+        hashes: Hashes of previous builds, updated with the files hashed
+
+    Returns:
+        Path of the fingerprinted manifest, relative to the output directory
+    """
+    manifest = json.dumps(
+        {"files": precache_manifest(outputs, hashes)}, separators=(",", ":")
+    )
+    manifest_path = fingerprinted_name(
+        PRECACHE_MANIFEST_PATH, manifest.encode("utf-8")
+    )
+    outputs.write_text(outputs.root / manifest_path, manifest)
+    outputs.write_text(
+        outputs.root / SERVICE_WORKER_PATH,
+        templates.service_worker_manifest(manifest_url=json.dumps(manifest_path))
+        + templates.SERVICE_WORKER,
+    )
+    logger.info(f"Published {SERVICE_WORKER_PATH} with manifest {manifest_path}")
+    return manifest_path
+
+
+def retire_service_worker(outputs: OutputSync) -> None:
+    """
+    Replace the service worker of an earlier build with one that removes it.
+
+    Browsers keep an installed service worker even once its script is gone,
+    and it would go on serving the old cached site, so a build without one
+    publishes a worker that deletes the cache and unregisters itself instead.
+    Once published, it is kept by every later build without a worker.
+
+    Args:
+        outputs: Tracker of the emitted files
+    """
+    if outputs.previous is None or SERVICE_WORKER_PATH not in outputs.previous:
+        return
+    outputs.write_text(
+        outputs.root / SERVICE_WORKER_PATH, templates.RETIRED_SERVICE_WORKER
+    )
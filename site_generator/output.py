@@ -0,0 +1,337 @@
+"""
+Writing build outputs.
+
+Outputs are written atomically, and files whose content is unchanged are not
+written at all, so they keep their modification time. OutputSync tracks the
+files a build emits, so that files left over from earlier builds can be
+pruned without touching anything else in the output directory.
+"""
+
+import filecmp
+import io
+import json
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Set, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the output manifest changes
+OUTPUT_MANIFEST_VERSION = 1
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w") -> Iterator[IO]:
+    """
+    Open a file for writing so that readers never see it half-written.
+
+    The content goes to a temporary file next to path, which replaces path
+    only once the block completes. If the block raises, path is left as it
+    was and the temporary file is removed.
+
+    Args:
+        path: The file to write
+        mode: "w" for text, "wb" for bytes
+
+    Yields:
+        The open temporary file
+    """
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, mode) as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_text_if_changed(path: Path, content: str) -> bool:
+    """
+    Write a text file unless it already has exactly this content.
+
+    Args:
+        path: The file to write
+        content: The new content
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    try:
+        if path.read_text() == content:
+            return False
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    with atomic_write(path) as f:
+        f.write(content)
+    return True
+
+
+def write_bytes_if_changed(path: Path, content: bytes) -> bool:
+    """
+    Write a binary file unless it already has exactly this content.
+
+    Args:
+        path: The file to write
+        content: The new content
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    try:
+        if path.read_bytes() == content:
+            return False
+    except OSError:
+        pass
+
+    with atomic_write(path, "wb") as f:
+        f.write(content)
+    return True
+
+
+def copy_file_if_changed(source: Path, destination: Path) -> bool:
+    """
+    Copy a file (with its metadata) unless the destination already matches.
+
+    Args:
+        source: The file to copy
+        destination: Where to copy it
+
+    Returns:
+        True if the file was copied, False if it was already up to date
+    """
+    try:
+        if filecmp.cmp(source, destination, shallow=False):
+            return False
+    except OSError:
+        pass
+
+    temp_path = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    try:
+        shutil.copy2(source, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return True
+
+
+class OutputSync:
+    """
+    Tracks the files a build emits into an output directory.
+
+    Every output goes through write_text, open_text or copy_file, which only
+    touch files whose content changed, so unchanged outputs keep their
+    modification time. The emitted paths are saved to a manifest; the next
+    build prunes the files of the previous manifest that it did not emit, and
+    leaves every other file in the directory alone.
+    """
+
+    def __init__(self, root: Path, manifest_file: Optional[Path] = None):
+        """
+        Args:
+            root: The output directory
+            manifest_file: Manifest of the emitted files; without one, nothing
+                is pruned or saved
+        """
+        self.root = root
+        self.manifest_file = manifest_file
+        # Relative paths emitted by the previous build (None if unknown)
+        self.previous: Optional[Set[str]] = None
+        # Relative paths emitted by this build, and those actually written
+        self.emitted: Set[str] = set()
+        self.written: Set[str] = set()
+        if manifest_file is not None:
+            self._load_manifest()
+
+    def _load_manifest(self) -> None:
+        """Load the outputs of the previous build."""
+        try:
+            with open(self.manifest_file, "r") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable output manifest: {e}")
+            return
+
+        if manifest.get("version") == OUTPUT_MANIFEST_VERSION:
+            self.previous = set(manifest.get("files", []))
+
+    def _relative(self, path: Path) -> str:
+        """Path of an output relative to the output directory."""
+        return path.relative_to(self.root).as_posix()
+
+    def _emit(self, path: Path, written: bool) -> bool:
+        relative = self._relative(path)
+        self.emitted.add(relative)
+        if written:
+            self.written.add(relative)
+        return written
+
+    def write_text(self, path: Path, content: str) -> bool:
+        """
+        Emit a text file.
+
+        Args:
+            path: The file to write, inside the output directory
+            content: Its content
+
+        Returns:
+            True if the file was written, False if it was already up to date
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return self._emit(path, write_text_if_changed(path, content))
+
+    def write_bytes(self, path: Path, content: bytes) -> bool:
+        """
+        Emit a binary file.
+
+        Args:
+            path: The file to write, inside the output directory
+            content: Its content
+
+        Returns:
+            True if the file was written, False if it was already up to date
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return self._emit(path, write_bytes_if_changed(path, content))
+
+    @contextmanager
+    def open_text(self, path: Path) -> Iterator[TextIO]:
+        """
+        Emit a text file written incrementally.
+
+        The content is collected in memory and handed to write_text once the
+        block completes; if the block raises, nothing is written.
+
+        Args:
+            path: The file to write, inside the output directory
+
+        Yields:
+            A buffer to write the content to
+        """
+        with io.StringIO() as buffer:
+            yield buffer
+            self.write_text(path, buffer.getvalue())
+
+    def copy_file(self, source: Path, destination: Path) -> bool:
+        """
+        Emit a copy of a file.
+
+        Args:
+            source: The file to copy
+            destination: Where to copy it, inside the output directory
+
+        Returns:
+            True if the file was copied, False if it was already up to date
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        return self._emit(destination, copy_file_if_changed(source, destination))
+
+    def copy_tree(self, source: Path, destination: Path) -> None:
+        """
+        Emit a copy of every file under a directory.
+
+        Args:
+            source: The directory to copy
+            destination: Where to copy it, inside the output directory
+        """
+        for source_file in sorted(source.rglob("*")):
+            if source_file.is_file():
+                self.copy_file(
+                    source_file, destination / source_file.relative_to(source)
+                )
+
+    def keep_file(self, path: Path) -> None:
+        """
+        Emit a file as it is, without rewriting it.
+
+        Args:
+            path: A file inside the output directory, known to be up to date
+        """
+        self._emit(path, False)
+
+    def keep_directory(self, directory: Path) -> None:
+        """
+        Emit the files of a directory as they are, without rewriting them.
+
+        Used for outputs that are known to be up to date (such as cached
+        pages). The files come from the previous manifest, or from the
+        directory itself if there is none.
+
+        Args:
+            directory: A directory inside the output directory
+        """
+        prefix = self._relative(directory) + "/"
+        if self.previous is not None:
+            self.emitted.update(
+                path for path in self.previous if path.startswith(prefix)
+            )
+        elif directory.is_dir():
+            self.emitted.update(
+                self._relative(path) for path in directory.rglob("*") if path.is_file()
+            )
+
+    def merge(self, other: "OutputSync") -> None:
+        """
+        Add the files emitted through another tracker of the same directory.
+
+        Used to collect the outputs of worker processes.
+
+        Args:
+            other: The other tracker
+        """
+        self.emitted.update(other.emitted)
+        self.written.update(other.written)
+
+    def prune(self, unmanaged: Iterable[Path] = ()) -> int:
+        """
+        Delete the outputs of the previous build that this build did not emit.
+
+        Directories left empty are removed too.
+
+        Args:
+            unmanaged: Files to treat as outputs of the previous build when
+                there is no manifest (such as the output of older builds)
+
+        Returns:
+            Number of files deleted
+        """
+        if self.previous is not None:
+            candidates = self.previous
+        else:
+            candidates = {self._relative(path) for path in unmanaged}
+
+        pruned = 0
+        for relative in sorted(candidates - self.emitted):
+            path = self.root / relative
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            pruned += 1
+            logger.info(f"Removed stale output {path}")
+
+            # Remove the directories this leaves empty
+            parent = path.parent
+            while parent != self.root and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+        return pruned
+
+    def save(self) -> None:
+        """Write the manifest of the files emitted by this build."""
+        if self.manifest_file is None:
+            return
+        manifest = {
+            "version": OUTPUT_MANIFEST_VERSION,
+            "files": sorted(self.emitted),
+        }
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.manifest_file) as f:
+            json.dump(manifest, f, indent=2)
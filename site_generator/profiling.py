@@ -0,0 +1,270 @@
+"""
+Build profiling.
+
+When profiling is enabled (--profile on build_examples.py or
+build_static_site.py), spans record the wall time and memory allocated by
+each build stage and by each example compiled or rendered. At the end of the
+build they are written as a Chrome trace (open it in chrome://tracing or
+https://ui.perfetto.dev), and the slowest examples are logged as a table.
+Optionally the whole build also runs under cProfile.
+
+Spans are no-ops while profiling is disabled, so instrumented code costs
+nothing in a normal build.
+"""
+
+import argparse
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Spans in this category are aggregated per example in the summary table
+EXAMPLE_CATEGORY = "example"
+
+
+class Profiler:
+    """
+    Collects timing spans as Chrome trace events.
+
+    Each span stores its duration, the memory it left allocated and the peak
+    memory allocated while it ran (both from tracemalloc, so they only cover
+    Python allocations).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self.trace_file: Optional[Path] = None
+        self.top = 10
+        self.cprofile_file: Optional[Path] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        # Highest peak seen by the children of each open span
+        self._child_peaks: List[int] = []
+
+    def start(
+        self,
+        trace_file: Path,
+        top: int = 10,
+        cprofile_file: Optional[Path] = None,
+    ) -> bool:
+        """
+        Start profiling, unless it is already running.
+
+        Args:
+            trace_file: Path of the Chrome trace written by finish()
+            top: Number of examples in the slowest-examples table
+            cprofile_file: Optional path for cProfile stats
+
+        Returns:
+            True if this call started profiling (and should call finish())
+        """
+        if self.enabled:
+            return False
+
+        self.trace_file = trace_file
+        self.top = top
+        self.cprofile_file = cprofile_file
+        self.enable()
+        if cprofile_file is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        logger.info(f"Profiling enabled, writing trace to {trace_file}")
+        return True
+
+    def enable(self) -> None:
+        """
+        Start recording spans without any output of its own.
+
+        Used in worker processes (see enable_in_worker), which send their
+        events back to the main process.
+        """
+        self.enabled = True
+        self.events = []
+        self._child_peaks = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **args: Any) -> Iterator[None]:
+        """
+        Record the enclosed block as one span.
+
+        Args:
+            name: Span name
+            category: Span category ("stage" or "example")
+            args: Extra values stored with the span (such as the example ID)
+        """
+        if not self.enabled:
+            yield
+            return
+
+        # Resetting the peak hides it from the enclosing span, so remember it
+        current_before, outer_peak = tracemalloc.get_traced_memory()
+        if self._child_peaks:
+            self._child_peaks[-1] = max(self._child_peaks[-1], outer_peak)
+        tracemalloc.reset_peak()
+        self._child_peaks.append(0)
+
+        timestamp = time.time_ns() // 1000
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter_ns() - start) // 1000
+            current_after, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._child_peaks.pop())
+            if self._child_peaks:
+                self._child_peaks[-1] = max(self._child_peaks[-1], peak)
+
+            args["allocated_kib"] = round((current_after - current_before) / 1024, 1)
+            args["peak_kib"] = round((peak - current_before) / 1024, 1)
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": timestamp,
+                    "dur": duration,
+                    "pid": os.getpid(),
+                    "tid": threading.get_native_id(),
+                    "args": args,
+                }
+            )
+
+    def example_summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate the example spans per example.
+
+        Returns:
+            One row per example, slowest first, with the total and per-span
+            durations in milliseconds and the highest peak memory
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        for event in self.events:
+            if event["cat"] != EXAMPLE_CATEGORY:
+                continue
+            example_id = event["args"].get("example", "?")
+            row = rows.setdefault(
+                example_id, {"example": example_id, "total_ms": 0.0, "peak_kib": 0.0}
+            )
+            milliseconds = event["dur"] / 1000
+            row[event["name"]] = row.get(event["name"], 0.0) + milliseconds
+            row["total_ms"] += milliseconds
+            row["peak_kib"] = max(row["peak_kib"], event["args"]["peak_kib"])
+        return sorted(rows.values(), key=lambda row: row["total_ms"], reverse=True)
+
+    def log_summary(self) -> None:
+        """Log the build stages and the slowest examples as tables."""
+        stages = sorted(
+            (event for event in self.events if event["cat"] == "stage"),
+            key=lambda event: event["ts"],
+        )
+        if stages:
+            logger.info(f"{'stage':<32} {'ms':>10} {'alloc KiB':>10} {'peak KiB':>10}")
+            for event in stages:
+                logger.info(
+                    f"{event['name']:<32} {event['dur'] / 1000:>10.1f} "
+                    f"{event['args']['allocated_kib']:>10.1f} "
+                    f"{event['args']['peak_kib']:>10.1f}"
+                )
+
+        rows = self.example_summary()[: self.top]
+        if not rows:
+            return
+        span_names = sorted(
+            {key for row in rows for key in row} - {"example", "total_ms", "peak_kib"}
+        )
+        logger.info(f"Slowest {len(rows)} examples:")
+        header = f"{'example':<40} {'total ms':>10}"
+        for span_name in span_names:
+            header += f" {span_name + ' ms':>{len(span_name) + 3}}"
+        logger.info(header + f" {'peak KiB':>10}")
+        for row in rows:
+            line = f"{row['example']:<40} {row['total_ms']:>10.1f}"
+            for span_name in span_names:
+                line += f" {row.get(span_name, 0.0):>{len(span_name) + 3}.1f}"
+            logger.info(line + f" {row['peak_kib']:>10.1f}")
+
+    def finish(self) -> None:
+        """Stop profiling and write the trace, the summary and cProfile stats."""
+        if not self.enabled:
+            return
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.cprofile_file.parent.mkdir(parents=True, exist_ok=True)
+            self._cprofile.dump_stats(str(self.cprofile_file))
+            logger.info(f"Wrote cProfile stats to {self.cprofile_file}")
+            self._cprofile = None
+
+        self.enabled = False
+        tracemalloc.stop()
+
+        self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.trace_file, "w") as f:
+            json.dump(
+                {"traceEvents": self.events, "displayTimeUnit": "ms"}, f, indent=1
+            )
+        logger.info(
+            f"Wrote profiling trace ({len(self.events)} spans) to {self.trace_file}"
+        )
+        self.log_summary()
+
+
+# The profiler shared by every build stage in this process
+profiler = Profiler()
+
+
+def enable_in_worker() -> None:
+    """Process pool initializer that records spans in worker processes."""
+    profiler.enable()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the profiling options to a command-line parser."""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="build-profile.json",
+        metavar="TRACE_FILE",
+        help="Profile the build and write a Chrome trace "
+        "(default: build-profile.json)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="Number of examples in the slowest-examples table",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="STATS_FILE",
+        help="With --profile, also write cProfile stats of the build",
+    )
+
+
+def start_from_args(args: argparse.Namespace) -> bool:
+    """
+    Start profiling if the parsed arguments ask for it.
+
+    Args:
+        args: Arguments parsed by a parser set up with add_profile_arguments
+
+    Returns:
+        True if this call started profiling (and should call finish())
+    """
+    if not args.profile:
+        return False
+    return profiler.start(
+        Path(args.profile),
+        args.profile_top,
+        Path(args.cprofile) if args.cprofile else None,
+    )
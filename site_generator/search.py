@@ -0,0 +1,300 @@
+"""
+Prebuilt search index of the examples.
+
+The index page searches the examples in the browser (see static/js/script.js)
+with an inverted index built here: every term of the examples' titles,
+descriptions, annotations and Python identifiers, with the examples it
+occurs in. The terms are sorted, so the browser finds the terms starting
+with a typed word by binary search, and each keystroke only reads the
+postings of the terms it matches.
+
+Reading an example's terms is most of the work, so they are cached between
+builds per example, keyed by the example's fingerprint: only new and changed
+examples are read again, and the bodies of the others are never loaded.
+
+The index is serialised as compact JSON:
+
+- "examples": [id, title] of every example, in display order; postings refer
+  to examples by their position in this list
+- "terms": the sorted terms, front-coded and separated by spaces: each term
+  starts with the number of leading characters it shares with the previous
+  one, as a base-36 digit, followed by the rest of it
+- "postings": for each term, the examples it occurs in, separated by spaces.
+  Each example is a varint of (gap from the previous example << 2 | field),
+  written least significant first, five bits per digit of POSTING_DIGITS;
+  digits from the upper half of the alphabet are followed by more digits
+- "stop_words": words that are not indexed, so the browser ignores them too
+"""
+
+import json
+import keyword
+import logging
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from site_generator.catalog import example_fingerprint
+from site_generator.models import Example
+from site_generator.output import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the search cache or the extraction of terms changes
+SEARCH_CACHE_VERSION = 1
+
+# Where a term occurs, from least to most relevant; a term is recorded with
+# the most relevant field it occurs in
+CODE, ANNOTATION, DESCRIPTION, TITLE = range(4)
+
+# Terms shorter or longer than this are not indexed
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+
+# Words too common to tell examples apart
+STOP_WORDS = frozenset(
+    "an and are as at be but by can for from has have how if in into is it its "
+    "not of on or so that the their then there these this to use was we what "
+    "when which will with you your".split()
+)
+
+# Digits of the posting varints: the first 32 end a number, the last 32 are
+# followed by more digits
+POSTING_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-_"
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+_WORD = re.compile(r"\w+")
+# Parts of snake_case and CamelCase words, such as "Base" and "Model"
+_WORD_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+# A name in Python code, or something to skip: a comment, a string or a
+# number (so that neither the words of strings nor the digits and letters of
+# literals such as 0xff are taken for names)
+_PYTHON_NAME = re.compile(
+    r"#[^\n]*"
+    r"|[rRbBuUfF]{0,2}(?:'''[\s\S]*?(?:'''|\Z)|\"\"\"[\s\S]*?(?:\"\"\"|\Z)"
+    r"|'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\")"
+    r"|\d[\w.]*"
+    r"|([^\W\d]\w*)"
+)
+
+
+def words(text: str) -> List[str]:
+    """
+    Terms of a piece of text.
+
+    Args:
+        text: Prose or identifiers
+
+    Returns:
+        Its words in lower case, plus the parts of compound words, without
+        stop words and words of the wrong length
+    """
+    found = []
+    for word in dict.fromkeys(_WORD.findall(text)):
+        found.append(word.lower())
+        parts = _WORD_PART.findall(word)
+        if len(parts) > 1:
+            found.extend(part.lower() for part in parts)
+    return [
+        term
+        for term in found
+        if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH
+        and term not in STOP_WORDS
+        # Terms are compared and sliced as UTF-16 in the browser
+        and max(term) <= "\uffff"
+    ]
+
+
+def identifiers(code: str) -> List[str]:
+    """
+    Names used in Python code, leaving out keywords, strings and comments.
+
+    A regular expression rather than the tokenize module finds them: it is
+    many times faster, and tolerates fragments that do not tokenize. Names
+    in the replacement fields of f-strings are skipped with the strings.
+
+    Args:
+        code: The code
+
+    Returns:
+        The names, in order of appearance
+    """
+    return [
+        name
+        for name in _PYTHON_NAME.findall(code)
+        if name and not keyword.iskeyword(name)
+    ]
+
+
+def example_terms(example: Example) -> Dict[str, int]:
+    """
+    Read the terms of an example.
+
+    Args:
+        example: The example
+
+    Returns:
+        The most relevant field of each term
+    """
+    body = example.body
+    code = "".join(
+        segment.code for segment in body.code_segments if not segment.is_comment
+    )
+    annotations = "\n".join(
+        segment.annotation for segment in body.code_segments if segment.is_comment
+    )
+
+    terms: Dict[str, int] = {}
+    for field, text in (
+        (CODE, " ".join(identifiers(code))),
+        (ANNOTATION, annotations),
+        (DESCRIPTION, body.description),
+        (TITLE, example.title),
+    ):
+        # Later fields are more relevant and replace earlier ones
+        for term in words(text):
+            terms[term] = field
+    return terms
+
+
+class SearchIndexCache:
+    """
+    Terms of the examples indexed by previous builds.
+
+    Entries are kept per example ID with the fingerprint of the example they
+    were read from, so an example that changed is simply read again. Saving
+    keeps only the examples the current catalog still has.
+    """
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = cache_file
+        self.entries: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load the cache of the previous build."""
+        try:
+            with open(self.cache_file, "r") as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable search cache: {e}")
+            return
+
+        if cache.get("version") == SEARCH_CACHE_VERSION:
+            self.entries = cache.get("examples", {})
+
+    def terms(self, example_id: str, fingerprint: str) -> Optional[Dict[str, int]]:
+        """The cached terms of an example, if it has not changed since."""
+        entry = self.entries.get(example_id)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        return entry["terms"]
+
+    def record(self, example_id: str, fingerprint: str, terms: Dict[str, int]) -> None:
+        """Record the terms read from an example."""
+        self.entries[example_id] = {"fingerprint": fingerprint, "terms": terms}
+
+    def save(self, live_ids: Iterable[str]) -> None:
+        """
+        Write the cache, dropping examples that no longer exist.
+
+        Args:
+            live_ids: IDs of the examples of the current catalog
+        """
+        entries = {
+            example_id: self.entries[example_id]
+            for example_id in sorted(live_ids)
+            if example_id in self.entries
+        }
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.cache_file) as f:
+            json.dump(
+                {"version": SEARCH_CACHE_VERSION, "examples": entries},
+                f,
+                separators=(",", ":"),
+            )
+
+
+def _encode_varint(value: int) -> str:
+    if value < 32:
+        return POSTING_DIGITS[value]
+    digits = []
+    while value >= 32:
+        digits.append(POSTING_DIGITS[32 + (value & 31)])
+        value >>= 5
+    digits.append(POSTING_DIGITS[value])
+    return "".join(digits)
+
+
+def _front_code(terms: List[str]) -> str:
+    """Front-code sorted terms, separated by spaces."""
+    coded = []
+    previous = ""
+    for term in terms:
+        shared = 0
+        limit = min(len(term), len(previous), 35)
+        while shared < limit and term[shared] == previous[shared]:
+            shared += 1
+        coded.append(_BASE36[shared])
+        coded.append(term[shared:])
+        coded.append(" ")
+        previous = term
+    return "".join(coded[:-1])
+
+
+def build_search_index(
+    examples: List[Example], cache: Optional[SearchIndexCache] = None
+) -> str:
+    """
+    Build the search index of the examples.
+
+    Args:
+        examples: The examples, in display order
+        cache: Terms of previous builds, updated with the examples read
+
+    Returns:
+        The serialised index
+    """
+    # Postings as (example number << 2 | field), in example order
+    postings: Dict[str, List[int]] = defaultdict(list)
+    read = 0
+    for number, example in enumerate(examples):
+        terms = None
+        fingerprint = None
+        if cache is not None:
+            fingerprint = example_fingerprint(example)
+            terms = cache.terms(example.id, fingerprint)
+        if terms is None:
+            terms = example_terms(example)
+            read += 1
+            if cache is not None:
+                cache.record(example.id, fingerprint, terms)
+        base = number << 2
+        for term, field in terms.items():
+            postings[term].append(base | field)
+
+    sorted_terms = sorted(postings)
+    encoded = []
+    for term in sorted_terms:
+        # The gap to the previous example, with the field in the low bits
+        previous = 0
+        digits = []
+        for value in postings[term]:
+            digits.append(_encode_varint(value - previous))
+            previous = value & ~3
+        encoded.append("".join(digits))
+
+    logger.info(
+        f"Indexed {len(sorted_terms)} terms of {len(examples)} examples "
+        f"({read} read, {len(examples) - read} cached)"
+    )
+    index = {
+        "examples": [[example.id, example.title] for example in examples],
+        "terms": _front_code(sorted_terms),
+        "postings": " ".join(encoded),
+        "stop_words": " ".join(sorted(STOP_WORDS)),
+    }
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,824 @@
+"""
+HTML templates of the site.
+
+Every fragment of a page is defined here once. Fragments with fields are
+functions returning an f-string, so they cost no more than an inline one;
+fragments that are the same on every page (stylesheets, scripts, the site
+header and footer) are plain strings, assembled once per variant and
+memoised. Values are inserted as given, so callers escape them as needed.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from site_generator.assets import fingerprinted_name
+
+
+# Head
+
+
+def head_meta(
+    *, title: str, description: str, canonical_link: str, page_type: str, url: str
+) -> str:
+    """The start of a page's head: its title and meta tags."""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    
+    <!-- Primary Meta Tags -->
+    <title>{title}</title>
+    <meta name="description" content="{description}">
+    <meta name="author" content="Jason Liu">
+    <meta name="keywords" content="structured outputs, LLM, Instructor, Pydantic, data extraction, structured data">
+    
+    <!-- Canonical URL -->
+    {canonical_link}
+    
+    <!-- Open Graph / Facebook -->
+    <meta property="og:type" content="{page_type}">
+    <meta property="og:url" content="{url}">
+    <meta property="og:title" content="{title}">
+    <meta property="og:description" content="{description}">
+    
+    <!-- Twitter -->
+    <meta property="twitter:card" content="summary_large_image">
+    <meta property="twitter:url" content="{url}">
+    <meta property="twitter:title" content="{title}">
+    <meta property="twitter:description" content="{description}">
+"""
+
+
+def json_ld_script(*, json_ld: str) -> str:
+    """Structured data of a page, in a script element."""
+    return f"""
+    <!-- Structured Data / JSON-LD -->
+    <script type="application/ld+json">
+    {json_ld}
+    </script>
+"""
+
+
+def article_json_ld(
+    *,
+    headline: str,
+    description: str,
+    site_url: str,
+    url: str,
+    date: str,
+    section: str,
+    keywords: str,
+) -> str:
+    """
+    The TechArticle JSON-LD of an example page.
+
+    Laid out as json.dumps(indent=2) would; every field is a JSON-encoded
+    value.
+    """
+    return f"""{{
+  "@context": "https://schema.org",
+  "@type": "TechArticle",
+  "headline": {headline},
+  "description": {description},
+  "author": {{
+    "@type": "Person",
+    "name": "Jason Liu"
+  }},
+  "publisher": {{
+    "@type": "Organization",
+    "name": "Structured Outputs by Example",
+    "url": {site_url}
+  }},
+  "mainEntityOfPage": {url},
+  "datePublished": {date},
+  "dateModified": {date},
+  "articleSection": {section},
+  "keywords": [
+    {keywords}
+  ]
+}}"""
+
+
+def prefetch_link(*, href: str) -> str:
+    """A page the browser may fetch ahead, while idle."""
+    return f'    <link rel="prefetch" href="{href}">\n'
+
+
+def service_worker_meta(*, url: str) -> str:
+    """The service worker script.js registers, if the build generated one."""
+    return f'    <meta name="service-worker" content="{url}">\n'
+
+
+STYLESHEETS_START = """
+    <!-- Stylesheets -->
+"""
+
+# highlight.js, which highlights code blocks in the browser
+HIGHLIGHT_JS = """    <link rel='stylesheet' href='https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/default.min.css'>
+    <script src='https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js'></script>
+"""
+
+FONTS = """    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/firacode@6.2.0/distr/fira_code.css">
+    <style>
+        @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono&display=swap');
+        
+        code, pre code, .hljs {
+            font-family: 'Fira Code', 'JetBrains Mono', monospace;
+            font-feature-settings: "liga" 1;
+        }
+        
+        @supports (font-variation-settings: normal) {
+            code, pre code, .hljs {
+                font-family: 'Fira Code VF', 'JetBrains Mono', monospace;
+            }
+        }
+    </style>
+"""
+
+HIGHLIGHT_JS_INIT = """    <script>
+        document.addEventListener('DOMContentLoaded', (event) => {
+            hljs.highlightAll();
+        });
+    </script>
+"""
+
+# Main stylesheet, published as a fingerprinted file (SITE_STYLESHEET)
+SITE_CSS = """body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Helvetica, Arial, sans-serif;
+    line-height: 1.5;
+    color: #222;
+    margin: 0;
+    padding: 0;
+}
+.container {
+    max-width: 1100px;
+    margin: 0 auto;
+    padding: 0 20px;
+}
+header {
+    border-bottom: 1px solid #eee;
+    padding: 15px 0;
+    margin-bottom: 20px;
+}
+.site-title {
+    text-decoration: none;
+    color: #0066CC;
+    font-weight: 500;
+    font-size: 20px;
+}
+main {
+    padding-bottom: 40px;
+}
+footer {
+    border-top: 1px solid #eee;
+    padding: 15px 0;
+    margin-top: 20px;
+    color: #666;
+    font-size: 0.9em;
+}
+h1 {
+    font-size: 36px;
+    font-weight: 500;
+    margin: 0 0 25px 0;
+    color: #333;
+}
+p {
+    margin: 20px 0;
+    color: #444;
+    line-height: 1.6;
+}
+a {
+    color: #0066CC;
+    text-decoration: none;
+}
+a:hover {
+    text-decoration: underline;
+}
+.example-link {
+    margin: 4px 0;
+    line-height: 1.3;
+}
+.search input {
+    width: 100%;
+    box-sizing: border-box;
+    padding: 8px 10px;
+    font-size: 1em;
+    border: 1px solid #ddd;
+    border-radius: 4px;
+}
+.search-results {
+    list-style: none;
+    margin: 10px 0 20px 0;
+    padding: 0;
+}
+.search-results li {
+    margin: 4px 0;
+    line-height: 1.3;
+    color: #666;
+}
+.row {
+    display: flex;
+    width: 100%;
+    margin-bottom: 30px;
+    gap: 40px;
+}
+.docs {
+    flex: 0.75;
+    min-width: 0;
+    color: #444;
+    line-height: 1.6;
+    font-size: 1em;
+}
+.code {
+    flex: 2.25;
+    min-width: 0;
+    position: relative;
+}
+pre {
+    margin: 0;
+    padding: 20px;
+    background-color: #f8f8f8;
+    border-radius: 5px;
+    overflow-x: auto;
+    line-height: 1.5;
+}
+/* Prevent double styling from highlight.js */
+pre code.hljs, pre code {
+    background-color: transparent;
+    padding: 0;
+    margin: 0;
+    border: none;
+}
+.leading {
+    margin-bottom: 5px;
+}
+hr {
+    border: none;
+    border-top: 1px solid #eee;
+    margin: 20px 0;
+}
+.buttons {
+    position: absolute;
+    top: 5px;
+    right: 5px;
+    z-index: 10;
+}
+.copy {
+    cursor: pointer;
+    width: 18px;
+    height: 18px;
+    opacity: 0.6;
+    color: #666;
+    background-color: #f8f8f8;
+    border-radius: 3px;
+    padding: 3px;
+}
+.copy:hover {
+    opacity: 1;
+    color: #0066CC;
+}
+.tooltip {
+    position: absolute;
+    background: #333;
+    color: white;
+    padding: 2px 8px;
+    border-radius: 4px;
+    font-size: 12px;
+    top: -25px;
+    right: 0;
+}
+.command-prompt {
+    color: #888;
+}
+.command-text {
+    font-weight: bold;
+}
+.navigation {
+    margin-top: 30px;
+    padding-top: 15px;
+    border-top: 1px solid #eee;
+    display: flex;
+    justify-content: space-between;
+    flex-wrap: wrap;
+}
+.prev, .next {
+    margin: 5px 0;
+    font-weight: 500;
+}
+.prev {
+    margin-right: auto;
+}
+.next {
+    margin-left: auto;
+}
+.prev span, .next span {
+    color: #666;
+    font-weight: normal;
+}
+@media (max-width: 900px) {
+    .row {
+        flex-direction: column;
+    }
+    .docs, .code {
+        width: 100%;
+    }
+    .newsletter-banner {
+        flex-direction: column;
+        gap: 10px;
+        align-items: stretch !important;
+    }
+    .newsletter-banner > span {
+        text-align: center;
+        margin-bottom: 5px;
+    }
+    .newsletter-banner > div {
+        width: 100% !important;
+    }
+}
+"""
+
+SITE_STYLESHEET = fingerprinted_name("static/site.css", SITE_CSS.encode("utf-8"))
+
+
+def stylesheet_link(*, href: str) -> str:
+    """A link to a stylesheet."""
+    return f'    <link rel="stylesheet" href="{href}">\n'
+
+
+POSTHOG = """    <!-- PostHog Analytics -->
+    <script>
+    !function(t,e){var o,n,p,r;e.__SV||(window.posthog=e,e._i=[],e.init=function(i,s,a){function g(t,e){var o=e.split(".");2==o.length&&(t=t[o[0]],e=o[1]),t[e]=function(){t.push([e].concat(Array.prototype.slice.call(arguments,0)))}}(p=t.createElement("script")).type="text/javascript",p.crossOrigin="anonymous",p.async=!0,p.src=s.api_host.replace(".i.posthog.com","-assets.i.posthog.com")+"/static/array.js",(r=t.getElementsByTagName("script")[0]).parentNode.insertBefore(p,r);var u=e;for(void 0!==a?u=e[a]=[]:a="posthog",u.people=u.people||[],u.toString=function(t){var e="posthog";return"posthog"!==a&&(e+="."+a),t||(e+=" (stub)"),e},u.people.toString=function(){return u.toString(1)+".people (stub)"},o="init capture register register_once register_for_session unregister unregister_for_session getFeatureFlag getFeatureFlagPayload isFeatureEnabled reloadFeatureFlags updateEarlyAccessFeatureEnrollment getEarlyAccessFeatures on onFeatureFlags onSurveysLoaded onSessionId getSurveys getActiveMatchingSurveys renderSurvey canRenderSurvey canRenderSurveyAsync identify setPersonProperties group resetGroups setPersonPropertiesForFlags resetPersonPropertiesForFlags setGroupPropertiesForFlags resetGroupPropertiesForFlags reset get_distinct_id getGroups get_session_id get_session_replay_url alias set_config startSessionRecording stopSessionRecording sessionRecordingStarted captureException loadToolbar get_property getSessionProperty createPersonProfile opt_in_capturing opt_out_capturing has_opted_in_capturing has_opted_out_capturing clear_opt_in_out_capturing debug getPageViewId captureTraceFeedback captureTraceMetric".split(" "),n=0;n<o.length;n++)g(u,o[n]);e._i.push([i,s,a])},e.__SV=1)}(document,window.posthog||[]);
+    posthog.init('phc_3BLxAMqz3UaIZ3My7F034KHaU2jRQpVIG9HOAdR3HXc', {
+        api_host: 'https://us.i.posthog.com',
+        person_profiles: 'identified_only', // or 'always' to create profiles for anonymous users as well
+    })
+    </script>
+"""
+
+
+def page_header(*, base_url: str) -> str:
+    """The end of the head and the site header."""
+    return f"""</head>
+<body>
+    <div class="container">
+        <header style="display: flex; justify-content: space-between; align-items: center;">
+            <a href="{base_url}/" class="site-title">Structured Outputs by Example</a>
+            <a href="https://github.com/jxnl/structuredoutputsbyexample" target="_blank" style="display: inline-flex; align-items: center; font-size: 0.9em; color: #0066CC; text-decoration: none; gap: 5px;">
+                <svg width="16" height="16" viewBox="0 0 16 16" fill="currentColor">
+                    <path fill-rule="evenodd" d="M8 0C3.58 0 0 3.58 0 8c0 3.54 2.29 6.53 5.47 7.59.4.07.55-.17.55-.38 0-.19-.01-.82-.01-1.49-2.01.37-2.53-.49-2.69-.94-.09-.23-.48-.94-.82-1.13-.28-.15-.68-.52-.01-.53.63-.01 1.08.58 1.23.82.72 1.21 1.87.87 2.33.66.07-.52.28-.87.51-1.07-1.78-.2-3.64-.89-3.64-3.95 0-.87.31-1.59.82-2.15-.08-.2-.36-1.02.08-2.12 0 0 .67-.21 2.2.82.64-.18 1.32-.27 2-.27.68 0 1.36.09 2 .27 1.53-1.04 2.2-.82 2.2-.82.44 1.1.16 1.92.08 2.12.51.56.82 1.27.82 2.15 0 3.07-1.87 3.75-3.65 3.95.29.25.54.73.54 1.48 0 1.07-.01 1.93-.01 2.2 0 .21.15.46.55.38A8.013 8.013 0 0016 8c0-4.42-3.58-8-8-8z"></path>
+                </svg>
+                Star on GitHub
+            </a>
+        </header>
+        
+        <div class="newsletter-banner" style="background-color: #f1f8ff; border-radius: 5px; padding: 10px 15px; margin-bottom: 15px; display: flex; align-items: center; justify-content: space-between; font-size: 0.9em;">
+            <span>Stay updated when new content is added and get tips from the Instructor team</span>
+            <div style="width: 40%;">
+                <iframe src="https://embeds.beehiiv.com/2faf420d-8480-4b6e-8d6f-9c5a105f917a?slim=true" data-test-id="beehiiv-embed" height="52" width="100%" frameborder="0" scrolling="no" style="margin: 0; border-radius: 0px !important; background-color: transparent;"></iframe>
+            </div>
+        </div>
+        
+        <main>
+"""
+
+
+FOOTER_START = """        </main>
+        <footer>
+            <p>by <a href="https://github.com/jxnl/instructor">Instructor</a> | <a href="https://github.com/jxnl/instructor">GitHub</a> | <span style="color: #888; font-size: 0.9em;">Last updated: """
+
+
+def footer_end(*, script_url: str) -> str:
+    """The end of the footer and the site's script."""
+    return f"""</span></p>
+        </footer>
+    </div>
+    <script src="{script_url}"></script>
+</body>
+</html>
+"""
+
+
+@lru_cache(maxsize=None)
+def head_assets(
+    include_main_css: bool, base_url: str, highlight_url: Optional[str] = None
+) -> str:
+    """
+    The part of the head shared by every page, and the site header.
+
+    Args:
+        include_main_css: Whether to link the main stylesheet
+        base_url: The base URL for relative links
+        highlight_url: URL of the token colours of code highlighted at build
+            time; without it, code is highlighted in the browser
+
+    Returns:
+        Everything from the stylesheets to the opening <main> tag
+    """
+    if highlight_url is None:
+        stylesheets = HIGHLIGHT_JS + FONTS + HIGHLIGHT_JS_INIT
+    else:
+        stylesheets = FONTS + stylesheet_link(href=highlight_url)
+    return (
+        STYLESHEETS_START
+        + stylesheets
+        + (
+            stylesheet_link(href=f"{base_url}/{SITE_STYLESHEET}")
+            if include_main_css
+            else ""
+        )
+        + POSTHOG
+        + page_header(base_url=base_url)
+    )
+
+
+@lru_cache(maxsize=None)
+def footer(date: str, script_url: str) -> str:
+    """
+    The page footer and scripts.
+
+    Args:
+        date: The "last updated" date shown in the footer
+        script_url: URL of the site's script
+
+    Returns:
+        Everything from the closing </main> tag to the end of the page
+    """
+    return FOOTER_START + date + footer_end(script_url=script_url)
+
+
+# Index page
+
+
+def index_intro(*, first_example_id: str) -> str:
+    """Introduction of the index page."""
+    return f"""
+            <p style="margin: 20px 0; color: #444; line-height: 1.6;">
+                A hands-on guide to structured data extraction from LLMs using <a href="https://github.com/jxnl/instructor" target="_blank">Instructor</a> 
+                and <a href="https://docs.pydantic.dev/" target="_blank">Pydantic</a>.
+            </p>
+            <p style="margin: 20px 0; color: #444; line-height: 1.6;">
+                Start with the <a href="{first_example_id}/">first example</a> 
+                or browse below. Use arrow keys to navigate.
+            </p>
+            <p style="margin: 20px 0; color: #444; line-height: 1.6;">
+                Requires Python <code>&gt;=3.9</code> and latest versions of Instructor and Pydantic.
+            </p>
+            <div style="margin-top: 20px;">
+"""
+
+
+def index_search(*, index_url: str) -> str:
+    """
+    The search field of the index page.
+
+    Hidden until script.js has loaded, which fetches the index when the
+    field is focused.
+    """
+    return f"""                <form id="search" class="search" role="search" data-index="{index_url}" hidden>
+                    <input type="search" placeholder="Search examples" aria-label="Search examples" autocomplete="off">
+                    <ul id="search-results" class="search-results" hidden></ul>
+                </form>
+"""
+
+
+def index_section_title(*, title: str) -> str:
+    """Title of a section of the index page."""
+    return f"""                <h3 style="margin-top: 25px; margin-bottom: 10px; color: #333; font-size: 1.3em;">{title}</h3>
+"""
+
+
+def index_section_description(*, description: str) -> str:
+    """Description of a section of the index page."""
+    return f"""                <p style="margin: 0 0 10px 0; color: #555; font-size: 0.9em;">{description}</p>
+"""
+
+
+def index_example_link(*, id: str, title: str) -> str:
+    """Link to an example from the index page."""
+    return f"""                <div class="example-link">
+                        <a href="{id}/">{title}</a>
+                    </div>
+"""
+
+
+INDEX_END = "            </div>\n"
+
+# Example page: title and "Copy All" buttons
+
+TITLE_START = """            <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 20px;">
+                <div>
+"""
+
+
+def example_section_title(*, section_title: str, title: str) -> str:
+    """Title of an example page, under the title of its section."""
+    return f"""                    <div style="margin-bottom: 10px; color: #666; font-size: 0.9em;">
+                        <a href="../" style="text-decoration: none; color: #666;">{section_title}</a>
+                    </div>
+                    <h1 style="margin: 0; margin-bottom: 10px;">{title}</h1>
+"""
+
+
+def example_title(*, title: str) -> str:
+    """Title of an example page without a section."""
+    return f"""                    <h1 style="margin: 0; margin-bottom: 10px;">{title}</h1>
+"""
+
+
+TITLE_TEXT_END = """                </div>
+"""
+
+
+def copy_all_buttons(*, github_edit_url: str, all_python_code: str) -> str:
+    """Buttons to copy or edit the Python code of an example."""
+    return f"""                <div style="position: relative; margin-top: 10px; display: flex; gap: 8px;">
+                    <button id="copy-all-python" style="background-color: #f1f8ff; border: 1px solid #c8e1ff; border-radius: 6px; padding: 6px 12px; font-size: 14px; color: #0066CC; cursor: pointer; display: flex; align-items: center; gap: 6px;">
+                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                            <path d="M16 1H4C2.9 1 2 1.9 2 3V17H4V3H16V1ZM19 5H8C6.9 5 6 5.9 6 7V21C6 22.1 6.9 23 8 23H19C20.1 23 21 22.1 21 21V7C21 5.9 20.1 5 19 5ZM19 21H8V7H19V21Z" fill="currentColor"/>
+                        </svg>
+                        Copy All Python
+                    </button>
+                    <a href="{github_edit_url}" target="_blank" style="background-color: #f6f1ff; border: 1px solid #d8c9f7; border-radius: 6px; padding: 6px 12px; font-size: 14px; color: #6f42c1; text-decoration: none; cursor: pointer; display: flex; align-items: center; gap: 6px;">
+                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                            <path d="M3 17.25V21h3.75L17.81 9.94l-3.75-3.75L3 17.25zM20.71 7.04c.39-.39.39-1.02 0-1.41l-2.34-2.34c-.39-.39-1.02-.39-1.41 0l-1.83 1.83 3.75 3.75 1.83-1.83z" fill="currentColor"/>
+                        </svg>
+                        Edit
+                    </a>
+                    <div id="all-python-code" style="display: none;">{all_python_code}</div>
+                </div>"""
+
+
+TITLE_END = """            </div>
+"""
+
+
+def example_description(*, description: str) -> str:
+    """Description of an example."""
+    return f"""            <p style="margin: 20px 0 40px 0; color: #444; line-height: 1.6; font-size: 1.1em; white-space: pre-line;">
+                {description}
+            </p>
+"""
+
+
+# Example page: annotated code and shell rows
+
+DIVIDER = """            <hr>
+"""
+
+ROW_START = """            <div class="row">
+"""
+
+ROW_END = """            </div>
+"""
+
+
+def segment_header(*, header: str) -> str:
+    """Header of a group of code segments."""
+    return f"""<div style='font-size: 0.9em; color: #666;'>{header}</div>
+"""
+
+
+def docs_column(*, annotation: str) -> str:
+    """Annotation of a code segment (left column)."""
+    return f"""                <div class="docs">
+                    {annotation}
+                </div>
+"""
+
+
+def code_column(*, code: str) -> str:
+    """A code segment (right column)."""
+    return f"""                <div class="code">
+                    <pre><code class="language-python">{code}</code></pre>
+                </div>
+"""
+
+
+SHELL_START = """            <hr>
+            <h2>Running the Example</h2>
+"""
+
+
+def shell_docs_column(*, explanation: str) -> str:
+    """Explanation of a shell command (left column)."""
+    return f"""                <div class="docs" style='font-size: 0.9em; color: #666;'>
+                    {explanation}
+                </div>
+"""
+
+
+def shell_code_column(*, command: str, output: str) -> str:
+    """A shell command and its output (right column)."""
+    return f"""                <div class="code">
+                    <div class="buttons">
+                        <svg class="copy" title="Copy command" onclick="copyCode(this)" width="18" height="18" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                            <path d="M16 1H4C2.9 1 2 1.9 2 3V17H4V3H16V1ZM19 5H8C6.9 5 6 5.9 6 7V21C6 22.1 6.9 23 8 23H19C20.1 23 21 22.1 21 21V7C21 5.9 20.1 5 19 5ZM19 21H8V7H19V21Z" fill="currentColor"/>
+                        </svg>
+                    </div>
+                    <pre><code class="language-shell"><span><span class="command-prompt">$ </span><span class="command-text">{command}</span></span>
+{output}</code></pre>
+                </div>
+"""
+
+
+# Example page: images, documentation links and navigation
+
+
+def image_figure(*, filename: str) -> str:
+    """An image of an example."""
+    return f"""            <div style="margin: 30px 0; text-align: center;">
+                <figure>
+                    <img src="images/{filename}" alt="An illustration or output
+                    from the example code" style="max-width: 100%; border: 1px solid #eee;
+                    border-radius: 4px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+                    <figcaption style="margin-top: 10px; color: #666; font-style: italic;"></figcaption>
+                </figure>
+            </div>
+"""
+
+
+LINKS_START = """            <hr>
+            <h4>Further Information</h4>
+            <ul style="font-size: 0.9em;">
+"""
+
+
+def documentation_link(*, link: str, number: int) -> str:
+    """A link to the original documentation."""
+    return f"""                <li><a href="{link}"
+                         target="_blank">Documentation link {number}</a></li>
+"""
+
+
+LINKS_END = """            </ul>
+"""
+
+NAVIGATION_START = """            <div class="navigation">
+"""
+
+
+def navigation_prev(*, id: str, title: str) -> str:
+    """Link to the previous example."""
+    return f"""                <p class="prev">
+                    <span>← Previous:</span> <a href="../{id}/">{title}</a>
+                </p>
+"""
+
+
+def navigation_next(*, id: str, title: str) -> str:
+    """Link to the next example."""
+    return f"""                <p class="next">
+                    <span>Next:</span> <a href="../{id}/">{title}</a> →
+                </p>
+"""
+
+
+NAVIGATION_END = """            </div>
+"""
+
+# Service worker (see site_generator/offline.py)
+
+
+def service_worker_manifest(*, manifest_url: str) -> str:
+    """Start of the service worker: the URL of its precache manifest."""
+    return f"""// Generated by build_static_site.py
+const PRECACHE_MANIFEST = {manifest_url};
+"""
+
+
+SERVICE_WORKER = """
+// Keeps every page and asset listed in the precache manifest in a cache and
+// answers from it, so repeat visits load instantly and the site can be read
+// offline. The manifest gives the hash of each file's content: installing a
+// new version of this worker downloads only the files whose hash differs
+// from the cached one, and activating it drops the files it no longer lists.
+
+const CACHE_NAME = 'precache-v1';
+// Hashes of the cached files, kept in the cache with them
+const HASHES_KEY = new URL('precache-hashes', self.registration.scope).href;
+// Files downloaded at once while installing
+const PARALLEL_DOWNLOADS = 6;
+
+function scopeUrl(path) {
+    return new URL(path, self.registration.scope).href;
+}
+
+async function cachedHashes(cache) {
+    const response = await cache.match(HASHES_KEY);
+    return response ? response.json() : {};
+}
+
+function hashesResponse(hashes) {
+    return new Response(JSON.stringify(hashes), {
+        headers: {'Content-Type': 'application/json'}
+    });
+}
+
+async function download(url) {
+    // Revalidate with the server rather than trust the HTTP cache
+    const response = await fetch(url, {cache: 'no-cache'});
+    if (!response.ok) {
+        throw new Error(`Failed to download ${url}: ${response.status}`);
+    }
+    // A redirected response cannot answer a navigation
+    if (response.redirected) {
+        return new Response(await response.blob(), {headers: response.headers});
+    }
+    return response;
+}
+
+self.addEventListener('install', function(event) {
+    event.waitUntil((async function() {
+        const manifestResponse = await download(scopeUrl(PRECACHE_MANIFEST));
+        const manifest = await manifestResponse.clone().json();
+        const cache = await caches.open(CACHE_NAME);
+        const hashes = await cachedHashes(cache);
+        const cached = new Set((await cache.keys()).map(request => request.url));
+
+        const changed = [];
+        for (const [path, hash] of Object.entries(manifest.files)) {
+            const url = scopeUrl(path);
+            if (hashes[url] !== hash || !cached.has(url)) {
+                changed.push([url, hash]);
+            }
+        }
+
+        // Download every changed file before caching any, so that a failed
+        // download leaves the cache as it was (the install is retried later)
+        const responses = [];
+        for (let i = 0; i < changed.length; i += PARALLEL_DOWNLOADS) {
+            const batch = changed.slice(i, i + PARALLEL_DOWNLOADS);
+            responses.push(...await Promise.all(batch.map(([url]) => download(url))));
+        }
+        await Promise.all(changed.map(([url], i) => cache.put(url, responses[i])));
+        await cache.put(scopeUrl(PRECACHE_MANIFEST), manifestResponse);
+        for (const [url, hash] of changed) {
+            hashes[url] = hash;
+        }
+        await cache.put(HASHES_KEY, hashesResponse(hashes));
+    })());
+});
+
+self.addEventListener('activate', function(event) {
+    event.waitUntil((async function() {
+        for (const name of await caches.keys()) {
+            if (name !== CACHE_NAME) {
+                await caches.delete(name);
+            }
+        }
+
+        // Drop the files of earlier builds, which this one no longer links
+        const cache = await caches.open(CACHE_NAME);
+        const manifestResponse = await cache.match(scopeUrl(PRECACHE_MANIFEST));
+        if (manifestResponse) {
+            const manifest = await manifestResponse.json();
+            const hashes = {};
+            for (const [path, hash] of Object.entries(manifest.files)) {
+                hashes[scopeUrl(path)] = hash;
+            }
+            const keep = new Set([HASHES_KEY, scopeUrl(PRECACHE_MANIFEST)]);
+            for (const request of await cache.keys()) {
+                if (!(request.url in hashes) && !keep.has(request.url)) {
+                    await cache.delete(request);
+                }
+            }
+            await cache.put(HASHES_KEY, hashesResponse(hashes));
+        }
+        // Serve the pages already open, so that they work offline too
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', function(event) {
+    const request = event.request;
+    if (request.method !== 'GET' || !request.url.startsWith(self.registration.scope)) {
+        return;
+    }
+    event.respondWith((async function() {
+        const cache = await caches.open(CACHE_NAME);
+        // Pages are cached without query strings, such as campaign tags
+        const cached = await cache.match(request, {
+            ignoreSearch: request.mode === 'navigate'
+        });
+        return cached || fetch(request);
+    })());
+});
+"""
+
+# Replaces the service worker of an earlier build, once the site no longer
+# has one: removes its cache and unregisters itself
+RETIRED_SERVICE_WORKER = """// Generated by build_static_site.py
+self.addEventListener('install', function() {
+    self.skipWaiting();
+});
+
+self.addEventListener('activate', function(event) {
+    event.waitUntil((async function() {
+        for (const name of await caches.keys()) {
+            await caches.delete(name);
+        }
+        await self.registration.unregister();
+    })());
+});
+"""
@@ -1,26 +1,363 @@
 /**
- * Gemini by Example JavaScript functionality
+ * Structured Outputs by Example JavaScript functionality
  */
 
 // Function to copy code to clipboard
 function copyCode(button) {
     const codeBlock = button.closest('.code').querySelector('pre');
     const code = codeBlock.textContent;
-    
-    navigator.clipboard.writeText(code).then(() => {
-        // Show "Copied!" tooltip
-        const tooltip = document.createElement('span');
-        tooltip.textContent = 'Copied!';
-        tooltip.className = 'tooltip';
-        button.parentElement.appendChild(tooltip);
+    copyToClipboard(code, button);
+}
+
+// Function to copy all Python code
+document.addEventListener('DOMContentLoaded', function() {
+    const copyAllButton = document.getElementById('copy-all-python');
+    if (copyAllButton) {
+        copyAllButton.addEventListener('click', function() {
+            const allCodeElement = document.getElementById('all-python-code');
+            const code = allCodeElement.textContent;
+            copyToClipboard(code, copyAllButton);
+        });
+    }
+});
+
+// Shared function to copy text and show tooltip
+function copyToClipboard(text, element) {
+    // For older browsers, fallback to textarea method
+    if (!navigator.clipboard) {
+        const textArea = document.createElement('textarea');
+        textArea.value = text;
+        textArea.style.position = 'fixed';  // Avoid scrolling to bottom
+        document.body.appendChild(textArea);
+        textArea.focus();
+        textArea.select();
         
-        // Remove tooltip after 1 second
-        setTimeout(() => tooltip.remove(), 1000);
+        try {
+            document.execCommand('copy');
+            showTooltip(element, 'Copied!');
+        } catch (err) {
+            console.error('Failed to copy text: ', err);
+            showTooltip(element, 'Error!');
+        }
+        
+        document.body.removeChild(textArea);
+        return;
+    }
+    
+    // Use clipboard API if available
+    navigator.clipboard.writeText(text).then(() => {
+        showTooltip(element, 'Copied!');
     }).catch(err => {
         console.error('Failed to copy text: ', err);
+        showTooltip(element, 'Error!');
     });
 }
 
+// Helper to show tooltip
+function showTooltip(element, message) {
+    // Check if there's already a tooltip
+    let tooltip = element.parentElement.querySelector('.tooltip');
+    if (tooltip) {
+        tooltip.textContent = message;
+    } else {
+        // Create and append new tooltip
+        tooltip = document.createElement('span');
+        tooltip.textContent = message;
+        tooltip.className = 'tooltip';
+        tooltip.style.position = 'absolute';
+        tooltip.style.background = '#333';
+        tooltip.style.color = 'white';
+        tooltip.style.padding = '2px 8px';
+        tooltip.style.borderRadius = '4px';
+        tooltip.style.fontSize = '12px';
+        tooltip.style.top = '-25px';
+        tooltip.style.right = '0';
+        
+        // Make sure the parent has position relative for tooltip positioning
+        if (getComputedStyle(element.parentElement).position === 'static') {
+            element.parentElement.style.position = 'relative';
+        }
+        
+        element.parentElement.appendChild(tooltip);
+    }
+    
+    // Remove tooltip after 1.5 seconds
+    setTimeout(() => tooltip.remove(), 1500);
+}
+
+// Search on the index page, with the index built by site_generator/search.py
+// (see its docstring for the format)
+
+// Digits of the posting varints: the first 32 end a number
+const POSTING_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-_';
+const POSTING_DIGIT_VALUES = new Int8Array(128).fill(-1);
+for (let i = 0; i < POSTING_DIGITS.length; i++) {
+    POSTING_DIGIT_VALUES[POSTING_DIGITS.charCodeAt(i)] = i;
+}
+
+// Most terms a typed word is expanded to, so short words stay fast
+const MAX_PREFIX_TERMS = 30;
+
+// Most results listed
+const MAX_SEARCH_RESULTS = 20;
+
+// Decode a search index as served
+function parseSearchIndex(data) {
+    const terms = [];
+    let previous = '';
+    for (const entry of data.terms ? data.terms.split(' ') : []) {
+        previous = previous.slice(0, parseInt(entry[0], 36)) + entry.slice(1);
+        terms.push(previous);
+    }
+    return {
+        examples: data.examples,
+        terms: terms,
+        postings: data.postings ? data.postings.split(' ') : [],
+        stopWords: new Set(data.stop_words.split(' ')),
+        // Postings decoded so far, by term number
+        decoded: new Map()
+    };
+}
+
+// The examples a term occurs in, as (example number, field) pairs
+function termPostings(index, term) {
+    let postings = index.decoded.get(term);
+    if (postings !== undefined) {
+        return postings;
+    }
+    const encoded = index.postings[term];
+    // Every posting takes at least one digit
+    const values = new Int32Array(encoded.length * 2);
+    let length = 0;
+    let example = 0;
+    let value = 0;
+    let scale = 1;
+    for (let i = 0; i < encoded.length; i++) {
+        const digit = POSTING_DIGIT_VALUES[encoded.charCodeAt(i)];
+        value += (digit & 31) * scale;
+        if (digit < 32) {
+            example += Math.floor(value / 4);
+            values[length++] = example;
+            values[length++] = value % 4;
+            value = 0;
+            scale = 1;
+        } else {
+            scale *= 32;
+        }
+    }
+    postings = values.subarray(0, length);
+    index.decoded.set(term, postings);
+    return postings;
+}
+
+// Number of the first term not sorted before a word
+function firstTermFrom(terms, word) {
+    let low = 0;
+    let high = terms.length;
+    while (low < high) {
+        const middle = (low + high) >> 1;
+        if (terms[middle] < word) {
+            low = middle + 1;
+        } else {
+            high = middle;
+        }
+    }
+    return low;
+}
+
+// Numbers of the examples matching every word of a query, best first.
+// Each word matches the terms it starts; an example scores the field of its
+// best matching term for each word, plus one if the term is the whole word.
+function searchExamples(index, query) {
+    const words = query.toLowerCase().split(/[^\p{L}\p{N}_]+/u).filter(
+        word => word.length >= 2 && !index.stopWords.has(word)
+    );
+    if (words.length === 0) {
+        return [];
+    }
+    const count = index.examples.length;
+    const scores = new Int32Array(count);
+    const matchedWords = new Int32Array(count);
+    const best = new Int32Array(count);
+    for (const word of words) {
+        best.fill(0);
+        const first = firstTermFrom(index.terms, word);
+        const last = Math.min(index.terms.length, first + MAX_PREFIX_TERMS);
+        for (let term = first; term < last && index.terms[term].startsWith(word); term++) {
+            const bonus = index.terms[term] === word ? 2 : 1;
+            const postings = termPostings(index, term);
+            for (let i = 0; i < postings.length; i += 2) {
+                const score = postings[i + 1] * 2 + bonus;
+                if (score > best[postings[i]]) {
+                    best[postings[i]] = score;
+                }
+            }
+        }
+        for (let example = 0; example < count; example++) {
+            if (best[example] > 0) {
+                scores[example] += best[example];
+                matchedWords[example]++;
+            }
+        }
+    }
+    // Scores are small, so bucketing the examples by score ranks them in
+    // linear time, each bucket in display order
+    const buckets = [];
+    for (let example = 0; example < count; example++) {
+        if (matchedWords[example] === words.length) {
+            const score = scores[example];
+            if (buckets[score] === undefined) {
+                buckets[score] = [];
+            }
+            buckets[score].push(example);
+        }
+    }
+    const found = [];
+    for (let score = buckets.length - 1; score > 0; score--) {
+        for (const example of buckets[score] || []) {
+            found.push(example);
+        }
+    }
+    return found;
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('search');
+    if (!form) {
+        return;
+    }
+    const input = form.querySelector('input');
+    const results = document.getElementById('search-results');
+    let index = null;
+    let loading = null;
+
+    // The index is only downloaded by visitors who search
+    function loadIndex() {
+        if (!loading) {
+            loading = fetch(form.dataset.index)
+                .then(response => response.json())
+                .then(data => { index = parseSearchIndex(data); })
+                .catch(err => console.error('Failed to load the search index: ', err));
+        }
+        return loading;
+    }
+
+    function addResult(content) {
+        const item = document.createElement('li');
+        item.append(content);
+        results.appendChild(item);
+    }
+
+    function showResults() {
+        if (!index) {
+            loadIndex().then(() => { if (index) showResults(); });
+            return;
+        }
+        const query = input.value.trim();
+        results.replaceChildren();
+        results.hidden = !query;
+        if (!query) {
+            return;
+        }
+        const found = searchExamples(index, query);
+        for (const example of found.slice(0, MAX_SEARCH_RESULTS)) {
+            const [id, title] = index.examples[example];
+            const link = document.createElement('a');
+            link.href = id + '/';
+            link.textContent = title;
+            addResult(link);
+        }
+        if (found.length === 0) {
+            addResult('No examples found');
+        } else if (found.length > MAX_SEARCH_RESULTS) {
+            addResult('and ' + (found.length - MAX_SEARCH_RESULTS) + ' more');
+        }
+    }
+
+    input.addEventListener('focus', loadIndex);
+    input.addEventListener('input', showResults);
+    // Enter opens the first result
+    form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        const first = results.querySelector('a');
+        if (first) {
+            window.location.href = first.getAttribute('href');
+        }
+    });
+    form.hidden = false;
+});
+
+// Previous/next pages, fetched ahead so that moving to them is instant.
+// The build hints them with <link rel="prefetch">; the pages are also
+// fetched here once the browser is idle and as soon as their links are
+// hovered or focused, which warms the browser's cache for the normal page
+// load that follows.
+
+// Most pages kept in memory
+const PAGE_CACHE_SIZE = 8;
+
+// Links to the previous and next pages
+const NEIGHBOUR_LINKS = '.prev a, .next a';
+
+// Pages fetched, as promises of their markup, by absolute URL without its
+// fragment, the most recently used last
+const pageCache = new Map();
+
+// Fetch a page into the cache, unless it is there already
+function prefetchPage(url) {
+    url = url.split('#')[0];
+    const cached = pageCache.get(url);
+    if (cached !== undefined) {
+        pageCache.delete(url);
+        pageCache.set(url, cached);
+        return;
+    }
+    const page = fetch(url, {credentials: 'same-origin'}).then(response => {
+        if (!response.ok) {
+            throw new Error('HTTP ' + response.status);
+        }
+        return response.text();
+    });
+    // A page that failed to load is fetched again next time
+    page.catch(() => {
+        if (pageCache.get(url) === page) {
+            pageCache.delete(url);
+        }
+    });
+    pageCache.set(url, page);
+    if (pageCache.size > PAGE_CACHE_SIZE) {
+        pageCache.delete(pageCache.keys().next().value);
+    }
+}
+
+// Prefetch the previous and next pages once the browser is idle, unless the
+// reader asked to save data
+function prefetchNeighboursWhenIdle() {
+    if (navigator.connection && navigator.connection.saveData) {
+        return;
+    }
+    const prefetch = () => {
+        document.querySelectorAll(NEIGHBOUR_LINKS).forEach(link => prefetchPage(link.href));
+    };
+    if ('requestIdleCallback' in window) {
+        requestIdleCallback(prefetch, {timeout: 2000});
+    } else {
+        setTimeout(prefetch, 200);
+    }
+}
+
+document.addEventListener('DOMContentLoaded', prefetchNeighboursWhenIdle);
+
+// Prefetch a neighbour as soon as the pointer or focus is on its link
+for (const eventName of ['mouseover', 'focusin', 'touchstart']) {
+    document.addEventListener(eventName, function(e) {
+        const link = e.target.closest && e.target.closest(NEIGHBOUR_LINKS);
+        if (link) {
+            prefetchPage(link.href);
+        }
+    }, {passive: true});
+}
+
 // Enable keyboard navigation between examples
 document.addEventListener('keydown', function(e) {
     if (e.ctrlKey || e.altKey || e.shiftKey || e.metaKey) {
@@ -40,4 +377,34 @@ document.addEventListener('keydown', function(e) {
             window.location.href = prevLink.getAttribute('href');
         }
     }
-}); 
+});
+
+// Service worker that keeps the site cached for offline reading, published
+// by builds with --service-worker (see site_generator/offline.py). Pages of
+// a build without one remove the worker an earlier build installed.
+function setUpServiceWorker() {
+    if (!('serviceWorker' in navigator)) {
+        return;
+    }
+    const meta = document.querySelector('meta[name="service-worker"]');
+    if (!meta) {
+        navigator.serviceWorker.getRegistration().then(registration => {
+            if (registration) {
+                registration.unregister();
+            }
+        });
+        return;
+    }
+    // The worker downloads the whole site, which readers saving data skip
+    if (navigator.connection && navigator.connection.saveData) {
+        return;
+    }
+    navigator.serviceWorker.register(meta.content).catch(err => {
+        console.error('Failed to register the service worker: ', err);
+    });
+}
+
+// Register once the page has loaded, so the worker does not compete with it
+document.addEventListener('DOMContentLoaded', function() {
+    window.addEventListener('load', setUpServiceWorker);
+});
@@ -13,6 +13,8 @@ from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent
 
+from site_generator.inventory import Inventory
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -26,6 +28,10 @@ class ExampleChangeHandler(FileSystemEventHandler):
         self.project_root = project_root
         self.last_build_time = 0
         self.build_cooldown = 2  # seconds
+        self.examples_dir = project_root / "examples"
+        self.inventory = None
+        if self.examples_dir.exists():
+            self.inventory = Inventory.scan(self.examples_dir)
         
     def on_any_event(self, event):
         """Handle file system events."""
@@ -41,6 +47,17 @@ class ExampleChangeHandler(FileSystemEventHandler):
         current_time = time.time()
         if current_time - self.last_build_time < self.build_cooldown:
             return
+
+        # Skip events on the files of example directories that did not change
+        # any file (size or mtime); other paths are not recorded by the scan,
+        # so changes to them always rebuild
+        if self.inventory is not None and self.inventory.tracks(Path(event.src_path)):
+            inventory = Inventory.scan(self.examples_dir)
+            changed = inventory.changes(self.inventory)
+            self.inventory = inventory
+            if not changed:
+                return
+            logger.info(f"Changed files: {', '.join(str(path) for path in changed)}")
             
         # Rebuild the site
         logger.info(f"Change detected in {event.src_path}")